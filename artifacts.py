@@ -0,0 +1,237 @@
+"""
+S2V (Slides to Video) - Content-addressed artifact store
+Every output recorded in a run manifest (slide images, narration audio, translated
+text, videos) is stored once under its SHA-256 and hard-linked into the run folder,
+so identical artifacts of different runs share one copy on disk. An object's link
+count is its reference count: objects no run links to any more are garbage, and
+above the disk quota the intermediates of the oldest idle runs are released (their
+final videos, manifests and text files stay; a resume simply redoes those steps).
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from manifest import MANIFEST_FILE, hash_file
+
+RUNS_FILE = "runs.json"
+# Steps whose outputs are the product of a run and never released for the quota
+KEPT_STEPS = ('video',)
+# Runs whose manifest changed more recently than this are treated as in progress
+ACTIVE_RUN_SECONDS = 15 * 60
+# While the quota cannot be met (every run is in progress), collect at most this often
+COLLECT_INTERVAL_SECONDS = 60
+
+
+class ArtifactStore:
+    """Hard-link store of run artifacts with reference-counted garbage collection and a quota"""
+
+    def __init__(self, directory, max_bytes=None):
+        """
+        Args:
+            directory: Store root (must be on the same file system as the run folders)
+            max_bytes: Disk quota of the stored artifacts (None for no limit)
+        """
+        self.directory = os.path.expanduser(directory)
+        self.objects_dir = os.path.join(self.directory, 'objects')
+        self.runs_file = os.path.join(self.directory, RUNS_FILE)
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._size = None  # Total bytes of all objects, scanned lazily
+        self._runs = None  # Run folders that link to the store
+        self._link_failed = False
+        self._last_collect = 0.0
+        self.deduplicated = 0  # Files of this process replaced by a link to an existing object
+
+    def _path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _load_runs(self):
+        if self._runs is None:
+            try:
+                with open(self.runs_file, 'r', encoding='utf-8') as f:
+                    self._runs = json.load(f)
+            except (OSError, ValueError):
+                self._runs = []
+        return self._runs
+
+    def _save_runs(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.runs_file}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._runs, f, indent=2)
+        os.replace(tmp_path, self.runs_file)
+
+    def add(self, path, run_dir, digest=None):
+        """
+        Store a run file by content and leave a hard link to the object in its place.
+
+        If the content is already stored, the run file is replaced by a link to the
+        existing object. Nothing happens when the store and the run folder are on
+        different file systems.
+
+        Returns:
+            True if the file is now linked to the store
+        """
+        digest = digest or hash_file(path)
+        object_path = self._path(digest)
+        run_dir = os.path.abspath(run_dir)
+        with self._lock:
+            try:
+                added = self._link(path, object_path)
+            except OSError as e:
+                if not self._link_failed:
+                    self._link_failed = True
+                    print(f"⚠️ Artifact store disabled for {path} ({e}); keep cache_dir on the output file system")
+                return False
+
+            runs = self._load_runs()
+            if run_dir not in runs:
+                runs.append(run_dir)
+                self._save_runs()
+            if self._size is not None:
+                self._size += added
+            over_quota = self.max_bytes is not None and (self._size is None or self._size > self.max_bytes)
+            collect = over_quota and time.time() - self._last_collect >= COLLECT_INTERVAL_SECONDS
+        if collect:
+            self.collect(keep_run=run_dir)
+        return True
+
+    def _link(self, path, object_path):
+        # Called with the lock held, so garbage collection cannot delete object_path meanwhile
+        if os.path.exists(object_path):
+            if os.path.samefile(object_path, path):
+                return 0
+            # Swap in a link to the stored copy (atomic, the run file never disappears)
+            tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+            os.link(object_path, tmp_path)
+            os.replace(tmp_path, path)
+            self.deduplicated += 1
+            return 0
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        tmp_path = f"{object_path}.{uuid.uuid4().hex[:8]}.tmp"
+        os.link(path, tmp_path)
+        os.replace(tmp_path, object_path)
+        return os.path.getsize(object_path)
+
+    def _objects(self):
+        """Return (mtime, size, links, path) of every stored object."""
+        objects = []
+        if not os.path.isdir(self.objects_dir):
+            return objects
+        for root, _, files in os.walk(self.objects_dir):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                objects.append((stat.st_mtime, stat.st_size, stat.st_nlink, path))
+        return objects
+
+    def _remove_unreferenced(self, objects):
+        """Delete objects that no run links to (link count 1). Returns (removed, bytes freed)."""
+        removed = freed = 0
+        for _, size, links, path in objects:
+            if links > 1:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            removed += 1
+            freed += size
+        return removed, freed
+
+    def _release_run(self, run_dir):
+        """Unlink the stored intermediates of a finished run. Returns the number of files released."""
+        try:
+            with open(os.path.join(run_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+                steps = json.load(f).get('steps', {})
+        except (OSError, ValueError):
+            return 0
+
+        released = 0
+        for step, entry in steps.items():
+            if step in KEPT_STEPS:
+                continue
+            for output in entry.get('outputs', []):
+                path = output['path'] if os.path.isabs(output['path']) else os.path.join(run_dir, output['path'])
+                object_path = self._path(output['hash'])
+                try:
+                    if os.path.exists(object_path) and os.path.samefile(path, object_path):
+                        os.remove(path)
+                        released += 1
+                except OSError:
+                    continue
+        return released
+
+    def collect(self, keep_run=None):
+        """
+        Garbage-collect the store.
+
+        Unreferenced objects are deleted first. If the store is still over its quota,
+        the intermediates of idle runs are released, oldest run first, until it is 10%
+        below the quota. Runs that are in progress (or keep_run) are never touched.
+
+        Returns:
+            dict with removed objects, released run files, freed bytes and the store size
+        """
+        with self._lock:
+            objects = self._objects()
+            removed, freed = self._remove_unreferenced(objects)
+            size = sum(size for _, size, links, _ in objects if links > 1)
+
+            runs = [run for run in self._load_runs() if os.path.isdir(run)]
+            released = 0
+            if self.max_bytes is not None and size > self.max_bytes:
+                target = self.max_bytes * 0.9
+                now = time.time()
+
+                def last_change(run):
+                    try:
+                        return os.path.getmtime(os.path.join(run, MANIFEST_FILE))
+                    except OSError:
+                        return 0
+
+                for run in sorted(runs, key=last_change):
+                    if size <= target:
+                        break
+                    if run == keep_run or now - last_change(run) < ACTIVE_RUN_SECONDS:
+                        continue
+                    run_released = self._release_run(run)
+                    if not run_released:
+                        continue
+                    released += run_released
+                    print(f"🧹 Released {run_released} intermediate files of {run} (artifact store over quota)")
+                    objects = self._objects()
+                    run_removed, run_freed = self._remove_unreferenced(objects)
+                    removed += run_removed
+                    freed += run_freed
+                    size = sum(size for _, size, links, _ in objects if links > 1)
+
+            self._runs = runs
+            self._save_runs()
+            self._size = size
+            self._last_collect = time.time()
+
+        return {'removed': removed, 'released': released, 'freed_bytes': freed, 'bytes': size}
+
+    def stats(self):
+        """Return object count, stored bytes and the bytes saved by sharing objects between runs."""
+        objects = self._objects()
+        with self._lock:
+            self._size = sum(size for _, size, _, _ in objects)
+            return {
+                'objects': len(objects),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                # An object linked from k run files would otherwise take k copies
+                'saved_bytes': sum(size * (links - 2) for _, size, links, _ in objects if links > 2),
+                'runs': len(self._load_runs()),
+                'deduplicated': self.deduplicated
+            }
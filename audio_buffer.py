@@ -0,0 +1,119 @@
+"""
+S2V (Slides to Video) - In-memory PCM audio
+Holds mono 16-bit speech as a NumPy int16 array so TTS output can be segmented,
+measured and handed to the video muxer without intermediate files. Slicing
+returns views of the same samples, and files are written only as final artifacts.
+"""
+
+import io
+import os
+import wave
+import numpy as np
+
+SAMPLE_RATE = 24000  # Gemini TTS output rate
+
+
+class PcmBuffer:
+    """Mono 16-bit PCM samples with their sample rate"""
+
+    def __init__(self, samples, rate=SAMPLE_RATE):
+        self.samples = np.asarray(samples, dtype=np.int16)
+        self.rate = rate
+
+    @classmethod
+    def from_bytes(cls, pcm, rate=SAMPLE_RATE):
+        """Wrap raw little-endian 16-bit PCM bytes without copying them."""
+        return cls(np.frombuffer(pcm, dtype='<i2'), rate)
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a 16-bit mono WAV directly, or any other audio file through pydub."""
+        if path.lower().endswith('.wav'):
+            with wave.open(path, 'rb') as wf:
+                if wf.getsampwidth() == 2 and wf.getnchannels() == 1:
+                    return cls.from_bytes(wf.readframes(wf.getnframes()), wf.getframerate())
+
+        from pydub import AudioSegment
+        audio = AudioSegment.from_file(path).set_channels(1).set_sample_width(2)
+        return cls.from_bytes(audio.raw_data, audio.frame_rate)
+
+    @classmethod
+    def silence(cls, seconds, rate=SAMPLE_RATE):
+        return cls(np.zeros(int(round(seconds * rate)), dtype=np.int16), rate)
+
+    @classmethod
+    def concatenate(cls, buffers, rate=SAMPLE_RATE):
+        """Join buffers of the same sample rate into one (copies once)."""
+        if not buffers:
+            return cls.silence(0, rate)
+        return cls(np.concatenate([b.samples for b in buffers]), buffers[0].rate)
+
+    @classmethod
+    def crossfade(cls, buffers, seconds):
+        """Join buffers, overlapping each boundary with a linear crossfade of the given length."""
+        if len(buffers) < 2:
+            return cls.concatenate(buffers)
+
+        rate = buffers[0].rate
+        fade = int(round(seconds * rate))
+        parts = []
+        tail = buffers[0].samples
+        for buffer in buffers[1:]:
+            head = buffer.samples
+            overlap = min(fade, len(tail), len(head))
+            if overlap == 0:
+                parts.append(tail)
+                tail = head
+                continue
+            ramp = np.linspace(0.0, 1.0, overlap, dtype=np.float32)
+            mixed = tail[-overlap:] * (1.0 - ramp) + head[:overlap] * ramp
+            parts.append(tail[:-overlap])
+            parts.append(np.clip(np.round(mixed), -32768, 32767).astype(np.int16))
+            tail = head[overlap:]
+        parts.append(tail)
+        return cls(np.concatenate(parts), rate)
+
+    def __len__(self):
+        return len(self.samples)
+
+    @property
+    def duration(self):
+        """Length in seconds."""
+        return len(self.samples) / self.rate
+
+    def slice(self, start, end=None):
+        """Return the part between start and end seconds as a view (no copy)."""
+        first = max(0, int(round(start * self.rate)))
+        last = len(self.samples) if end is None else min(len(self.samples), int(round(end * self.rate)))
+        return PcmBuffer(self.samples[first:max(first, last)], self.rate)
+
+    def fit(self, seconds):
+        """Return the audio cut or padded with silence to exactly the given length."""
+        length = int(round(seconds * self.rate))
+        if length <= len(self.samples):
+            return PcmBuffer(self.samples[:length], self.rate)
+        padding = np.zeros(length - len(self.samples), dtype=np.int16)
+        return PcmBuffer(np.concatenate([self.samples, padding]), self.rate)
+
+    def to_bytes(self):
+        return self.samples.astype('<i2', copy=False).tobytes()
+
+    def to_wav_bytes(self):
+        """Encode as an in-memory WAV file (for uploads that need a container)."""
+        data = io.BytesIO()
+        self._write_wav(data)
+        return data.getvalue()
+
+    def write_wav(self, path):
+        """Write a final WAV artifact (replacing, not modifying, any hard-linked old file)."""
+        if os.path.exists(path):
+            os.remove(path)
+        self._write_wav(path)
+        return path
+
+    def _write_wav(self, target):
+        with wave.open(target, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.rate)
+            wf.writeframes(self.to_bytes())
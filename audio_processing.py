@@ -0,0 +1,97 @@
+"""
+S2V (Slides to Video) - Slide audio post-processing
+Vectorized NumPy clean-up of each slide's speech before it is written: trims
+leading/trailing silence, caps long internal pauses and normalizes loudness so
+every slide plays at the same level. Shorter audio also means less to encode.
+"""
+
+import numpy as np
+from audio_buffer import PcmBuffer
+from segmentation import FRAME_MS, frame_levels, find_pauses
+
+SILENCE_DB = -35.0      # Frames this far below the speech level count as silence
+EDGE_PADDING = 0.15     # Seconds of silence kept before the first and after the last word
+MAX_PAUSE = 1.0         # Internal pauses are shortened to this many seconds
+TARGET_DBFS = -20.0     # RMS level of the speech after normalization
+PEAK_DBFS = -1.0        # Gain is limited so peaks stay below this level
+
+
+def _voiced_frames(levels, silence_db):
+    return levels >= np.percentile(levels, 95) + silence_db
+
+
+def trim_silence(audio, silence_db=SILENCE_DB, padding=EDGE_PADDING):
+    """Return audio without leading/trailing silence (keeps padding seconds at both ends)."""
+    levels = frame_levels(audio.samples, audio.rate)
+    if len(levels) == 0:
+        return audio
+    voiced = _voiced_frames(levels, silence_db)
+    if not voiced.any():
+        return audio
+
+    step = FRAME_MS / 1000
+    first = int(np.argmax(voiced))
+    last = len(voiced) - int(np.argmax(voiced[::-1]))
+    return audio.slice(max(0.0, first * step - padding), last * step + padding)
+
+
+def cap_pauses(audio, max_pause=MAX_PAUSE, silence_db=SILENCE_DB):
+    """Shorten every internal pause longer than max_pause seconds to max_pause."""
+    levels = frame_levels(audio.samples, audio.rate)
+    pauses = [p for p in find_pauses(levels, silence_db=silence_db) if p[1] - p[0] > max_pause]
+    if not pauses:
+        return audio
+
+    # Cut the middle of each long pause, keeping half of max_pause on either side
+    keep = []
+    position = 0
+    for start, end in pauses:
+        cut_start = int((start + max_pause / 2) * audio.rate)
+        cut_end = int((end - max_pause / 2) * audio.rate)
+        keep.append(audio.samples[position:cut_start])
+        position = cut_end
+    keep.append(audio.samples[position:])
+    return PcmBuffer(np.concatenate(keep), audio.rate)
+
+
+def normalize_loudness(audio, target_dbfs=TARGET_DBFS, peak_dbfs=PEAK_DBFS, silence_db=SILENCE_DB):
+    """Scale audio so the speech RMS is target_dbfs, without pushing peaks above peak_dbfs."""
+    levels = frame_levels(audio.samples, audio.rate)
+    if len(levels) == 0:
+        return audio
+    voiced = _voiced_frames(levels, silence_db)
+    peak = np.max(np.abs(audio.samples.astype(np.float32))) / 32768.0
+    if not voiced.any() or peak <= 0:
+        return audio
+
+    speech_rms = np.sqrt(np.mean((10 ** (levels[voiced] / 20)) ** 2))
+    gain_db = min(target_dbfs - 20 * np.log10(speech_rms), peak_dbfs - 20 * np.log10(peak))
+    if abs(gain_db) < 0.1:
+        return audio
+
+    scaled = audio.samples.astype(np.float32) * (10 ** (gain_db / 20))
+    return PcmBuffer(np.clip(np.round(scaled), -32768, 32767).astype(np.int16), audio.rate)
+
+
+def process_slide_audio(audio, silence_db=SILENCE_DB, padding=EDGE_PADDING, max_pause=MAX_PAUSE,
+                        target_dbfs=TARGET_DBFS):
+    """
+    Trim, cap pauses and normalize one slide's audio.
+
+    Args:
+        audio: PcmBuffer of the slide
+        silence_db: Silence threshold relative to the speech level
+        padding: Silence kept at both ends (None disables trimming)
+        max_pause: Longest internal pause in seconds (None or 0 disables capping)
+        target_dbfs: Speech loudness target (None disables normalization)
+
+    Returns:
+        Processed PcmBuffer
+    """
+    if padding is not None:
+        audio = trim_silence(audio, silence_db, padding)
+    if max_pause:
+        audio = cap_pauses(audio, max_pause, silence_db)
+    if target_dbfs is not None:
+        audio = normalize_loudness(audio, target_dbfs, silence_db=silence_db)
+    return audio
@@ -0,0 +1,166 @@
+"""
+S2V (Slides to Video) - Batch mode
+Converts many PDFs in one process with a pool of concurrent decks. All decks share
+one GPTProcessor's clients, provider limits and caches (see GPTProcessor.fork).
+"""
+
+import glob
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+BATCH_REPORT_FILE = "batch_report.json"
+
+
+def find_pdf_files(source):
+    """Return the PDFs of a directory (recursively) or of a glob pattern, naturally sorted."""
+    import natsort
+    if os.path.isdir(source):
+        pattern = os.path.join(source, '**', '*')
+    else:
+        pattern = source
+
+    pdf_files = [
+        path for path in glob.glob(pattern, recursive=True)
+        if os.path.isfile(path) and path.lower().endswith('.pdf')
+    ]
+    return natsort.natsorted(pdf_files)
+
+
+def convert_deck(processor, pdf_path, base_output_folder, pdf_batch_size, tts_batch_size, use_batch_splitting):
+    """Convert one deck in its own run folder and return a result record (never raises)."""
+    deck = processor.fork()
+    result = {
+        'pdf_path': pdf_path,
+        'status': 'failed',
+        'output_folder': None,
+        'video_path': None,
+        'slides': 0,
+        'video_seconds': 0.0,
+        'processing_seconds': 0.0,
+        'cost': 0.0,
+        'error': None
+    }
+
+    start_time = time.time()
+    try:
+        output_folder = deck.create_random_output_folder(base_output_folder)
+        result['output_folder'] = output_folder
+
+        video_path, audio_files, durations = deck.run_workflow(
+            pdf_path, output_folder, pdf_batch_size, tts_batch_size, use_batch_splitting
+        )
+        if not durations:
+            raise RuntimeError("workflow did not produce a video")
+
+        result.update({
+            'status': 'ok',
+            'video_path': video_path,
+            'slides': len(durations),
+            'video_seconds': sum(durations)
+        })
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+    finally:
+        result['processing_seconds'] = time.time() - start_time
+        result['cost'] = deck.usage.summary()['totals']['cost']
+
+    return result
+
+
+def run_batch(processor, pdf_files, base_output_folder, jobs=2, pdf_batch_size=5, tts_batch_size=5,
+              use_batch_splitting=True):
+    """
+    Convert many PDFs concurrently.
+
+    Args:
+        processor: GPTProcessor whose clients, limits and caches are shared by all decks
+        pdf_files: List of PDF paths
+        base_output_folder: Folder in which a run_* folder is created per deck
+        jobs: Number of decks converted concurrently
+
+    Returns:
+        dict: Aggregate report (also written to batch_report.json)
+    """
+    os.makedirs(base_output_folder, exist_ok=True)
+    results = []
+    start_time = time.time()
+
+    print(f"📚 Converting {len(pdf_files)} decks with {jobs} concurrent jobs...")
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(
+                convert_deck, processor, pdf_path, base_output_folder,
+                pdf_batch_size, tts_batch_size, use_batch_splitting
+            ): pdf_path
+            for pdf_path in pdf_files
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            icon = "✅" if result['status'] == 'ok' else "❌"
+            print(f"{icon} [{len(results)}/{len(pdf_files)}] {os.path.basename(result['pdf_path'])} "
+                  f"({result['processing_seconds']:.1f}s)")
+
+    report = build_report(results, time.time() - start_time, jobs)
+
+    report_file = os.path.join(base_output_folder, BATCH_REPORT_FILE)
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    report['report_file'] = report_file
+
+    return report
+
+
+def build_report(results, wall_seconds, jobs):
+    """Aggregate per-deck results into a throughput report."""
+    succeeded = [r for r in results if r['status'] == 'ok']
+    slides = sum(r['slides'] for r in succeeded)
+    video_seconds = sum(r['video_seconds'] for r in succeeded)
+    deck_seconds = sum(r['processing_seconds'] for r in results)
+    cost = sum(r['cost'] for r in results)
+
+    return {
+        'jobs': jobs,
+        'decks': len(results),
+        'succeeded': len(succeeded),
+        'failed': len(results) - len(succeeded),
+        'wall_seconds': wall_seconds,
+        'deck_seconds': deck_seconds,
+        'concurrency_speedup': deck_seconds / wall_seconds if wall_seconds > 0 else 0.0,
+        'slides': slides,
+        'slides_per_minute': slides / (wall_seconds / 60) if wall_seconds > 0 else 0.0,
+        'video_seconds': video_seconds,
+        'video_seconds_per_wall_second': video_seconds / wall_seconds if wall_seconds > 0 else 0.0,
+        'cost': cost,
+        'cost_per_slide': cost / slides if slides else 0.0,
+        'results': sorted(results, key=lambda r: r['pdf_path'])
+    }
+
+
+def print_batch_report(report):
+    """Print the aggregate throughput report."""
+    print("\n" + "=" * 60)
+    print("📚 BATCH THROUGHPUT REPORT")
+    print("=" * 60)
+    print(f"📄 Decks:                {report['succeeded']}/{report['decks']} succeeded ({report['failed']} failed)")
+    print(f"⚙️  Concurrent jobs:      {report['jobs']}")
+    print(f"⏱️  Wall time:            {report['wall_seconds']:.1f}s ({report['wall_seconds']/60:.1f} min)")
+    print(f"⚡ Concurrency speedup:  {report['concurrency_speedup']:.2f}x (sum of deck times / wall time)")
+    print(f"📊 Slides processed:     {report['slides']} ({report['slides_per_minute']:.1f} slides/min)")
+    print(f"🎥 Video produced:       {report['video_seconds']/60:.1f} min "
+          f"({report['video_seconds_per_wall_second']:.2f}x realtime)")
+    print(f"💰 Estimated API cost:   ${report['cost']:.4f} (${report['cost_per_slide']:.4f}/slide)")
+
+    for result in report['results']:
+        if result['status'] == 'ok':
+            print(f"   ✅ {os.path.basename(result['pdf_path'])}: {result['slides']} slides, "
+                  f"{result['processing_seconds']:.1f}s, ${result['cost']:.4f} → {result['video_path']}")
+        else:
+            print(f"   ❌ {os.path.basename(result['pdf_path'])}: {result['error']}")
+
+    if 'report_file' in report:
+        print(f"📝 Report saved to: {report['report_file']}")
@@ -0,0 +1,197 @@
+"""
+S2V (Slides to Video) - Persistent caches
+Content-keyed disk caches shared by all runs on this machine. Byte entries are
+compressed (files such as encoded segments are stored as is), the total size is
+bounded with least-recently-used eviction, and hit/miss statistics are kept for
+the run summary.
+"""
+
+import os
+import re
+import shutil
+import threading
+import unicodedata
+import uuid
+import zlib
+from manifest import hash_inputs, hash_text
+
+DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "s2v")
+
+
+class DiskCache:
+    """Key -> compressed bytes (or file) store with a size limit (LRU by file modification time)"""
+
+    def __init__(self, directory, max_bytes, compression_level=6):
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+
+        self._lock = threading.Lock()
+        self._size = None  # Total bytes on disk, scanned lazily
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        """Return the cached bytes for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = zlib.decompress(f.read())
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            data = None
+        except (OSError, zlib.error):
+            # Corrupt or unreadable entry: drop it and treat as a miss
+            self._remove(path)
+            data = None
+
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """Store bytes under key, then evict old entries if the cache is over its limit."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        compressed = zlib.compress(data, self.compression_level)
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.writes += 1
+            if self._size is not None:
+                self._size += len(compressed) - previous
+        self._evict_if_needed()
+
+    def get_file(self, key):
+        """Return the path of a file stored with put_file, or None on a miss."""
+        path = self._path(key)
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            path = None
+
+        with self._lock:
+            if path is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return path
+
+    def put_file(self, key, source):
+        """Store a file as is (hard link when possible, else a copy), then evict if needed."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copy2(source, tmp_path)
+        os.utime(tmp_path)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.writes += 1
+            if self._size is not None:
+                self._size += os.path.getsize(path) - previous
+        self._evict_if_needed()
+
+    def _entries(self):
+        """Return (mtime, size, path) of every entry."""
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _remove(self, path):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size -= size
+
+    def _evict_if_needed(self):
+        with self._lock:
+            if self._size is not None and self._size <= self.max_bytes:
+                return
+            entries = self._entries()
+            self._size = sum(size for _, size, _ in entries)
+            if self._size <= self.max_bytes:
+                return
+
+            # Drop least recently used entries until 10% below the limit
+            target = self.max_bytes * 0.9
+            for _, size, path in sorted(entries):
+                if self._size <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                self._size -= size
+                self.evictions += 1
+
+    def stats(self):
+        """Return hit/miss counters and the current cache size."""
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'writes': self.writes,
+                'evictions': self.evictions,
+                'bytes': self._size,
+                'max_bytes': self.max_bytes
+            }
+
+
+def normalize_text(text):
+    """Normalize narration text so formatting-only edits still hit the cache."""
+    text = unicodedata.normalize('NFC', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class TtsCache(DiskCache):
+    """Synthesized PCM keyed by (model, voice, prompt prefix, normalized text)"""
+
+    @staticmethod
+    def key(model, voice, prompt_prefix, text):
+        return hash_inputs(model, voice, prompt_prefix, hash_text(normalize_text(text)))
+
+
+class SegmentCache(DiskCache):
+    """Encoded ready-to-concat slide segments (stored as files, see get_file/put_file)"""
+
+    @staticmethod
+    def key(image_hash, frames, encode_settings):
+        return hash_inputs(image_hash, frames, encode_settings)
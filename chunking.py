@@ -0,0 +1,89 @@
+"""
+S2V (Slides to Video) - Narration chunking
+Splits long slide narration at Vietnamese sentence boundaries into chunks under a
+character budget, so each chunk can be synthesized (and retried) on its own.
+"""
+
+import re
+
+# Sentence end: terminal punctuation, optional closing quotes/brackets, then whitespace
+SENTENCE_END = re.compile(r'(?<=[.!?…])["”’)\]]*\s+|\n\s*\n')
+
+# Abbreviations that end with a dot but do not end a sentence
+ABBREVIATIONS = ('tp.', 'v.v.', 'ths.', 'ts.', 'pgs.', 'gs.', 'tr.', 'vd.', 'e.g.', 'i.e.', 'etc.', 'mr.', 'dr.')
+
+# Clause breaks used when a single sentence is longer than the budget
+CLAUSE_END = re.compile(r'(?<=[,;:])\s+')
+
+
+def split_sentences(text):
+    """Split text into sentences, keeping abbreviations and lowercase continuations together."""
+    sentences = []
+    position = 0
+    for match in SENTENCE_END.finditer(text):
+        sentences.append(text[position:match.end()])
+        position = match.end()
+    sentences.append(text[position:])
+
+    merged = []
+    for sentence in sentences:
+        if not sentence.strip():
+            if merged:
+                merged[-1] += sentence
+            continue
+        if merged:
+            previous = merged[-1].rstrip().lower()
+            first = sentence.lstrip()[:1]
+            if previous.endswith(ABBREVIATIONS) or (first.isalpha() and first.islower()):
+                merged[-1] += sentence
+                continue
+        merged.append(sentence)
+
+    return [sentence.strip() for sentence in merged if sentence.strip()]
+
+
+def _split_long(sentence, max_chars):
+    """Split a sentence over the budget at clause breaks, then at spaces."""
+    parts = []
+    for clause in CLAUSE_END.split(sentence):
+        while len(clause) > max_chars:
+            cut = clause.rfind(' ', 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            parts.append(clause[:cut].strip())
+            clause = clause[cut:].strip()
+        if clause:
+            parts.append(clause)
+    return parts
+
+
+def chunk_text(text, max_chars):
+    """
+    Pack whole sentences into chunks of at most max_chars characters.
+
+    Returns:
+        List of chunks (a single chunk when the text already fits)
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    chunks = []
+    current = ""
+    for sentence in split_sentences(text):
+        pieces = [sentence] if len(sentence) <= max_chars else _split_long(sentence, max_chars)
+        for piece in pieces:
+            candidate = f"{current} {piece}" if current else piece
+            if len(candidate) <= max_chars:
+                current = candidate
+            else:
+                chunks.append(current)
+                current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def estimate_speech_seconds(text, chars_per_second):
+    """Estimate how long text takes to read aloud (used for stand-in audio in preview mode)."""
+    spoken = re.sub(r'\s+', ' ', text).strip()
+    return max(1.0, len(spoken) / chars_per_second)
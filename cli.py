@@ -9,8 +9,11 @@ import os
 import sys
 import time
 from pathlib import Path
-from main import GPTProcessor
 from config import Config
+from manifest import RunManifest
+from batch import find_pdf_files, run_batch, print_batch_report
+from encoder_probe import ENCODER_CANDIDATES, QUALITY_LEVELS
+from video_encoder import RENDITION_LADDER
 
 def validate_pdf_path(pdf_path):
     """Validate PDF file path"""
@@ -20,6 +23,14 @@ def validate_pdf_path(pdf_path):
         raise argparse.ArgumentTypeError(f"File is not a PDF: {pdf_path}")
     return pdf_path
 
+def validate_run_dir(run_dir):
+    """Validate a previous run folder for --resume"""
+    if not os.path.isdir(run_dir):
+        raise argparse.ArgumentTypeError(f"Run folder does not exist: {run_dir}")
+    if not RunManifest.exists(run_dir):
+        raise argparse.ArgumentTypeError(f"Run folder has no manifest.json: {run_dir}")
+    return run_dir
+
 def validate_positive_int(value):
     """Validate positive integer"""
     try:
@@ -30,6 +41,16 @@ def validate_positive_int(value):
     except ValueError:
         raise argparse.ArgumentTypeError(f"Invalid integer: {value}")
 
+def validate_non_negative_int(value):
+    """Validate non-negative integer"""
+    try:
+        ivalue = int(value)
+        if ivalue < 0:
+            raise argparse.ArgumentTypeError(f"Invalid non-negative integer: {value}")
+        return ivalue
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid integer: {value}")
+
 def create_parser():
     """Create argument parser"""
     parser = argparse.ArgumentParser(
@@ -57,6 +78,25 @@ Examples:
   
   # Production mode (optimized settings)
   python cli.py input.pdf --production
+  
+  # Re-generate an edited deck, reusing unchanged slides of a previous run
+  python cli.py edited.pdf --incremental ./output/run_20250101_120000_abcd1234
+  
+  # Batch mode: convert every PDF of a folder (or glob), 4 decks at a time
+  python cli.py --batch ./decks --jobs 4
+  python cli.py --batch "./decks/week_*.pdf"
+  
+  # Describe text-heavy slides from their text layer instead of full images
+  python cli.py input.pdf --description-mode hybrid
+  
+  # Resume a failed run (only unfinished steps are redone)
+  python cli.py --resume ./output/run_20250101_120000_abcd1234
+  
+  # Delete unreferenced artifacts and enforce the artifact store quota
+  python cli.py --gc
+  
+  # Predict time, cost and video size from earlier runs without converting
+  python cli.py input.pdf --estimate --pdf-batch 5 --tts-batch 3
         """
     )
     
@@ -64,7 +104,8 @@ Examples:
     parser.add_argument(
         'pdf_path',
         type=validate_pdf_path,
-        help='Path to the PDF file to convert'
+        nargs='?',
+        help='Path to the PDF file to convert (optional with --resume)'
     )
     
     # Optional arguments
@@ -89,12 +130,136 @@ Examples:
         help='Number of slides to process with TTS at once (default: 5, recommended: 1-5)'
     )
     
+    parser.add_argument(
+        '--description-mode',
+        choices=['vision', 'hybrid'],
+        help='How slides are sent for description: vision (slide images) or hybrid (text layer of '
+             'text-heavy slides, a small image for mixed slides, full images for figure slides)'
+    )
+    
+    parser.add_argument(
+        '--tts-workers',
+        type=validate_positive_int,
+        help='Concurrent TTS requests per deck (default: tts_workers from config, 4; '
+             'raises provider_concurrency["gemini_tts"] if that is lower)'
+    )
+    
+    parser.add_argument(
+        '--video-mode',
+        choices=['standard', 'static', 'vfr'],
+        help='Video frame rate mode: standard (video_fps), static (low constant frame rate) or '
+             'vfr (one frame per slide change); static/vfr encode much faster for slide decks'
+    )
+    
+    parser.add_argument(
+        '--encoder',
+        choices=['auto', *ENCODER_CANDIDATES],
+        help='Video encoder (default: video_encoder from config, auto = fastest working encoder, '
+             'probed once per host and cached)'
+    )
+    
+    parser.add_argument(
+        '--video-quality',
+        choices=list(QUALITY_LEVELS),
+        help='Quality level the auto encoder selection must meet (default: balanced)'
+    )
+    
+    parser.add_argument(
+        '--encode-workers',
+        type=validate_non_negative_int,
+        help='Slide segments encoded in parallel by ffmpeg (default: encode_workers from config, '
+             '0 = one per CPU core)'
+    )
+    
+    parser.add_argument(
+        '--renditions',
+        nargs='+',
+        choices=list(RENDITION_LADDER),
+        metavar='NAME',
+        help=f"Encode several renditions in one pass, sharing slide decoding and the audio encode "
+             f"(any of: {', '.join(RENDITION_LADDER)}; the first one is final_video.mp4)"
+    )
+    
+    parser.add_argument(
+        '--preview',
+        action='store_true',
+        help='Fast draft for checking slide/narration alignment: low-resolution frames, fastest encoder '
+             'preset and stand-in audio (see --preview-audio); slide timings match the final video '
+             'wherever real audio exists'
+    )
+    
+    parser.add_argument(
+        '--preview-audio',
+        choices=['tts', 'cached', 'silence'],
+        help='Audio of --preview drafts: real TTS, cached voice with estimated-length silence for '
+             'uncached slides (default), or silence only'
+    )
+    
+    parser.add_argument(
+        '--hls',
+        action='store_true',
+        help='Publish an HLS stream (hls/index.m3u8) that is playable as soon as the first '
+             'slide is ready and grows while the rest of the deck is processed'
+    )
+    
+    parser.add_argument(
+        '--dash',
+        action='store_true',
+        help='Also package the final video as DASH (dash/manifest.mpd, no re-encoding)'
+    )
+    
+    parser.add_argument(
+        '--no-segment-cache',
+        action='store_true',
+        help='Re-encode every slide instead of reusing cached video segments of unchanged slides'
+    )
+    
+    parser.add_argument(
+        '--gc',
+        action='store_true',
+        help='Garbage-collect the artifact store (and enforce its quota), then exit'
+    )
+    
+    parser.add_argument(
+        '--no-tts-cache',
+        action='store_true',
+        help='Always call Gemini TTS instead of reusing cached audio for unchanged text'
+    )
+    
     parser.add_argument(
         '--no-batch-splitting',
         action='store_true',
         help='Disable automatic audio batch splitting (not recommended for TTS batch > 1)'
     )
     
+    run_group = parser.add_mutually_exclusive_group()
+    run_group.add_argument(
+        '--resume',
+        type=validate_run_dir,
+        metavar='RUN_DIR',
+        help='Resume a previous run folder, skipping steps that already completed'
+    )
+    
+    run_group.add_argument(
+        '--incremental',
+        type=validate_run_dir,
+        metavar='PREV_RUN_DIR',
+        help='Only regenerate slides that changed since a previous run of this deck'
+    )
+    
+    run_group.add_argument(
+        '--batch',
+        type=str,
+        metavar='DIR_OR_GLOB',
+        help='Convert every PDF in a directory (or matching a glob) in one process'
+    )
+    
+    parser.add_argument(
+        '--jobs',
+        type=validate_positive_int,
+        help='Number of decks converted concurrently in batch mode (default: batch_jobs from config, 2)'
+    )
+    
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
@@ -134,6 +299,18 @@ Examples:
         help='Save current configuration to JSON file'
     )
     
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Validate arguments and show the configuration summary without converting anything'
+    )
+    
+    parser.add_argument(
+        '--estimate',
+        action='store_true',
+        help='Predict time per stage, API cost and output size from earlier runs without converting'
+    )
+    
     return parser
 
 def apply_preset(args):
@@ -159,15 +336,50 @@ def apply_preset(args):
         if args.verbose:
             print("🛡️ Safe mode: PDF=3, TTS=3, Batch splitting enabled")
 
+def apply_resume(args, parser):
+    """Reuse the settings of the run being resumed so its completed steps still match"""
+    if not args.resume:
+        if not args.pdf_path and not args.batch and not args.gc:
+            parser.error("pdf_path is required unless --resume, --batch or --gc is given")
+        return
+    
+    settings = RunManifest(args.resume).settings
+    if not args.pdf_path:
+        args.pdf_path = settings.get('pdf_path')
+        if not args.pdf_path or not os.path.exists(args.pdf_path):
+            parser.error(f"PDF of the resumed run is missing: {args.pdf_path}")
+    
+    args.pdf_batch = settings.get('pdf_batch_size', args.pdf_batch)
+    args.tts_batch = settings.get('tts_batch_size', args.tts_batch)
+    args.no_batch_splitting = not settings.get('use_batch_splitting', not args.no_batch_splitting)
+    args.incremental = settings.get('incremental_from')
+    args.output = os.path.dirname(os.path.abspath(args.resume))
+    if args.verbose:
+        print(f"🔁 Resuming run: {args.resume}")
+
 def print_summary(args):
     """Print configuration summary"""
     print("\n📋 CONFIGURATION SUMMARY")
     print("=" * 50)
-    print(f"📄 PDF File:            {args.pdf_path}")
+    if args.batch:
+        print(f"📚 Batch Source:        {args.batch} ({len(args.pdf_files)} PDFs)")
+        print(f"⚙️  Concurrent Jobs:     {args.jobs}")
+    else:
+        print(f"📄 PDF File:            {args.pdf_path}")
     print(f"📁 Output Folder:       {args.output}")
+    if args.resume:
+        print(f"🔁 Resume Run:          {args.resume}")
+    if args.incremental:
+        print(f"♻️  Incremental From:    {args.incremental}")
     print(f"📊 PDF Batch Size:      {args.pdf_batch}")
     print(f"🎤 TTS Batch Size:      {args.tts_batch}")
     print(f"🔪 Batch Splitting:     {'Disabled' if args.no_batch_splitting else 'Enabled'}")
+    if args.description_mode:
+        print(f"📝 Description Mode:    {args.description_mode}")
+    if args.tts_workers:
+        print(f"🔀 TTS Workers:         {args.tts_workers}")
+    if args.preview:
+        print(f"👀 Preview Draft:       Enabled (audio: {args.preview_audio or 'config'})")
     print(f"📢 Verbose Mode:        {'Enabled' if args.verbose else 'Disabled'}")
     
     # Workflow determination
@@ -176,6 +388,43 @@ def print_summary(args):
     print(f"🔄 Workflow:            {workflow}")
     print("=" * 50)
 
+def print_estimates(args, config):
+    """Print the estimate of every input deck, fitted to the runs below the output folder"""
+    from estimate import profile_deck, find_usage_files, fit_rates, estimate_run, print_estimate
+    
+    rates = fit_rates(find_usage_files([config.default_output_folder]), config.description_mode)
+    pdf_files = args.pdf_files if args.batch else [config.default_pdf_path]
+    totals = {'seconds': 0.0, 'cost': 0.0, 'video_bytes': 0.0}
+    for pdf_path in pdf_files:
+        if args.batch:
+            print(f"\n📄 {pdf_path}")
+        profile = profile_deck(pdf_path, config.description_mode)
+        estimate = estimate_run(profile, rates, config, config.pdf_batch_size, config.tts_batch_size,
+                                config.use_batch_splitting)
+        print_estimate(estimate, rates)
+        for key in totals:
+            totals[key] += estimate['totals'][key]
+    
+    if args.batch:
+        # Decks share the provider limits, so concurrent jobs overlap only partly; this is the best case
+        print(f"\n📚 Batch total: ${totals['cost']:.4f}, ~{totals['video_bytes'] / 1024 / 1024:.1f} MB video, "
+              f"{totals['seconds'] / 60:.1f} min sequential / "
+              f"{totals['seconds'] / max(1, args.jobs) / 60:.1f} min with {args.jobs} jobs")
+
+def collect_artifacts(config):
+    """Garbage-collect the artifact store and print what was freed"""
+    from artifacts import ArtifactStore
+    
+    store = ArtifactStore(os.path.join(config.cache_dir, 'artifacts'), config.artifact_store_max_mb * 1024 * 1024)
+    result = store.collect()
+    stats = store.stats()
+    print(f"🧹 Removed {result['removed']} unreferenced objects, released {result['released']} run files, "
+          f"freed {result['freed_bytes'] / 1024 / 1024:.1f} MB")
+    print(f"🗄️  Artifact store: {stats['objects']} objects, {stats['bytes'] / 1024 / 1024:.1f}/"
+          f"{stats['max_bytes'] / 1024 / 1024:.0f} MB, {stats['saved_bytes'] / 1024 / 1024:.1f} MB shared "
+          f"between {stats['runs']} runs")
+    return 0
+
 def main():
     """Main CLI function"""
     parser = create_parser()
@@ -183,6 +432,7 @@ def main():
     
     # Apply presets
     apply_preset(args)
+    apply_resume(args, parser)
     
     # Load configuration if specified
     config = Config()
@@ -191,12 +441,49 @@ def main():
         if args.verbose:
             print(f"✅ Configuration loaded from {args.config}")
     
+    if args.gc:
+        return collect_artifacts(config)
+    
+    # Batch mode: collect PDFs up front so the summary can show them
+    if args.batch:
+        args.jobs = args.jobs or config.batch_jobs
+        args.pdf_files = find_pdf_files(args.batch)
+        if not args.pdf_files:
+            print(f"❌ No PDF files found in: {args.batch}")
+            return 1
+    
     # Override config with CLI arguments
-    config.default_pdf_path = args.pdf_path
+    config.default_pdf_path = args.pdf_path or ""
     config.default_output_folder = args.output
     config.pdf_batch_size = args.pdf_batch
     config.tts_batch_size = args.tts_batch
     config.use_batch_splitting = not args.no_batch_splitting
+    if args.video_mode:
+        config.video_mode = args.video_mode
+    if args.encoder:
+        config.video_encoder = args.encoder
+    if args.video_quality:
+        config.video_quality = args.video_quality
+    if args.encode_workers is not None:
+        config.encode_workers = args.encode_workers
+    if args.renditions:
+        config.video_renditions = args.renditions
+    if args.description_mode:
+        config.description_mode = args.description_mode
+    if args.preview:
+        config.preview = True
+    if args.preview_audio:
+        config.preview_audio = args.preview_audio
+    if args.hls:
+        config.hls_output = True
+    if args.dash:
+        config.dash_output = True
+    if args.no_segment_cache:
+        config.segment_cache = False
+    if args.no_tts_cache:
+        config.tts_cache = False
+    if args.tts_workers:
+        config.set_tts_workers(args.tts_workers)
     
     # Save configuration if specified
     if args.save_config:
@@ -215,6 +502,16 @@ def main():
     # Print configuration summary
     print_summary(args)
     
+    if args.dry_run:
+        missing = [name for name, key in zip(('OpenAI', 'Anthropic', 'Gemini'), config.get_api_keys()) if not key]
+        print(f"🔑 API Keys:            {'Missing ' + ', '.join(missing) if missing else 'Found'}")
+        print("\n🧪 Dry run: nothing was converted.")
+        return 0 if not missing else 1
+    
+    if args.estimate:
+        print_estimates(args, config)
+        return 0
+    
     # Confirm execution (skip in non-interactive mode)
     if sys.stdin.isatty():  # Only ask if running interactively
         try:
@@ -233,54 +530,58 @@ def main():
         if args.verbose:
             print("\n🔧 Initializing AI processor...")
         
-        processor = GPTProcessor(*config.get_api_keys())
+        from main import GPTProcessor  # Loads the provider SDKs
+        processor = GPTProcessor(*config.get_api_keys(), config=config)
+        
+        if args.batch:
+            report = run_batch(
+                processor,
+                args.pdf_files,
+                config.default_output_folder,
+                args.jobs,
+                config.pdf_batch_size,
+                config.tts_batch_size,
+                config.use_batch_splitting
+            )
+            print_batch_report(report)
+            return 0 if report['failed'] == 0 else 1
         
-        # Create output folder with timestamp
-        output_folder = processor.create_random_output_folder(config.default_output_folder)
+        # Create output folder with timestamp (or reuse the resumed run folder)
+        if args.resume:
+            output_folder = args.resume
+        else:
+            output_folder = processor.create_random_output_folder(config.default_output_folder)
         
         if args.verbose:
-            print(f"📁 Output folder created: {output_folder}")
+            print(f"📁 Output folder: {output_folder}")
         
         print(f"\n🎬 Starting PDF to Video conversion...")
         start_time = time.time()
         
         # Choose workflow
         use_batch_splitting = config.use_batch_splitting and config.tts_batch_size > 1
-        
-        if use_batch_splitting:
-            if args.verbose:
+        if args.verbose:
+            if use_batch_splitting:
                 print("🔄 Using Batch TTS + Audio Splitting workflow")
-            
-            video_path, audio_files, durations = processor.test_workflow_with_batch_splitting(
+            else:
+                print("🔄 Using Individual Slide Processing workflow")
+        
+        if args.incremental:
+            video_path, audio_files, durations = processor.run_incremental_workflow(
                 config.default_pdf_path,
+                args.incremental,
                 output_folder,
                 config.pdf_batch_size,
-                config.tts_batch_size
+                config.tts_batch_size,
+                config.use_batch_splitting
             )
         else:
-            if args.verbose:
-                print("🔄 Using Individual Slide Processing workflow")
-            
-            # Process PDF
-            print("📄 Processing PDF slides...")
-            descriptions_file, image_files = processor.process_pdf_to_descriptions(
-                config.default_pdf_path, output_folder, config.pdf_batch_size
-            )
-            
-            # Process with Claude
-            print("🤖 Enhancing content with Claude AI...")
-            final_context_file = processor.process_with_claude(descriptions_file, output_folder)
-            
-            # Generate audio
-            print("🎤 Generating Vietnamese audio...")
-            audio_files, vietnamese_descriptions, translated_file = processor.generate_vietnamese_audio(
-                final_context_file, output_folder, tts_batch_size=1
-            )
-            
-            # Create video
-            print("🎥 Creating final video...")
-            video_path, durations = processor.create_video_with_audio(
-                image_files, audio_files, output_folder
+            video_path, audio_files, durations = processor.run_workflow(
+                config.default_pdf_path,
+                output_folder,
+                config.pdf_batch_size,
+                config.tts_batch_size,
+                config.use_batch_splitting
             )
         
         end_time = time.time()
@@ -303,6 +604,8 @@ def main():
             avg_per_slide = processing_time / len(durations)
             print(f"⚡ Avg per slide:        {avg_per_slide:.2f} seconds")
         
+        processor.usage.print_summary()
+        
         print("\n✅ You can find all generated files in the output folder above.")
         return 0
         
@@ -322,6 +625,9 @@ def main():
         print("   - Ensure PDF file is readable")
         print("   - Check available disk space")
         print("   - Try reducing batch sizes if memory issues occur")
+        if 'output_folder' in locals():
+            print(f"\n🔁 Resume later without redoing finished steps:")
+            print(f"   python cli.py --resume {output_folder}")
         return 1
 
 if __name__ == "__main__":
@@ -0,0 +1,100 @@
+"""
+S2V (Slides to Video) - Provider clients
+One lazily created client per provider and API key, shared by every stage, thread
+and deck in the process. Each client keeps an HTTP connection pool sized to the
+concurrency limits of the providers it serves (see limits.py), with keep-alive,
+so concurrent requests reuse connections instead of opening new sockets and TLS
+sessions.
+"""
+
+import threading
+
+KEEPALIVE_SECONDS = 60.0  # Idle pooled connections are kept this long
+
+# Provider limit slots served by each client (its pool holds one connection per slot)
+CLIENT_PROVIDERS = {
+    'openai': ('whisper',),            # OpenAI SDK: Whisper transcription, OpenAI TTS
+    'http': ('openai',),               # requests session: GPT vision chat completions
+    'anthropic': ('anthropic',),       # Claude refinement
+    'gemini': ('gemini', 'gemini_tts'),  # Gemini translation and TTS
+}
+
+# (client name, API key) -> client, shared by every registry in the process
+_clients = {}
+_lock = threading.Lock()
+
+
+def _httpx_limits(pool_size, keepalive):
+    import httpx
+    return httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size,
+                        keepalive_expiry=keepalive)
+
+
+class ClientRegistry:
+    """Lazy, process-wide provider clients with pooled keep-alive connections"""
+
+    def __init__(self, openai_api_key, anthropic_api_key, gemini_api_key, limits=None,
+                 keepalive=KEEPALIVE_SECONDS):
+        """
+        Args:
+            openai_api_key, anthropic_api_key, gemini_api_key: Provider API keys
+            limits: ProviderLimits whose concurrency sizes the connection pools
+            keepalive: Seconds idle connections stay open
+        """
+        self.api_keys = {
+            'openai': openai_api_key,
+            'http': openai_api_key,
+            'anthropic': anthropic_api_key,
+            'gemini': gemini_api_key
+        }
+        self.limits = limits
+        self.keepalive = keepalive
+
+    def pool_size(self, name):
+        """Return the number of pooled connections of a client (one per concurrency slot it serves)."""
+        if self.limits is None:
+            return 10
+        return max(1, sum(self.limits.concurrency.get(provider, 1) for provider in CLIENT_PROVIDERS[name]))
+
+    def _get(self, name, create):
+        key = (name, self.api_keys[name])
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = create(self.api_keys[name], self.pool_size(name))
+        return client
+
+    def openai(self):
+        """OpenAI SDK client (Whisper, OpenAI TTS)."""
+        def create(api_key, pool_size):
+            import openai
+            http_client = openai.DefaultHttpxClient(limits=_httpx_limits(pool_size, self.keepalive))
+            return openai.OpenAI(api_key=api_key, http_client=http_client)
+        return self._get('openai', create)
+
+    def anthropic(self):
+        """Anthropic SDK client (Claude)."""
+        def create(api_key, pool_size):
+            import anthropic
+            http_client = anthropic.DefaultHttpxClient(limits=_httpx_limits(pool_size, self.keepalive))
+            return anthropic.Anthropic(api_key=api_key, http_client=http_client)
+        return self._get('anthropic', create)
+
+    def gemini(self):
+        """Google GenAI client (Gemini translation and TTS)."""
+        def create(api_key, pool_size):
+            from google import genai
+            from google.genai import types
+            http_options = types.HttpOptions(client_args={'limits': _httpx_limits(pool_size, self.keepalive)})
+            return genai.Client(api_key=api_key, http_options=http_options)
+        return self._get('gemini', create)
+
+    def http(self):
+        """requests session for raw REST calls (GPT vision)."""
+        def create(api_key, pool_size):
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+            return session
+        return self._get('http', create)
@@ -2,6 +2,7 @@ import os
 from typing import Dict, Any
 import json
 from dotenv import load_dotenv
+from limits import DEFAULT_PROVIDER_CONCURRENCY
 
 class Config:
     """Configuration class for S2V (Slides to Video) application"""
@@ -23,10 +24,59 @@ class Config:
         self.pdf_batch_size = 5
         self.tts_batch_size = 5
         self.use_batch_splitting = True
+        self.description_mode = "vision"  # "vision" (slide images) or "hybrid" (text layer of text-heavy slides)
         
         # Video settings
         self.video_fps = 24
+        self.video_mode = "standard"  # "standard" (video_fps), "static" (static_fps) or "vfr" (one frame per slide)
+        self.static_fps = 2  # Frame rate of the "static" mode
+        self.keyframe_interval = 10  # Maximum seconds between keyframes (seeking)
+        self.video_encoder = "auto"  # "auto" probes encoders once per host, or a name from encoder_probe.py
+        self.video_quality = "balanced"  # "fast", "balanced" or "high" (limits which encoders auto may pick)
         self.audio_rate = 24000
+        self.encode_workers = 0  # Slide segments encoded in parallel (0 = one per CPU core)
+        self.video_renditions = []  # e.g. ["1080p", "720p", "mobile"]: all encoded in one pass (default: one video)
+        self.preview = False  # Draft video: preview_height frames, fastest preset, optional stand-in audio
+        self.preview_height = 360
+        self.preview_audio = "cached"  # "tts" (real TTS), "cached" (TTS cache, else silence) or "silence"
+        self.preview_chars_per_second = 14  # Speaking rate used to size stand-in silence
+        self.hls_output = False  # Publish hls/index.m3u8 slide by slide while audio is still generated
+        self.dash_output = False  # Also package the final video as dash/manifest.mpd
+        
+        # TTS settings
+        self.tts_workers = 4  # Concurrent Gemini TTS requests per deck
+        self.tts_max_retries = 3  # Retries per slide before the run fails (resume redoes only failed slides)
+        self.tts_retry_delay = 2.0  # Seconds before the first retry, doubled on every retry
+        self.tts_chunk_chars = 1000  # Longer slide narration is synthesized in sentence chunks
+        self.tts_crossfade_ms = 30  # Crossfade between joined chunks
+        self.transcribe_workers = 4  # Concurrent Whisper transcriptions when splitting batch audio
+        self.local_segmentation = True  # Split batch audio offline, Whisper only as fallback
+        self.segmentation_min_confidence = 0.6  # Below this the local split falls back to Whisper
+        
+        # Cache settings (shared by all runs on this machine)
+        self.cache_dir = "~/.cache/s2v"
+        self.tts_cache = True  # Reuse synthesized audio for unchanged narration text
+        self.tts_cache_max_mb = 2048  # Least recently used entries are evicted above this size
+        self.segment_cache = True  # Reuse encoded video segments of unchanged slides
+        self.segment_cache_max_mb = 4096
+        self.artifact_store = True  # Store run outputs once by content, hard-linked into run folders
+        self.artifact_store_max_mb = 20480  # Above this, intermediates of the oldest idle runs are released
+        
+        # Audio post-processing (applied to every slide before it is written)
+        self.audio_postprocess = True
+        self.audio_silence_db = -35.0  # Silence threshold in dB below the speech level
+        self.audio_edge_padding = 0.15  # Seconds of silence kept at the start and end of a slide
+        self.audio_max_pause = 1.0  # Longer internal pauses are shortened to this (0 disables)
+        self.audio_target_dbfs = -20.0  # Speech loudness target for every slide (null disables)
+        
+        # Batch / concurrency settings
+        self.batch_jobs = 2  # Number of decks converted concurrently in batch mode
+        self.provider_concurrency = {}  # e.g. {"gemini_tts": 8}, see limits.py for defaults
+        self.provider_rpm = {}  # Optional requests-per-minute limits, e.g. {"anthropic": 50}
+        self.http_keepalive_seconds = 60  # Idle pooled API connections stay open this long
+        
+        # Usage accounting (usage.json in every run folder)
+        self.model_prices = {}  # Price overrides in USD, e.g. {"gpt-4.1-mini": {"input": 0.4, "output": 1.6}}
         
         # Load from config file if exists
         self.load_from_file()
@@ -54,8 +104,47 @@ class Config:
             'pdf_batch_size': self.pdf_batch_size,
             'tts_batch_size': self.tts_batch_size,
             'use_batch_splitting': self.use_batch_splitting,
+            'description_mode': self.description_mode,
             'video_fps': self.video_fps,
-            'audio_rate': self.audio_rate
+            'video_mode': self.video_mode,
+            'static_fps': self.static_fps,
+            'keyframe_interval': self.keyframe_interval,
+            'video_encoder': self.video_encoder,
+            'video_quality': self.video_quality,
+            'audio_rate': self.audio_rate,
+            'encode_workers': self.encode_workers,
+            'video_renditions': self.video_renditions,
+            'preview': self.preview,
+            'preview_height': self.preview_height,
+            'preview_audio': self.preview_audio,
+            'preview_chars_per_second': self.preview_chars_per_second,
+            'hls_output': self.hls_output,
+            'dash_output': self.dash_output,
+            'tts_workers': self.tts_workers,
+            'tts_max_retries': self.tts_max_retries,
+            'tts_retry_delay': self.tts_retry_delay,
+            'tts_chunk_chars': self.tts_chunk_chars,
+            'tts_crossfade_ms': self.tts_crossfade_ms,
+            'transcribe_workers': self.transcribe_workers,
+            'local_segmentation': self.local_segmentation,
+            'segmentation_min_confidence': self.segmentation_min_confidence,
+            'cache_dir': self.cache_dir,
+            'tts_cache': self.tts_cache,
+            'tts_cache_max_mb': self.tts_cache_max_mb,
+            'segment_cache': self.segment_cache,
+            'segment_cache_max_mb': self.segment_cache_max_mb,
+            'artifact_store': self.artifact_store,
+            'artifact_store_max_mb': self.artifact_store_max_mb,
+            'audio_postprocess': self.audio_postprocess,
+            'audio_silence_db': self.audio_silence_db,
+            'audio_edge_padding': self.audio_edge_padding,
+            'audio_max_pause': self.audio_max_pause,
+            'audio_target_dbfs': self.audio_target_dbfs,
+            'batch_jobs': self.batch_jobs,
+            'provider_concurrency': self.provider_concurrency,
+            'provider_rpm': self.provider_rpm,
+            'http_keepalive_seconds': self.http_keepalive_seconds,
+            'model_prices': self.model_prices
         }
         
         try:
@@ -69,6 +158,13 @@ class Config:
         """Get API keys tuple"""
         return (self.openai_api_key, self.anthropic_api_key, self.gemini_api_key)
     
+    def set_tts_workers(self, workers):
+        """Set tts_workers, raising provider_concurrency["gemini_tts"] so that many requests can run"""
+        self.tts_workers = workers
+        limit = self.provider_concurrency.get('gemini_tts', DEFAULT_PROVIDER_CONCURRENCY['gemini_tts'])
+        if workers > limit:
+            self.provider_concurrency = dict(self.provider_concurrency, gemini_tts=workers)
+    
     def to_dict(self):
         """Convert config to dictionary"""
         return {
@@ -77,6 +173,45 @@ class Config:
             'pdf_batch_size': self.pdf_batch_size,
             'tts_batch_size': self.tts_batch_size,
             'use_batch_splitting': self.use_batch_splitting,
+            'description_mode': self.description_mode,
             'video_fps': self.video_fps,
-            'audio_rate': self.audio_rate
+            'video_mode': self.video_mode,
+            'static_fps': self.static_fps,
+            'keyframe_interval': self.keyframe_interval,
+            'video_encoder': self.video_encoder,
+            'video_quality': self.video_quality,
+            'audio_rate': self.audio_rate,
+            'encode_workers': self.encode_workers,
+            'video_renditions': self.video_renditions,
+            'preview': self.preview,
+            'preview_height': self.preview_height,
+            'preview_audio': self.preview_audio,
+            'preview_chars_per_second': self.preview_chars_per_second,
+            'hls_output': self.hls_output,
+            'dash_output': self.dash_output,
+            'tts_workers': self.tts_workers,
+            'tts_max_retries': self.tts_max_retries,
+            'tts_retry_delay': self.tts_retry_delay,
+            'tts_chunk_chars': self.tts_chunk_chars,
+            'tts_crossfade_ms': self.tts_crossfade_ms,
+            'transcribe_workers': self.transcribe_workers,
+            'local_segmentation': self.local_segmentation,
+            'segmentation_min_confidence': self.segmentation_min_confidence,
+            'cache_dir': self.cache_dir,
+            'tts_cache': self.tts_cache,
+            'tts_cache_max_mb': self.tts_cache_max_mb,
+            'segment_cache': self.segment_cache,
+            'segment_cache_max_mb': self.segment_cache_max_mb,
+            'artifact_store': self.artifact_store,
+            'artifact_store_max_mb': self.artifact_store_max_mb,
+            'audio_postprocess': self.audio_postprocess,
+            'audio_silence_db': self.audio_silence_db,
+            'audio_edge_padding': self.audio_edge_padding,
+            'audio_max_pause': self.audio_max_pause,
+            'audio_target_dbfs': self.audio_target_dbfs,
+            'batch_jobs': self.batch_jobs,
+            'provider_concurrency': self.provider_concurrency,
+            'provider_rpm': self.provider_rpm,
+            'http_keepalive_seconds': self.http_keepalive_seconds,
+            'model_prices': self.model_prices
         } 
\ No newline at end of file
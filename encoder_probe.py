@@ -0,0 +1,133 @@
+"""
+S2V (Slides to Video) - Encoder probe
+Finds the fastest video encoder that actually works on this host for the
+requested quality by encoding a tiny test clip with every candidate, and caches
+the result per host so later runs pick it without probing again.
+"""
+
+import json
+import os
+import re
+import socket
+import subprocess
+import time
+from video_encoder import run_ffmpeg
+
+QUALITY_LEVELS = ('fast', 'balanced', 'high')
+
+# name -> (codec arguments, highest quality level the configuration is good for)
+ENCODER_CANDIDATES = {
+    'libx264-ultrafast': (['-c:v', 'libx264', '-preset', 'ultrafast', '-tune', 'stillimage', '-crf', '23'], 'fast'),
+    'libx264-veryfast': (['-c:v', 'libx264', '-preset', 'veryfast', '-tune', 'stillimage', '-crf', '23'], 'balanced'),
+    'libx264-fast': (['-c:v', 'libx264', '-preset', 'fast', '-tune', 'stillimage', '-crf', '23'], 'high'),
+    'libx265-fast': (['-c:v', 'libx265', '-preset', 'fast', '-crf', '28', '-tag:v', 'hvc1'], 'high'),
+    'libopenh264': (['-c:v', 'libopenh264', '-b:v', '2M'], 'fast'),
+    'h264_nvenc': (['-c:v', 'h264_nvenc', '-preset', 'p4', '-cq', '23'], 'balanced'),
+    'h264_qsv': (['-c:v', 'h264_qsv', '-global_quality', '23'], 'balanced'),
+    'h264_videotoolbox': (['-c:v', 'h264_videotoolbox', '-b:v', '4M'], 'balanced'),
+}
+
+PROBE_CACHE_FILE = "encoder_probe.json"
+PROBE_SOURCE = ['-f', 'lavfi', '-i', 'testsrc2=size=1280x720:rate=24', '-frames:v', '48', '-pix_fmt', 'yuv420p']
+
+
+def available_encoders(ffmpeg):
+    """Return the names of the video encoders compiled into ffmpeg."""
+    result = subprocess.run([ffmpeg, '-hide_banner', '-encoders'], capture_output=True, text=True)
+    return set(re.findall(r'^\s*V\S*\s+(\S+)', result.stdout, re.MULTILINE))
+
+
+def eligible_candidates(quality):
+    """Return candidate names good enough for the requested quality level."""
+    if quality not in QUALITY_LEVELS:
+        raise ValueError(f"Unknown video quality: {quality} (expected one of {', '.join(QUALITY_LEVELS)})")
+    rank = QUALITY_LEVELS.index(quality)
+    return [name for name, (_, level) in ENCODER_CANDIDATES.items() if QUALITY_LEVELS.index(level) >= rank]
+
+
+def probe_encoders(ffmpeg, names, work_dir):
+    """
+    Encode a tiny test clip with every candidate.
+
+    Returns:
+        dict name -> seconds taken (only candidates that produced a valid file)
+    """
+    compiled = available_encoders(ffmpeg)
+    timings = {}
+    os.makedirs(work_dir, exist_ok=True)
+    for name in names:
+        codec_args, _ = ENCODER_CANDIDATES[name]
+        if codec_args[1] not in compiled:
+            continue
+        output_file = os.path.join(work_dir, f"probe_{os.getpid()}_{name}.mp4")
+        start = time.perf_counter()
+        try:
+            run_ffmpeg(ffmpeg, [*PROBE_SOURCE, *codec_args, '-an', output_file])
+            if os.path.getsize(output_file) > 0:
+                timings[name] = time.perf_counter() - start
+        except (RuntimeError, OSError):
+            pass
+        finally:
+            if os.path.exists(output_file):
+                os.remove(output_file)
+    return timings
+
+
+def _cache_key(ffmpeg):
+    # Per host (cache_dir may be a shared home directory) and per ffmpeg build
+    try:
+        build = int(os.path.getmtime(ffmpeg))
+    except OSError:
+        build = 0
+    return f"{socket.gethostname()}|{os.path.realpath(ffmpeg)}|{build}"
+
+
+def select_encoder(ffmpeg, quality='balanced', override=None, cache_dir=None):
+    """
+    Pick the video encoder configuration to use.
+
+    Args:
+        ffmpeg: ffmpeg executable
+        quality: 'fast', 'balanced' or 'high'
+        override: Candidate name (or 'auto') to skip probing
+        cache_dir: Directory of the per-host probe cache (None disables caching)
+
+    Returns:
+        tuple: (name, codec arguments)
+    """
+    if override and override != 'auto':
+        if override not in ENCODER_CANDIDATES:
+            raise ValueError(f"Unknown encoder: {override} (expected auto or one of {', '.join(ENCODER_CANDIDATES)})")
+        return override, ENCODER_CANDIDATES[override][0]
+
+    cache_file = os.path.join(os.path.expanduser(cache_dir), PROBE_CACHE_FILE) if cache_dir else None
+    cache = {}
+    if cache_file and os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+
+    key = _cache_key(ffmpeg)
+    entry = cache.get(key, {}).get(quality)
+    if entry and entry.get('encoder') in ENCODER_CANDIDATES:
+        return entry['encoder'], ENCODER_CANDIDATES[entry['encoder']][0]
+
+    print(f"🔎 Probing video encoders for '{quality}' quality...")
+    work_dir = os.path.dirname(cache_file) if cache_file else os.getcwd()
+    timings = probe_encoders(ffmpeg, eligible_candidates(quality), work_dir)
+    if not timings:
+        raise RuntimeError("No working video encoder found (is ffmpeg built with libx264?)")
+
+    name = min(timings, key=timings.get)
+    print(f"✅ Using {name} ({', '.join(f'{n}: {t:.2f}s' for n, t in sorted(timings.items(), key=lambda i: i[1]))})")
+
+    if cache_file:
+        cache.setdefault(key, {})[quality] = {'encoder': name, 'timings': timings}
+        tmp_path = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, cache_file)
+
+    return name, ENCODER_CANDIDATES[name][0]
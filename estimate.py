@@ -0,0 +1,295 @@
+"""
+S2V (Slides to Video) - Run estimator
+Predicts the requests, wall-clock time per stage, API cost and output size of a
+conversion before anything is spent. The deck is profiled with PyMuPDF (pages,
+text volume, image tokens) and per-stage rates are fitted to the usage.json files
+of earlier runs; stages without history fall back to built-in defaults.
+"""
+
+import glob
+import math
+import os
+from collections import defaultdict
+from usage import USAGE_FILE, MODEL_PRICES, STAGES, estimate_cost, merged_seconds
+from text_layer import analyze_deck, input_tokens
+
+METRICS = ('input_tokens', 'cached_tokens', 'output_tokens', 'audio_seconds', 'seconds')
+
+# Per-call rates without history: metric -> (per call, per slide); describe input is
+# completed with the deck's image tokens (profile_deck)
+DEFAULT_RATES = {
+    'describe': {'input_tokens': (700, 0), 'output_tokens': (0, 350), 'seconds': (2.0, 4.0)},
+    'refine': {'input_tokens': (900, 350), 'output_tokens': (0, 300), 'seconds': (3.0, 6.0)},
+    'translate': {'input_tokens': (30, 300), 'output_tokens': (0, 400), 'seconds': (2.0, 1.5)},
+    'tts': {'input_tokens': (10, 250), 'output_tokens': (0, 1125), 'audio_seconds': (0, 45), 'seconds': (3.0, 10.0)},
+    'transcribe': {'audio_seconds': (0, 45), 'seconds': (2.0, 1.0)},
+}
+DEFAULT_LOCAL_RATES = {
+    'image_seconds_per_slide': 0.3,
+    'video_seconds_per_video_second': 0.05,  # Encode time per second of video
+    'video_bytes_per_second': 50_000
+}
+
+
+def profile_deck(pdf_path, description_mode='vision'):
+    """
+    Measure a deck without converting it.
+
+    Args:
+        description_mode: Config.description_mode, decides which slide input is counted
+
+    Returns:
+        dict with pages, text_chars, images (embedded pictures) and image_tokens (the
+        describe input of all slides: rendered images, or text layers in hybrid mode)
+    """
+    import fitz  # PyMuPDF
+    pdf_document = fitz.open(pdf_path)
+    images = sum(len(page.get_images()) for page in pdf_document)
+    pdf_document.close()
+    slides = analyze_deck(pdf_path)
+    slide_tokens = [input_tokens(slide)[1 if description_mode == 'hybrid' else 0] for slide in slides]
+    return {
+        'pages': len(slides),
+        'text_chars': sum(len(slide['text']) for slide in slides),
+        'images': images,
+        'image_tokens': sum(slide_tokens)
+    }
+
+
+def find_usage_files(folders):
+    """Return the usage.json files of earlier (non-preview) runs below the given folders."""
+    import json
+    history = []
+    for folder in folders:
+        for path in glob.glob(os.path.join(folder, '**', USAGE_FILE), recursive=True):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Skipping unreadable usage file {path}: {e}")
+                continue
+            if data.get('records') and not data.get('settings', {}).get('preview'):
+                history.append(data)
+    return history
+
+
+def _calls(records):
+    """Group records of the same stage and slides (retries, TTS chunks) into one logical call."""
+    calls = defaultdict(list)
+    for record in records:
+        calls[(record['stage'], tuple(record['slides']))].append(record)
+
+    grouped = []
+    for (stage, slides), group in calls.items():
+        call = {'stage': stage, 'slides': max(1, len(slides)), 'requests': len(group)}
+        for metric in METRICS[:-1]:
+            call[metric] = sum(record[metric] for record in group)
+        call['seconds'] = merged_seconds([(record['started'], record['ended']) for record in group])
+        grouped.append(call)
+    return grouped
+
+
+def _fit(points):
+    """Least-squares (per call, per slide) fit of (slides, value) points, never negative."""
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x > 0:
+        per_slide = sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+        per_call = mean_y - per_slide * mean_x
+        if per_slide >= 0 and per_call >= 0:
+            return per_call, per_slide
+    # One batch size only (or a degenerate fit): proportional to the slide count
+    return 0.0, mean_y / mean_x if mean_x else 0.0
+
+
+def fit_rates(history, description_mode='vision'):
+    """
+    Fit per-stage rates to the records of earlier runs.
+
+    The describe input depends on how slides are sent, so describe rates are only
+    fitted to runs of the same description_mode (Config.description_mode).
+
+    Returns:
+        dict with 'stages' (stage -> metric -> (per call, per slide)), 'requests_per_call',
+        'models', 'transcribe_fraction', 'local' rates and 'runs' (number of runs used)
+    """
+    calls = defaultdict(list)
+    models = {}
+    for data in history:
+        same_mode = data.get('settings', {}).get('description_mode', 'vision') == description_mode
+        for call in _calls(data['records']):
+            if call['stage'] == 'describe' and not same_mode:
+                continue
+            calls[call['stage']].append(call)
+        for name, stage in data.get('stages', {}).items():
+            if stage.get('models'):
+                models[name] = stage['models'][-1]
+
+    stages = {name: dict(rates) for name, rates in DEFAULT_RATES.items()}
+    requests_per_call = {}
+    for name, stage_calls in calls.items():
+        stages[name] = {metric: _fit([(call['slides'], call[metric]) for call in stage_calls]) for metric in METRICS}
+        requests_per_call[name] = sum(call['requests'] for call in stage_calls) / len(stage_calls)
+
+    # Share of batch TTS calls that needed Whisper to split their audio
+    batch_calls = sum(1 for call in calls.get('tts', []) if call['slides'] > 1)
+    transcribe_fraction = len(calls.get('transcribe', [])) / batch_calls if batch_calls else None
+
+    local = dict(DEFAULT_LOCAL_RATES)
+    image_runs = [data['local_stages']['images'] for data in history if 'images' in data.get('local_stages', {})]
+    if image_runs:
+        local['image_seconds_per_slide'] = (sum(r['seconds'] for r in image_runs)
+                                            / max(1, sum(r['slides'] for r in image_runs)))
+    video_runs = [data['local_stages']['video'] for data in history
+                  if data.get('local_stages', {}).get('video', {}).get('video_seconds')]
+    if video_runs:
+        video_seconds = sum(r['video_seconds'] for r in video_runs)
+        local['video_seconds_per_video_second'] = sum(r['seconds'] for r in video_runs) / video_seconds
+        local['video_bytes_per_second'] = sum(r['video_bytes'] for r in video_runs) / video_seconds
+
+    return {
+        'stages': stages,
+        'requests_per_call': requests_per_call,
+        'models': models,
+        'transcribe_fraction': transcribe_fraction,
+        'local': local,
+        'runs': len(history),
+        'fitted': sorted(calls)
+    }
+
+
+def _batches(total, size):
+    """Slide counts of the calls that cover total slides in batches of size."""
+    size = max(1, size)
+    return [min(size, total - start) for start in range(0, total, size)]
+
+
+def _parallel_seconds(latencies, workers):
+    """Approximate wall time of calls spread over a pool of workers."""
+    if not latencies:
+        return 0.0
+    return max(sum(latencies) / max(1, workers), max(latencies))
+
+
+def estimate_run(profile, rates, config, pdf_batch_size, tts_batch_size, use_batch_splitting):
+    """
+    Predict a conversion of a profiled deck.
+
+    Args:
+        profile: profile_deck() result
+        rates: fit_rates() result
+        config: Config (prices, workers, provider concurrency, segmentation)
+
+    Returns:
+        dict with 'stages' (stage -> requests, tokens, audio, seconds, cost) and 'totals'
+        (seconds, cost, cost per slide, video seconds, video and audio bytes)
+    """
+    from main import VISION_MODEL, CLAUDE_MODEL, TRANSLATION_MODEL, WHISPER_MODEL, TTS_MODEL, CLAUDE_BATCH_SIZE
+    from limits import DEFAULT_PROVIDER_CONCURRENCY
+
+    slides = profile['pages']
+    prices = {model: dict(p) for model, p in MODEL_PRICES.items()}
+    for model, p in config.model_prices.items():
+        prices.setdefault(model, {}).update(p)
+    concurrency = dict(DEFAULT_PROVIDER_CONCURRENCY, **config.provider_concurrency)
+    default_models = {'describe': VISION_MODEL, 'refine': CLAUDE_MODEL, 'translate': TRANSLATION_MODEL,
+                      'tts': TTS_MODEL, 'transcribe': WHISPER_MODEL}
+
+    tts_batch_size = tts_batch_size if use_batch_splitting else 1
+    tts_batches = _batches(slides, tts_batch_size)
+    transcribe_fraction = rates['transcribe_fraction']
+    if transcribe_fraction is None:
+        transcribe_fraction = 0.0 if config.local_segmentation else 1.0
+    batch_tts_calls = sum(1 for size in tts_batches if size > 1)
+    transcribe_calls = math.ceil(batch_tts_calls * transcribe_fraction)
+
+    calls = {
+        'describe': _batches(slides, pdf_batch_size),
+        'refine': _batches(slides, CLAUDE_BATCH_SIZE),
+        'translate': [slides] if slides else [],
+        'tts': tts_batches,
+        # Whisper transcribes a whole batch of slides
+        'transcribe': [tts_batch_size] * transcribe_calls
+    }
+
+    stages = {}
+    for name in STAGES:
+        stage_rates = rates['stages'][name]
+        predicted = {metric: 0.0 for metric in METRICS}
+        latencies = []
+        for size in calls[name]:
+            for metric in METRICS:
+                per_call, per_slide = stage_rates.get(metric, (0, 0))
+                value = per_call + per_slide * size
+                if name == 'describe' and metric == 'input_tokens' and name not in rates['fitted']:
+                    value += profile['image_tokens'] / slides * size
+                if metric == 'seconds':
+                    latencies.append(value)
+                else:
+                    predicted[metric] += value
+        model = rates['models'].get(name, default_models[name])
+        predicted['cost'] = estimate_cost(prices.get(model), predicted['input_tokens'], predicted['cached_tokens'],
+                                          predicted['output_tokens'], predicted['audio_seconds'])
+        predicted['requests'] = len(calls[name]) * rates['requests_per_call'].get(name, 1.0)
+        predicted['model'] = model
+        predicted['seconds'] = latencies
+        stages[name] = predicted
+
+    # Describe and refine batches depend on the previous batch, so they run one after another
+    for name in ('describe', 'refine', 'translate'):
+        stages[name]['seconds'] = sum(stages[name]['seconds'])
+    tts_workers = min(config.tts_workers, concurrency.get('gemini_tts', 1))
+    tts_seconds = _parallel_seconds(stages['tts']['seconds'], tts_workers)
+    transcribe_seconds = _parallel_seconds(stages['transcribe']['seconds'],
+                                           min(config.transcribe_workers, concurrency.get('whisper', 1)))
+    stages['tts']['seconds'] = tts_seconds
+    # Batches are transcribed while later batches are still being synthesized
+    stages['transcribe']['seconds'] = max(0.0, transcribe_seconds - tts_seconds)
+
+    local = rates['local']
+    video_seconds = stages['tts']['audio_seconds']
+    stages['images'] = {'seconds': slides * local['image_seconds_per_slide'], 'requests': 0, 'cost': 0.0}
+    stages['video'] = {'seconds': video_seconds * local['video_seconds_per_video_second'], 'requests': 0,
+                       'cost': 0.0}
+
+    cost = sum(stage['cost'] for stage in stages.values())
+    order = ('images', *STAGES, 'video')
+    return {
+        'profile': profile,
+        'stages': {name: stages[name] for name in order},
+        'totals': {
+            'seconds': sum(stage['seconds'] for stage in stages.values()),
+            'requests': sum(stage['requests'] for stage in stages.values()),
+            'cost': cost,
+            'cost_per_slide': cost / slides if slides else 0.0,
+            'video_seconds': video_seconds,
+            'video_bytes': video_seconds * local['video_bytes_per_second'],
+            'audio_bytes': video_seconds * 24000 * 2  # 24 kHz 16-bit mono WAV per slide
+        }
+    }
+
+
+def print_estimate(estimate, rates):
+    """Print a per-stage estimate table."""
+    profile = estimate['profile']
+    print("\n🔮 ESTIMATE (nothing was converted)")
+    print("=" * 50)
+    print(f"📄 Pages:               {profile['pages']} ({profile['text_chars']} text characters, "
+          f"{profile['images']} embedded images, ~{profile['image_tokens']} slide input tokens)")
+    if rates['runs']:
+        print(f"📈 History:             {rates['runs']} earlier runs (fitted: {', '.join(rates['fitted'])})")
+    else:
+        print("📈 History:             none, using default rates")
+    for name, stage in estimate['stages'].items():
+        tokens = ""
+        if stage.get('input_tokens') or stage.get('output_tokens'):
+            tokens = f"  {stage['input_tokens']:>9.0f} in {stage['output_tokens']:>9.0f} out"
+        print(f"   {name:<11} {stage['requests']:>5.0f} req  {stage['seconds']:>7.1f}s{tokens}  ${stage['cost']:.4f}")
+    totals = estimate['totals']
+    print(f"⏱️  Total time:          {totals['seconds']:.0f}s ({totals['seconds'] / 60:.1f} min)")
+    print(f"💰 Estimated API cost:  ${totals['cost']:.4f} (${totals['cost_per_slide']:.4f}/slide)")
+    print(f"🎥 Video:               {totals['video_seconds'] / 60:.1f} min, "
+          f"~{totals['video_bytes'] / 1024 / 1024:.1f} MB (+{totals['audio_bytes'] / 1024 / 1024:.1f} MB audio)")
+    print("=" * 50)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+S2V (Slides to Video) - Import-time benchmark
+Runs `python -X importtime` on the entry-point modules and reports the total
+import time and the slowest top-level packages, plus the wall time of the
+commands that should start instantly (`cli.py --help`, `cli.py --dry-run`).
+
+Usage:
+    python import_benchmark.py                 # cli, user_interface, main
+    python import_benchmark.py main --top 20
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODULES = ('cli', 'user_interface', 'main')
+
+# "import time:   self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure_imports(module):
+    """
+    Import module in a fresh interpreter with -X importtime.
+
+    Returns:
+        tuple: (total seconds, {top-level package: self seconds})
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=HERE, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed: {result.stderr.strip().splitlines()[-1]}")
+
+    total = 0
+    packages = defaultdict(int)
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        packages[name.split('.')[0]] += int(self_us)
+        if len(indent) == 1 and name == module:
+            total = int(cumulative_us)
+    return total / 1e6, {name: us / 1e6 for name, us in packages.items()}
+
+
+def time_command(args, repeat=3):
+    """Return the best wall time of a command run in a fresh interpreter."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=HERE, capture_output=True, stdin=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report import time of the S2V entry points')
+    parser.add_argument('modules', nargs='*', default=list(DEFAULT_MODULES), help='Modules to import')
+    parser.add_argument('--top', type=int, default=10, help='Slowest packages shown per module')
+    args = parser.parse_args()
+
+    print("⏱️  IMPORT TIME REPORT")
+    print("=" * 50)
+    for module in args.modules:
+        try:
+            total, packages = measure_imports(module)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            continue
+        print(f"\n📦 import {module}: {total * 1000:.0f} ms")
+        for name, seconds in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"   {name:<28} {seconds * 1000:8.1f} ms")
+
+    print("\n🚀 Startup commands (best of 3)")
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, 'deck.pdf')  # --dry-run only checks that the file exists
+        open(pdf_path, 'wb').close()
+        for command in (['cli.py', '--help'], ['cli.py', pdf_path, '--dry-run']):
+            label = ' '.join(command).replace(pdf_path, 'deck.pdf')
+            print(f"   {label:<28} {time_command(command) * 1000:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+S2V (Slides to Video) - Incremental re-generation helpers
+Fingerprints PDF pages (render + text hashes) and matches an edited deck against
+a previous run, so only the changed slides have to be regenerated.
+"""
+
+import os
+import re
+import shutil
+from manifest import hash_bytes, hash_text
+
+# Low zoom is enough to detect any visual change and keeps fingerprinting cheap
+FINGERPRINT_ZOOM = 0.5
+
+
+def page_fingerprints(pdf_path, zoom=FINGERPRINT_ZOOM):
+    """
+    Compute a fingerprint for every page of a PDF.
+
+    Returns:
+        List of {'render': hash of a low-res render, 'text': hash of the text layer}
+    """
+    import fitz  # PyMuPDF
+    pdf_document = fitz.open(pdf_path)
+    fingerprints = []
+
+    for page in pdf_document:
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        fingerprints.append({
+            'render': hash_bytes(pix.samples),
+            'text': hash_text(page.get_text())
+        })
+
+    pdf_document.close()
+    return fingerprints
+
+
+def match_pages(new_pages, old_pages):
+    """
+    Match each page of the new deck to an identical page of the previous deck.
+
+    A page at the same position is preferred, so inserting or deleting a slide
+    still lets every other slide be reused.
+
+    Returns:
+        List with the matched old page index (0-based) for every new page, or None
+    """
+    available = {}
+    for j, page in enumerate(old_pages):
+        available.setdefault((page['render'], page['text']), []).append(j)
+
+    matches = []
+    for i, page in enumerate(new_pages):
+        candidates = available.get((page['render'], page['text']), [])
+        if i in candidates:
+            match = i
+        elif candidates:
+            match = candidates[0]
+        else:
+            match = None
+
+        if match is not None:
+            candidates.remove(match)
+        matches.append(match)
+
+    return matches
+
+
+def parse_slide_texts(content):
+    """Parse '#slideN#' / '#Trình N#' tagged content into {slide_number: text}."""
+    content = content.replace('full_content = """', '').replace('"""', '')
+    parts = re.split(r'#(?:slide|Trình)\s*(\d+)#', content)
+    return {int(parts[k]): parts[k + 1].strip() for k in range(1, len(parts) - 1, 2)}
+
+
+def read_slide_texts(file_path):
+    """Read a tagged run file (descriptions, final context, translation) into {slide_number: text}."""
+    if not os.path.exists(file_path):
+        return {}
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return parse_slide_texts(f.read())
+
+
+def group_consecutive(numbers, max_size):
+    """Group sorted slide numbers into runs of consecutive numbers, at most max_size each."""
+    groups = []
+    for number in numbers:
+        if groups and number == groups[-1][-1] + 1 and len(groups[-1]) < max_size:
+            groups[-1].append(number)
+        else:
+            groups.append([number])
+    return groups
+
+
+def link_or_copy(src, dst):
+    """Hard-link src to dst (falls back to a copy across file systems)."""
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
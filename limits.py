@@ -0,0 +1,63 @@
+"""
+S2V (Slides to Video) - Provider limits
+Per-provider concurrency and request-rate limits shared by every stage, thread
+and deck in the process, so parallel work never exceeds what each API allows.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Maximum number of in-flight requests per provider
+DEFAULT_PROVIDER_CONCURRENCY = {
+    'openai': 4,       # GPT-4.1-mini vision
+    'anthropic': 2,    # Claude refinement
+    'gemini': 2,       # Gemini translation
+    'gemini_tts': 4,   # Gemini TTS
+    'whisper': 4,      # Whisper transcription
+    'encode': os.cpu_count() or 4  # Local ffmpeg segment encodes (shared by all decks)
+}
+
+
+class ProviderLimits:
+    """Shared concurrency slots and optional requests-per-minute pacing per provider"""
+
+    def __init__(self, concurrency=None, requests_per_minute=None):
+        self.concurrency = dict(DEFAULT_PROVIDER_CONCURRENCY)
+        self.concurrency.update(concurrency or {})
+        self.requests_per_minute = dict(requests_per_minute or {})
+
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_start = {}
+
+    def _semaphore(self, provider):
+        with self._lock:
+            if provider not in self._semaphores:
+                self._semaphores[provider] = threading.BoundedSemaphore(max(1, self.concurrency.get(provider, 1)))
+            return self._semaphores[provider]
+
+    def _wait_for_rate(self, provider):
+        """Space request starts so the provider's requests-per-minute limit is respected."""
+        rpm = self.requests_per_minute.get(provider)
+        if not rpm:
+            return
+        interval = 60.0 / rpm
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_start.get(provider, now))
+            self._next_start[provider] = start_at + interval
+        if start_at > now:
+            time.sleep(start_at - now)
+
+    @contextmanager
+    def slot(self, provider):
+        """Hold one request slot of a provider for the duration of the block."""
+        semaphore = self._semaphore(provider)
+        semaphore.acquire()
+        try:
+            self._wait_for_rate(provider)
+            yield
+        finally:
+            semaphore.release()
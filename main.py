@@ -1,34 +1,127 @@
+# Provider SDKs (see clients.py), PyMuPDF and PIL are imported when first used, so
+# importing this module (cli.py --help, --dry-run, the menu) stays fast
 import os
+import json
 import base64
 import re
-import requests
-import openai
-from moviepy import AudioFileClip, ImageSequenceClip, concatenate_videoclips
 from pathlib import Path
-from PIL import Image
-import numpy as np
-import fitz  # PyMuPDF
-import natsort
-import anthropic
 import time
-from openai import OpenAI
-from google import genai
-from google.genai import types
 import wave
 import uuid
 from datetime import datetime
 import io
+import copy
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import Config
+from limits import ProviderLimits
+from clients import ClientRegistry
+from segmentation import segment_by_text
+from audio_buffer import PcmBuffer
+from cache import TtsCache, SegmentCache
+from artifacts import ArtifactStore
+from chunking import chunk_text, estimate_speech_seconds
+from audio_processing import process_slide_audio
+from video_encoder import VideoEncoder, find_ffmpeg, rendition_files
+from encoder_probe import ENCODER_CANDIDATES, select_encoder
+from streaming import HlsPublisher, package_dash
+from usage import UsageTracker, openai_usage, anthropic_usage, gemini_usage
+from text_layer import THUMBNAIL_WIDTH, analyze_deck, input_tokens, render_zoom
+from manifest import RunManifest, hash_file, hash_text, hash_inputs
+from incremental import (page_fingerprints, match_pages, parse_slide_texts, read_slide_texts,
+                         group_consecutive, link_or_copy)
+
+# Models of the pipeline stages (also the keys of usage.MODEL_PRICES)
+VISION_MODEL = "gpt-4.1-mini"
+CLAUDE_MODEL = "claude-3-7-sonnet-20250219"
+TRANSLATION_MODEL = "gemini-2.5-flash-preview-05-20"
+WHISPER_MODEL = "whisper-1"
+CLAUDE_BATCH_SIZE = 10  # Slides refined per Claude request
+
+# Gemini TTS request settings (also part of the TTS cache key)
+TTS_MODEL = "gemini-2.5-flash-preview-tts"
+TTS_VOICE = "Charon"
+TTS_PROMPT_PREFIX = "Đọc trong tiếng việt."
+
+# Encoder of preview drafts (see Config.preview)
+PREVIEW_ENCODER = 'libx264-ultrafast'
+
+
 class GPTProcessor:
-    def __init__(self, openai_api_key, anthropic_api_key, gemini_api_key):
+    def __init__(self, openai_api_key, anthropic_api_key, gemini_api_key, config=None):
+        self.config = config if config is not None else Config()
+        self.limits = ProviderLimits(self.config.provider_concurrency, self.config.provider_rpm)
         self.openai_api_key = openai_api_key
         self.anthropic_api_key = anthropic_api_key
         self.gemini_api_key = gemini_api_key
-        openai.api_key = openai_api_key
-        self.anthropic_client = anthropic.Anthropic(api_key=anthropic_api_key)
-        self.gemini_client = genai.Client(api_key=gemini_api_key)
+        # Provider clients are created on first use and shared by the whole process
+        self.clients = ClientRegistry(openai_api_key, anthropic_api_key, gemini_api_key,
+                                      limits=self.limits, keepalive=self.config.http_keepalive_seconds)
+        self.tts_cache = None
+        if self.config.tts_cache:
+            self.tts_cache = TtsCache(os.path.join(self.config.cache_dir, 'tts'),
+                                      self.config.tts_cache_max_mb * 1024 * 1024)
+        self.segment_cache = None
+        if self.config.segment_cache:
+            self.segment_cache = SegmentCache(os.path.join(self.config.cache_dir, 'segments'),
+                                              self.config.segment_cache_max_mb * 1024 * 1024)
+        self.artifacts = None
+        if self.config.artifact_store:
+            self.artifacts = ArtifactStore(os.path.join(self.config.cache_dir, 'artifacts'),
+                                           self.config.artifact_store_max_mb * 1024 * 1024)
+        self._video_codec = None  # (name, codec arguments) of the selected video encoder (probed once)
+        self.manifest = None  # RunManifest of the current run (enables resume)
+        self.usage = UsageTracker(prices=self.config.model_prices)  # API usage of the current run
+        self.progress_callback = None  # Optional callable(stage, done, total)
+        self.slide_audio_callback = None  # Optional callable(slide_num, audio_file), see hls_stream
+        self.slide_inputs = None  # Slide number -> text layer analysis (hybrid description mode)
+
+    @property
+    def anthropic_client(self):
+        return self.clients.anthropic()
+
+    @property
+    def gemini_client(self):
+        return self.clients.gemini()
+
+    def fork(self):
+        """Return a processor for another run that shares clients, limits and caches."""
+        processor = copy.copy(self)
+        processor.manifest = None
+        processor.usage = UsageTracker(prices=self.config.model_prices)
+        processor.progress_callback = None
+        processor.slide_audio_callback = None
+        processor.slide_inputs = None
+        return processor
+
+    def _report_progress(self, stage, done=None, total=None):
+        """Notify the progress callback (if any); the callback may raise to cancel the run."""
+        if self.progress_callback is not None:
+            self.progress_callback(stage, done, total)
+
+    def _publish_slide_audio(self, slide_num, audio_file):
+        """Hand a finished slide audio file to the slide audio callback (if any)."""
+        if self.slide_audio_callback is not None:
+            self.slide_audio_callback(slide_num, audio_file)
+
+    def _cached_step(self, step, input_hash):
+        """Return the manifest entry of a step if it can be skipped, otherwise None."""
+        if self.manifest is None:
+            return None
+        entry = self.manifest.lookup(step, input_hash)
+        if entry is not None:
+            print(f"⏭️  Skipping {step} (already completed)")
+        return entry
+
+    def _record_step(self, step, input_hash, outputs=(), data=None):
+        """Record a completed step in the run manifest (if any)."""
+        if self.manifest is not None:
+            self.manifest.record(step, input_hash, outputs, data)
 
     def images_from_folder(self, folder_path):
         """Reads all images from a folder and sorts them."""
+        import natsort
         image_files = [os.path.join(folder_path, file) for file in os.listdir(folder_path) if
                        file.lower().endswith(('.png', '.jpg', '.jpeg'))]
         return natsort.natsorted(image_files)
@@ -50,8 +143,41 @@ class GPTProcessor:
             })
         return image_content
 
+    def encode_thumbnail(self, image_path, width=THUMBNAIL_WIDTH):
+        """Return a downscaled JPEG of a slide image as base64."""
+        from PIL import Image
+        with Image.open(image_path) as img:
+            height = round(img.height * width / img.width)
+            thumbnail = img.convert('RGB').resize((width, height), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        thumbnail.save(buffer, "JPEG", quality=85)
+        return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+    def create_hybrid_content(self, filenames, slide_inputs):
+        """Message content of a hybrid batch: text-layer slides as text, figure slides as images."""
+        content = []
+        for filename, slide in zip(filenames, slide_inputs):
+            if slide['kind'] == 'figure':
+                content.append({"type": "text", "text": f"Slide {slide['slide']} (image):"})
+                content.extend(self.create_base64_image_content([filename]))
+                continue
+            content.append({"type": "text", "text": f"Slide {slide['slide']} (extracted text):\n{slide['text']}"})
+            if slide['kind'] == 'mixed':
+                content.append({
+                    "type": "image_url",
+                    "image_url": {
+                        "url": f"data:image/jpeg;base64,{self.encode_thumbnail(filename)}",
+                        "detail": "low"
+                    },
+                })
+        return content
+
     def process_response(self, json_response):
         content = json_response['choices'][0]['message']['content']
+        return self.parse_slide_content(content)
+
+    def parse_slide_content(self, content):
+        """Split a '#slideN#' tagged response into a {slide_number: text} dict."""
         slides = re.split(r'(#slide\d+#)', content)[1:]
 
         slide_dict = {}
@@ -62,9 +188,17 @@ class GPTProcessor:
 
         return slide_dict
 
-    def send_batch_request(self, image_files, start_slide, previous_response_text="", is_first_batch=True):
-        """Sends a batch of image files to the API and returns the response."""
-        image_content = self.create_base64_image_content(image_files)
+    def send_batch_request(self, image_files, start_slide, previous_response_text="", is_first_batch=True,
+                           slide_inputs=None):
+        """Sends a batch of image files to the API and returns the response.
+        
+        With slide_inputs (hybrid mode, see text_layer.py) text-heavy slides are sent as
+        their extracted text, with a small image if they contain figures.
+        """
+        if slide_inputs is None:
+            image_content = self.create_base64_image_content(image_files)
+        else:
+            image_content = self.create_hybrid_content(image_files, slide_inputs)
 
         slide_tags = [f"#slide{start_slide + i}#" for i in range(len(image_files))]
 
@@ -83,6 +217,10 @@ class GPTProcessor:
                 slide_tags) + " and do not include any other text. Please preserve content of the slide, do not change the content of the slide, respect the tag. Don't get another content from another slide, just use the content of the slide. Read slide by slide and give corresponding slide tag. Please TEACH the slide which you process, don't skip any content"
             )
 
+        if slide_inputs is not None:
+            prompt_text += (" Some slides are given as their extracted text (with a small image when they contain"
+                            " figures) instead of a full image; explain them exactly like the slide images.")
+
         text_content = {
             "type": "text",
             "text": prompt_text,
@@ -104,18 +242,24 @@ class GPTProcessor:
         }
 
         payload = {
-            "model": "gpt-4.1-mini",
+            "model": VISION_MODEL,
             "messages": messages,
             "max_tokens": 3000
         }
 
-        response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload)
-        print("Response JSON:", response.json())
-        return response.json()
+        with self.limits.slot('openai'):
+            started = time.time()
+            response = self.clients.http().post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload)
+        response_json = response.json()
+        self.usage.record('describe', VISION_MODEL, range(start_slide, start_slide + len(image_files)),
+                          started=started, **openai_usage(response_json))
+        print("Response JSON:", response_json)
+        return response_json
 
     def process_pdf_to_descriptions(self, pdf_path, output_folder, batch_size=3):
         image_folder = os.path.join(output_folder, 'images')
         image_files = self.pdf_to_images(pdf_path, image_folder)
+        self.prepare_slide_inputs(pdf_path)
         start_slide = 1
         all_descriptions = {}
         previous_response_text = ""
@@ -123,10 +267,11 @@ class GPTProcessor:
 
         for i in range(0, len(image_files), batch_size):
             batch_files = image_files[i:i + batch_size]
-            response = self.send_batch_request(batch_files, start_slide, previous_response_text, is_first_batch)
-            slide_dict = self.process_response(response)
+            self._report_progress('describe', i, len(image_files))
+            content = self.describe_batch(batch_files, start_slide, previous_response_text, is_first_batch)
+            slide_dict = self.parse_slide_content(content)
 
-            previous_response_text = response['choices'][0]['message']['content']
+            previous_response_text = content
             is_first_batch = False
 
             all_descriptions.update(slide_dict)
@@ -135,8 +280,104 @@ class GPTProcessor:
         descriptions = [all_descriptions[key] for key in sorted(all_descriptions.keys())]
         descriptions_file = os.path.join(output_folder, "descriptions.txt")
         self.save_descriptions(descriptions, descriptions_file)
+        self.report_slide_inputs(output_folder, range(1, len(image_files) + 1))
         return descriptions_file, image_files
 
+    def prepare_slide_inputs(self, pdf_path):
+        """Analyze the text layer of every slide when description_mode is 'hybrid'."""
+        if self.config.description_mode != 'hybrid':
+            self.slide_inputs = None
+            return
+        self.slide_inputs = {slide['slide']: slide for slide in analyze_deck(pdf_path)}
+        kinds = [slide['kind'] for slide in self.slide_inputs.values()]
+        print(f"📝 Hybrid descriptions: {kinds.count('text')} text, {kinds.count('mixed')} text + small image, "
+              f"{kinds.count('figure')} image slides")
+
+    def describe_seconds_per_slide(self, records):
+        """Average describe request latency per slide of usage records (None without records)."""
+        records = [r for r in records if r['stage'] == 'describe' and r['slides']]
+        slides = sum(len(r['slides']) for r in records)
+        if not slides:
+            return None
+        return sum(r['ended'] - r['started'] for r in records) / slides
+
+    def report_slide_inputs(self, output_folder, slide_numbers):
+        """Print and save (description_inputs.json) the estimated token savings of hybrid descriptions.
+        
+        The describe latency of the run is compared with vision-only runs next to output_folder.
+        """
+        if self.slide_inputs is None:
+            return
+        from estimate import find_usage_files
+        
+        slides = []
+        for slide_num in slide_numbers:
+            slide = self.slide_inputs[slide_num]
+            full, sent = input_tokens(slide)
+            slides.append({
+                'slide': slide_num,
+                'kind': slide['kind'],
+                'text_chars': len(slide['text']),
+                'figure_fraction': slide['figure_fraction'],
+                'vision_tokens': full,
+                'sent_tokens': sent,
+                'saved_tokens': full - sent
+            })
+        vision_total = sum(s['vision_tokens'] for s in slides)
+        sent_total = sum(s['sent_tokens'] for s in slides)
+        
+        latency = self.describe_seconds_per_slide(self.usage.records)
+        history = [data for data in find_usage_files([os.path.dirname(os.path.abspath(output_folder))])
+                   if data.get('settings', {}).get('description_mode', 'vision') == 'vision']
+        baseline = self.describe_seconds_per_slide([r for data in history for r in data['records']])
+        
+        report = {
+            'slides': slides,
+            'vision_tokens': vision_total,
+            'sent_tokens': sent_total,
+            'saved_tokens': vision_total - sent_total,
+            'describe_seconds_per_slide': latency,
+            'vision_describe_seconds_per_slide': baseline
+        }
+        report_file = os.path.join(output_folder, "description_inputs.json")
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        
+        for s in slides:
+            print(f"   slide {s['slide']:>3} {s['kind']:<6} {s['vision_tokens']:>6} → {s['sent_tokens']:>6} tokens "
+                  f"({s['saved_tokens']} saved)")
+        if vision_total:
+            print(f"📉 Estimated describe input: {vision_total} → {sent_total} tokens "
+                  f"({(sent_total - vision_total) / vision_total:+.0%})")
+        if latency is not None and baseline:
+            print(f"⏱️  Describe latency: {latency:.2f}s/slide (vision-only runs: {baseline:.2f}s/slide, "
+                  f"{(latency - baseline) / baseline:+.0%})")
+        elif latency is not None:
+            print(f"⏱️  Describe latency: {latency:.2f}s/slide (no vision-only runs to compare)")
+        print(f"📝 Description input report: {report_file}")
+
+    def describe_batch(self, batch_files, start_slide, previous_response_text="", is_first_batch=True):
+        """Describes a batch of slide images (reusing the manifest result if unchanged).
+        
+        Returns:
+            The '#slideN#' tagged response text
+        """
+        step = f"describe:{start_slide}-{start_slide + len(batch_files) - 1}"
+        input_hash = hash_inputs([hash_file(f) for f in batch_files], previous_response_text, is_first_batch)
+        slide_inputs = None
+        if self.slide_inputs is not None:
+            slide_inputs = [self.slide_inputs[start_slide + i] for i in range(len(batch_files))]
+            input_hash = hash_inputs(input_hash, [(s['kind'], hash_text(s['text'])) for s in slide_inputs])
+        cached = self._cached_step(step, input_hash)
+        if cached is not None:
+            return cached['data']
+
+        response = self.send_batch_request(batch_files, start_slide, previous_response_text, is_first_batch,
+                                           slide_inputs)
+        content = response['choices'][0]['message']['content']
+        self._record_step(step, input_hash, data=content)
+        return content
+
     def process_with_claude(self, descriptions_file, output_folder):
         full_content = self.read_file(descriptions_file)
         total_slides = len(re.findall(r'#slide\d+#', full_content))
@@ -145,7 +386,7 @@ class GPTProcessor:
         batch_sizes = []
         remaining_slides = total_slides
         while remaining_slides > 0:
-            batch_size = min(10, remaining_slides)
+            batch_size = min(CLAUDE_BATCH_SIZE, remaining_slides)
             batch_sizes.append(batch_size)
             remaining_slides -= batch_size
 
@@ -153,22 +394,9 @@ class GPTProcessor:
         for i, batch_size in enumerate(batch_sizes, 1):
             end = min(start + batch_size - 1, total_slides)
             print(f"Processing batch {i} (slides {start}-{end})")
+            self._report_progress('refine', start - 1, total_slides)
 
-            processed_batch = self.process_batch(self.anthropic_client, full_content, start, end, total_slides)
-
-            print("Type of processed_batch:", type(processed_batch))
-            print("Content of processed_batch:", processed_batch)
-
-            # Extract the text content from the TextBlock object
-            if isinstance(processed_batch, list) and len(processed_batch) > 0 and hasattr(processed_batch[0], 'text'):
-                processed_batch = processed_batch[0].text
-            elif not isinstance(processed_batch, str):
-                processed_batch = str(processed_batch)
-
-            print("Type of processed_batch after conversion:", type(processed_batch))
-            print("Content of processed_batch after conversion:", processed_batch)
-
-            full_content = self.replace_batch(full_content, processed_batch, start, end)
+            full_content = self.refine_batch(full_content, start, end, total_slides)
 
             start = end + 1
 
@@ -176,6 +404,31 @@ class GPTProcessor:
         self.write_file(final_context_file, full_content)
         return final_context_file
 
+    def refine_batch(self, full_content, start, end, total_slides):
+        """Refines slides start..end with Claude and returns the updated full content."""
+        step = f"claude:{start}-{end}"
+        input_hash = hash_inputs(hash_text(full_content), start, end, total_slides)
+        cached = self._cached_step(step, input_hash)
+        if cached is not None:
+            return self.replace_batch(full_content, cached['data'], start, end)
+
+        processed_batch = self.process_batch(self.anthropic_client, full_content, start, end, total_slides)
+
+        print("Type of processed_batch:", type(processed_batch))
+        print("Content of processed_batch:", processed_batch)
+
+        # Extract the text content from the TextBlock object
+        if isinstance(processed_batch, list) and len(processed_batch) > 0 and hasattr(processed_batch[0], 'text'):
+            processed_batch = processed_batch[0].text
+        elif not isinstance(processed_batch, str):
+            processed_batch = str(processed_batch)
+
+        print("Type of processed_batch after conversion:", type(processed_batch))
+        print("Content of processed_batch after conversion:", processed_batch)
+
+        self._record_step(step, input_hash, data=processed_batch)
+        return self.replace_batch(full_content, processed_batch, start, end)
+
     def create_video_from_context(self, final_context_file, image_files, output_folder, tts_batch_size=1):
         """
         Create video from context with configurable TTS batch size.
@@ -264,71 +517,115 @@ class GPTProcessor:
             tuple: (video_path, durations)
         """
         print("🎬 Starting video creation...")
+        self._report_progress('video')
         video_path = os.path.join(output_folder, "final_video.mp4")
+
+        step = "video"
+        video_files = rendition_files(video_path, self.video_renditions())
+        input_hash = hash_inputs([hash_file(f) for f in image_files], [hash_file(f) for f in audio_files],
+                                 self.video_renditions(), self.config.preview and self.config.preview_height,
+                                 self.config.video_mode, self.video_fps(), self.config.keyframe_interval,
+                                 self.config.video_quality, *self.run_video_codec())
+        cached = self._cached_step(step, input_hash)
+        if cached is not None:
+            return video_path, cached['data']['durations']
+
+        for path in video_files:
+            if os.path.exists(path):
+                os.remove(path)  # ffmpeg writes in place; the old file may be hard-linked
+        started = time.time()
         durations = self.create_video(image_files, audio_files, video_path)
+        if all(os.path.exists(f) for f in video_files):
+            self._record_step(step, input_hash, video_files, data={'durations': durations})
+            self.usage.record_local_stage('video', time.time() - started, video_seconds=sum(durations),
+                                          video_bytes=os.path.getsize(video_path), renditions=len(video_files))
         
         print(f"🎥 Video created successfully at: {video_path}")
+        for path in video_files[1:]:
+            print(f"🎥 Rendition: {path}")
         print(f"🎵 Total video duration: {sum(durations):.2f} seconds")
         
+        if self.config.dash_output:
+            manifest_file = package_dash(find_ffmpeg(), video_files, os.path.join(output_folder, 'dash'),
+                                         self.config.keyframe_interval)
+            print(f"📡 DASH manifest: {manifest_file}")
+        
         return video_path, durations
 
     def pdf_to_images(self, pdf_path, output_folder):
         """Converts a PDF into images with minimum 1920x1080 resolution."""
+        self._report_progress('images')
+        step = "images"
+        input_hash = hash_inputs(hash_file(pdf_path), os.path.abspath(output_folder))
+        cached = self._cached_step(step, input_hash)
+        if cached is not None:
+            return cached['outputs']
+
+        import fitz  # PyMuPDF
         pdf_document = fitz.open(pdf_path)
         num_pages = pdf_document.page_count
 
         os.makedirs(output_folder, exist_ok=True)
 
+        started = time.time()
         image_paths = []
-        min_width, min_height = 1920, 1080
-        
         for page_num in range(num_pages):
-            page = pdf_document.load_page(page_num)
-            
-            # Get original page dimensions
-            page_rect = page.rect
-            original_width = page_rect.width
-            original_height = page_rect.height
-            
-            # Calculate zoom to ensure minimum resolution
-            zoom_x = min_width / original_width
-            zoom_y = min_height / original_height
-            zoom = max(zoom_x, zoom_y, 2.0)  # At least 2x zoom for quality
-            
-            mat = fitz.Matrix(zoom, zoom)
-            
-            # Get high resolution pixmap
-            pix = page.get_pixmap(matrix=mat, alpha=False)
-            
-            # Convert to PIL Image for resizing
-            img_data = pix.tobytes("png")
-            img = Image.open(io.BytesIO(img_data))
-            
-            # Ensure minimum dimensions while maintaining aspect ratio
-            current_width, current_height = img.size
-            
-            if current_width < min_width or current_height < min_height:
-                # Calculate scale to meet minimum requirements
-                scale_x = min_width / current_width
-                scale_y = min_height / current_height
-                scale = max(scale_x, scale_y)
-                
-                new_width = int(current_width * scale)
-                new_height = int(current_height * scale)
-                
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            # Save the high-resolution image
-            image_path = os.path.join(output_folder, f"slide_{page_num + 1}.png")
-            img.save(image_path, "PNG", optimize=True, quality=95)
-            image_paths.append(image_path)
+            image_paths.append(self.render_page(pdf_document, page_num, output_folder))
+
+        self._record_step(step, input_hash, image_paths)
+        self.usage.record_local_stage('images', time.time() - started, slides=num_pages)
+        return image_paths
+
+    def render_page(self, pdf_document, page_num, output_folder, min_width=1920, min_height=1080):
+        """Renders one PDF page to slide_{N}.png with at least min_width x min_height pixels."""
+        import fitz  # PyMuPDF
+        from PIL import Image
+        page = pdf_document.load_page(page_num)
+        
+        # Get original page dimensions
+        page_rect = page.rect
+        original_width = page_rect.width
+        original_height = page_rect.height
+        
+        # Calculate zoom to ensure minimum resolution (at least 2x zoom for quality)
+        zoom = render_zoom(original_width, original_height, min_width, min_height)
+        
+        mat = fitz.Matrix(zoom, zoom)
+        
+        # Get high resolution pixmap
+        pix = page.get_pixmap(matrix=mat, alpha=False)
+        
+        # Convert to PIL Image for resizing
+        img_data = pix.tobytes("png")
+        img = Image.open(io.BytesIO(img_data))
+        
+        # Ensure minimum dimensions while maintaining aspect ratio
+        current_width, current_height = img.size
+        
+        if current_width < min_width or current_height < min_height:
+            # Calculate scale to meet minimum requirements
+            scale_x = min_width / current_width
+            scale_y = min_height / current_height
+            scale = max(scale_x, scale_y)
             
-            print(f"Slide {page_num + 1}: {img.size[0]}x{img.size[1]} pixels")
+            new_width = int(current_width * scale)
+            new_height = int(current_height * scale)
             
-        return image_paths
+            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        
+        # Save the high-resolution image (never overwrite a hard-linked file in place)
+        image_path = os.path.join(output_folder, f"slide_{page_num + 1}.png")
+        if os.path.exists(image_path):
+            os.remove(image_path)
+        img.save(image_path, "PNG", optimize=True, quality=95)
+        
+        print(f"Slide {page_num + 1}: {img.size[0]}x{img.size[1]} pixels")
+        return image_path
 
     def wave_file(self, filename, pcm, channels=1, rate=24000, sample_width=2):
         """Helper function to save wave file."""
+        if os.path.exists(filename):
+            os.remove(filename)  # may be hard-linked from a previous run
         with wave.open(filename, "wb") as wf:
             wf.setnchannels(channels)
             wf.setsampwidth(sample_width)
@@ -340,8 +637,7 @@ class GPTProcessor:
         os.makedirs(output_dir, exist_ok=True)
         audio_files = []
         
-        # Initialize OpenAI client
-        client = OpenAI(api_key=self.openai_api_key)
+        client = self.clients.openai()
         
         for i, description in enumerate(descriptions):
             speech_file_path = Path(output_dir) / f"slide_{i + 1}.mp3"
@@ -371,7 +667,8 @@ class GPTProcessor:
             #     Ấn tượng (Impressions): Tạo ấn tượng của một giảng viên có kinh nghiệm, am hiểu sâu về chuyên môn nhưng vẫn approachable và quan tâm đến việc học của sinh viên. Giọng nói thể hiện sự tự tin trong kiến thức nhưng không kiêu ngạo.
 
             #     """
-            # Create TTS with OpenAI
+            # Create TTS with OpenAI (streamed responses carry no usage block)
+            started = time.time()
             with client.audio.speech.with_streaming_response.create(
                 model="gpt-4o-mini-tts",
                 voice="coral",
@@ -379,65 +676,86 @@ class GPTProcessor:
                 # instructions=f"{style}"
             ) as response:
                 response.stream_to_file(speech_file_path)
+            self.usage.record('tts', "gpt-4o-mini-tts", [i + 1], started=started)
             
             audio_files.append(str(speech_file_path))
             
         return audio_files
 
-    def create_video(self, image_files, audio_files, output_file, fps=24):
-        clips = []
-        durations = []  # Save the duration for each slide
-        for image_file, audio_file in zip(image_files, audio_files):
-            audio = AudioFileClip(audio_file)
-            duration = audio.duration
-            durations.append(duration)
-            img = Image.open(image_file)
-            img_array = np.array(img)
-            img_clip = ImageSequenceClip([img_array], durations=[duration])
-            img_clip = img_clip.with_audio(audio)
-            img_clip = img_clip.with_fps(fps)
-            clips.append(img_clip)
-
-        if clips:
-            final_clip = concatenate_videoclips(clips, method="compose")
-            
-            # GPU acceleration settings for Mac (MPS) and other platforms
-            gpu_params = {
-                'codec': 'libx264',
-                'audio_codec': 'aac',
-                'fps': fps,
-                'preset': 'fast',  # Faster encoding
-                'ffmpeg_params': [
-                    '-hwaccel', 'auto',  # Auto hardware acceleration
-                    '-c:v', 'h264_videotoolbox',  # Mac hardware encoder
-                    '-allow_sw', '1',  # Allow software fallback
-                    '-crf', '23',  # Good quality/speed balance
-                    '-movflags', '+faststart'  # Better streaming
-                ]
-            }
-            
-            # Try GPU acceleration, fallback to CPU if failed
-            try:
-                print("Attempting video creation with GPU acceleration...")
-                final_clip.write_videofile(output_file, **gpu_params)
-                print("✅ Video created successfully with GPU acceleration!")
-            except Exception as e:
-                print(f"⚠️ GPU acceleration failed: {e}")
-                print("Falling back to CPU encoding...")
-                # Fallback to standard CPU encoding
-                final_clip.write_videofile(
-                    output_file, 
-                    codec="libx264", 
-                    audio_codec="aac", 
-                    fps=fps,
-                    preset='fast'
-                )
-                print("✅ Video created successfully with CPU!")
-        else:
+    def create_video(self, image_files, audio_files, output_file, fps=None):
+        """Encode the slide video with ffmpeg: still-image segments joined by stream copy.
+        
+        Returns:
+            List of slide durations in seconds
+        """
+        if not image_files:
             print("No clips to concatenate")
-
+            return []
+        
+        durations = self.video_encoder(fps).encode(image_files, audio_files, output_file)
+        print("✅ Video encoded with ffmpeg")
         return durations
 
+    def video_encoder(self, fps=None):
+        """Return a VideoEncoder with the configured mode, codec and caches.
+        
+        Preview drafts keep the mode and frame rate (so slide timings match the final
+        video) but are encoded at preview_height with the fastest x264 preset.
+        """
+        mode = self.config.video_mode
+        if fps is None:
+            fps = self.video_fps()
+        _, codec_args = self.run_video_codec()
+        max_height = self.config.preview_height if self.config.preview else None
+        return VideoEncoder(fps=fps, codec_args=codec_args, workers=self.config.encode_workers,
+                            limits=self.limits, mode=mode, keyframe_interval=self.config.keyframe_interval,
+                            segment_cache=self.segment_cache, renditions=self.video_renditions(),
+                            max_height=max_height)
+
+    def video_fps(self):
+        """Return the frame rate of the configured video mode (static_fps or video_fps)."""
+        return self.config.static_fps if self.config.video_mode == 'static' else self.config.video_fps
+
+    def video_renditions(self):
+        """Return the renditions to encode (previews are a single low-resolution video)."""
+        return [] if self.config.preview else self.config.video_renditions
+
+    @contextmanager
+    def hls_stream(self, image_files, output_folder):
+        """Publish slides to output_folder/hls/index.m3u8 as their audio is produced (hls_output).
+        
+        Yields the HlsPublisher (None when disabled); call its finish(audio_files) once
+        all audio exists. The playlist is playable from the first finished slide on.
+        """
+        if not self.config.hls_output:
+            yield None
+            return
+        
+        publisher = HlsPublisher(self.video_encoder(), image_files, os.path.join(output_folder, 'hls'))
+        self.slide_audio_callback = publisher.add_slide
+        try:
+            yield publisher
+        except BaseException:
+            publisher.abort()
+            raise
+        finally:
+            self.slide_audio_callback = None
+
+    def video_codec(self):
+        """Return (name, codec arguments) of the video encoder (video_encoder, or the fastest probed one)."""
+        if self._video_codec is None:
+            self._video_codec = select_encoder(
+                find_ffmpeg(), self.config.video_quality, self.config.video_encoder, self.config.cache_dir
+            )
+            print(f"🎞️  Video encoder: {self._video_codec[0]}")
+        return self._video_codec
+
+    def run_video_codec(self):
+        """Return (name, codec arguments) this run encodes with (the fastest x264 preset for previews)."""
+        if self.config.preview:
+            return PREVIEW_ENCODER, ENCODER_CANDIDATES[PREVIEW_ENCODER][0]
+        return self.video_codec()
+
     def save_descriptions(self, descriptions, file_path):
         """Saves the descriptions to a text file."""
         with open(file_path, 'w', encoding='utf-8') as f:
@@ -495,22 +813,26 @@ emphasize of the speech is identify by the caps of the word, the !!! the ??? the
         end_time = time.time()
         print("EXECUTION TIME: ",end_time-start_time)
         start_time = time.time()
-        message = client.messages.create(
-            model="claude-3-7-sonnet-20250219",
-            max_tokens=4000,
-            temperature=0,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": prompt
-                        }
-                    ]
-                }
-            ]
-        )
+        with self.limits.slot('anthropic'):
+            started = time.time()
+            message = client.messages.create(
+                model=CLAUDE_MODEL,
+                max_tokens=4000,
+                temperature=0,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {
+                                "type": "text",
+                                "text": prompt
+                            }
+                        ]
+                    }
+                ]
+            )
+        self.usage.record('refine', CLAUDE_MODEL, range(start, end + 1), started=started,
+                          **anthropic_usage(message.usage))
         end_time = time.time()
         print("CLAUDE RESPONSE TIME: ",end_time-start_time)
         print("Type of message.content:", type(message.content))
@@ -544,17 +866,43 @@ emphasize of the speech is identify by the caps of the word, the !!! the ??? the
 
     def translate_to_vietnamese(self, descriptions_file, output_folder):
         """Translates the descriptions to Vietnamese using Gemini API."""
+        self._report_progress('translate')
+        step = "translate"
+        input_hash = hash_file(descriptions_file)
+        cached = self._cached_step(step, input_hash)
+        if cached is not None:
+            return cached['outputs'][0]
+
         full_content = self.read_file(descriptions_file)
+        translated_content = self.translate_content(full_content)
         
+        # Save translated content
+        translated_file = os.path.join(output_folder, "translated_descriptions.txt")
+        if os.path.exists(translated_file):
+            os.remove(translated_file)  # may be hard-linked into the artifact store
+        with open(translated_file, "w", encoding="utf-8") as file:
+            file.write(translated_content)
+
+        self._record_step(step, input_hash, [translated_file])
+        print(f"✅ Vietnamese translation saved to: {translated_file}")
+        return translated_file
+
+    def translate_content(self, full_content):
+        """Translates '#slideN#' tagged content to Vietnamese and converts tags to '#Trình N#'."""
         print("🌐 Translating content to Vietnamese...")
         print("📝 DEBUG - Original content (first 300 chars):")
         print(repr(full_content[:300]))
         print()
         
-        response = self.gemini_client.models.generate_content(
-            model="gemini-2.5-flash-preview-05-20",
-            contents=f"Dịch toàn bộ sang tiếng việt, trả đúng format y như cũ, rút gọn nội dung, không thay đổi nội dung slide: {full_content}",
-        )
+        with self.limits.slot('gemini'):
+            started = time.time()
+            response = self.gemini_client.models.generate_content(
+                model=TRANSLATION_MODEL,
+                contents=f"Dịch toàn bộ sang tiếng việt, trả đúng format y như cũ, rút gọn nội dung, không thay đổi nội dung slide: {full_content}",
+            )
+        slides = [int(n) for n in re.findall(r'#slide(\d+)#', full_content)]
+        self.usage.record('translate', TRANSLATION_MODEL, slides, started=started,
+                          **gemini_usage(response.usage_metadata))
         
         translated_content = response.text
         print("📝 DEBUG - Translated content BEFORE tag replacement (first 300 chars):")
@@ -573,189 +921,332 @@ emphasize of the speech is identify by the caps of the word, the !!! the ??? the
         print("📝 DEBUG - Translated content AFTER tag replacement (first 300 chars):")
         print(repr(translated_content[:300]))
         print()
-        
-        # Save translated content
-        translated_file = os.path.join(output_folder, "translated_descriptions.txt")
-        with open(translated_file, "w", encoding="utf-8") as file:
-            file.write(translated_content)
-        
-        print(f"✅ Vietnamese translation saved to: {translated_file}")
-        return translated_file
+        return translated_content
 
-    def text_to_speech_vietnamese_batch(self, descriptions, output_dir="audio", tts_batch_size=1):
+    def text_to_speech_vietnamese_batch(self, descriptions, output_dir="audio", tts_batch_size=1, slide_numbers=None):
         """Converts Vietnamese text descriptions to speech using Gemini TTS with smart batching and splitting.
         
         Args:
             descriptions: List of slide descriptions
             output_dir: Output directory for audio files
             tts_batch_size: Number of slides to process in one TTS call (1-5 recommended)
+            slide_numbers: Slide number of each description (default: 1..N), used for file names
         
         Returns:
             List of individual audio files for each slide
         """
         os.makedirs(output_dir, exist_ok=True)
+        if slide_numbers is None:
+            slide_numbers = list(range(1, len(descriptions) + 1))
         
         print(f"🎤 Converting Vietnamese text to speech (batch size: {tts_batch_size})...")
         print(f"📝 DEBUG - Received {len(descriptions)} descriptions for TTS")
         
-        if tts_batch_size == 1:
-            # Single slide processing - use original method
-            return self._tts_single_slide(descriptions, output_dir)
+        if tts_batch_size == 1 or self.uses_stand_in_audio():
+            # Single slide processing - use original method (stand-in audio cannot be split)
+            return self._tts_single_slide(descriptions, output_dir, slide_numbers)
         else:
             # Batch processing with transcription splitting
-            return self._tts_batch_with_splitting(descriptions, output_dir, tts_batch_size)
+            return self._tts_batch_with_splitting(descriptions, output_dir, tts_batch_size, slide_numbers)
 
-    def _tts_single_slide(self, descriptions, output_dir):
-        """Process slides one by one (original method)."""
-        audio_files = []
+    def synthesize_speech(self, text, slides=()):
+        """Synthesizes Vietnamese speech with Gemini TTS and returns raw 24kHz 16-bit mono PCM.
         
-        for i, description in enumerate(descriptions):
-            print(f"Processing slide {i + 1}/{len(descriptions)}")
-            
-            try:
-                response = self.gemini_client.models.generate_content(
-                    model="gemini-2.5-flash-preview-tts",
-                    contents=f"Đọc trong tiếng việt. {description}",
-                    config=types.GenerateContentConfig(
-                        response_modalities=["AUDIO"],
-                        speech_config=types.SpeechConfig(
-                            voice_config=types.VoiceConfig(
-                                prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                                    voice_name='Charon',
-                                )
+        Results are cached on disk, so unchanged narration never calls Gemini again.
+        slides are the slide numbers the text belongs to (for usage accounting).
+        """
+        cache_key = None
+        if self.tts_cache is not None:
+            cache_key = TtsCache.key(TTS_MODEL, TTS_VOICE, TTS_PROMPT_PREFIX, text)
+            data = self.tts_cache.get(cache_key)
+            if data is not None:
+                return data
+        
+        from google.genai import types
+        with self.limits.slot('gemini_tts'):
+            started = time.time()
+            response = self.gemini_client.models.generate_content(
+                model=TTS_MODEL,
+                contents=f"{TTS_PROMPT_PREFIX} {text}",
+                config=types.GenerateContentConfig(
+                    response_modalities=["AUDIO"],
+                    speech_config=types.SpeechConfig(
+                        voice_config=types.VoiceConfig(
+                            prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                                voice_name=TTS_VOICE,
                             )
-                        ),
-                    )
+                        )
+                    ),
                 )
-                
-                data = response.candidates[0].content.parts[0].inline_data.data
-                file_name = os.path.join(output_dir, f'slide_{i + 1}.wav')
-                self.wave_file(file_name, data)
-                audio_files.append(file_name)
-                
-            except Exception as e:
-                print(f"Error generating audio for slide {i + 1}: {e}")
-                fallback_file = os.path.join(output_dir, f'slide_{i + 1}.wav')
-                self.create_silent_audio(fallback_file, duration=5.0)
-                audio_files.append(fallback_file)
+            )
         
-        return audio_files
+        data = response.candidates[0].content.parts[0].inline_data.data
+        self.usage.record('tts', TTS_MODEL, slides, started=started,
+                          audio_seconds=len(data) / (2 * 24000), **gemini_usage(response.usage_metadata))
+        if cache_key is not None:
+            self.tts_cache.put(cache_key, data)
+        return data
 
-    def _tts_batch_with_splitting(self, descriptions, output_dir, tts_batch_size):
-        """Process slides in batches and split using transcription."""
-        batch_audio_files = []
-        batch_info = []
+    def synthesize_narration(self, text, label, slides=()):
+        """Synthesize one slide's narration, splitting long text into sentence chunks.
+        
+        Chunks are synthesized concurrently and retried individually, then joined with
+        short crossfades, so latency is bounded by the slowest chunk.
         
-        # Step 1: Create batch audio files
-        print("🎤 Step 1: Creating batch audio files...")
+        Returns:
+            PcmBuffer with the slide audio
+        """
+        chunks = chunk_text(text, self.config.tts_chunk_chars)
+        if len(chunks) <= 1:
+            data = self._with_retries(lambda: self.synthesize_speech(text, slides), f"TTS {label}")
+            return PcmBuffer.from_bytes(data)
+        
+        print(f"✂️  {label}: synthesizing {len(chunks)} chunks of ≤{self.config.tts_chunk_chars} characters")
+        workers = max(1, min(len(chunks), self.config.tts_workers))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._with_retries, lambda chunk=chunk: self.synthesize_speech(chunk, slides),
+                                f"TTS {label} chunk {k}/{len(chunks)}")
+                for k, chunk in enumerate(chunks, 1)
+            ]
+            try:
+                parts = [PcmBuffer.from_bytes(future.result()) for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        
+        return PcmBuffer.crossfade(parts, self.config.tts_crossfade_ms / 1000)
+
+    def uses_stand_in_audio(self):
+        """Whether previews replace Gemini TTS (preview_audio 'cached' or 'silence')."""
+        return self.config.preview and self.config.preview_audio != 'tts'
+
+    def cached_narration(self, text):
+        """Return a slide's narration from the TTS cache alone, or None unless every chunk is cached."""
+        if self.tts_cache is None:
+            return None
+        parts = []
+        for chunk in chunk_text(text, self.config.tts_chunk_chars):
+            data = self.tts_cache.get(TtsCache.key(TTS_MODEL, TTS_VOICE, TTS_PROMPT_PREFIX, chunk))
+            if data is None:
+                return None
+            parts.append(PcmBuffer.from_bytes(data))
+        return PcmBuffer.crossfade(parts, self.config.tts_crossfade_ms / 1000)
+
+    def stand_in_narration(self, text, label):
+        """Preview audio without calling Gemini: the cached voice, else silence of the estimated length."""
+        audio = self.cached_narration(text) if self.config.preview_audio == 'cached' else None
+        if audio is not None:
+            return self.finalize_slide_audio(audio)
+        seconds = estimate_speech_seconds(text, self.config.preview_chars_per_second)
+        print(f"🔇 {label}: no cached voice, using {seconds:.1f}s of silence")
+        return PcmBuffer.silence(seconds)
+
+    def finalize_slide_audio(self, audio):
+        """Trim silence, cap long pauses and normalize loudness of one slide (audio_* settings)."""
+        if not self.config.audio_postprocess:
+            return audio
+        processed = process_slide_audio(
+            audio,
+            silence_db=self.config.audio_silence_db,
+            padding=self.config.audio_edge_padding,
+            max_pause=self.config.audio_max_pause,
+            target_dbfs=self.config.audio_target_dbfs
+        )
+        if processed.duration < audio.duration - 0.05:
+            print(f"✂️  Trimmed slide audio {audio.duration:.2f}s → {processed.duration:.2f}s")
+        return processed
+
+    def print_cache_stats(self):
+        """Print cache hit/miss statistics (shared by all runs of this process)."""
+        for name, cache in (("TTS cache", self.tts_cache), ("Segment cache", self.segment_cache)):
+            if cache is None:
+                continue
+            stats = cache.stats()
+            print(f"🗄️  {name}: {stats['hits']} hits / {stats['misses']} misses "
+                  f"({stats['hit_rate']:.0%}), {stats['bytes'] / 1024 / 1024:.1f}/"
+                  f"{stats['max_bytes'] / 1024 / 1024:.0f} MB, {stats['evictions']} evicted")
+        if self.artifacts is not None:
+            stats = self.artifacts.stats()
+            print(f"🗄️  Artifact store: {stats['objects']} objects, {stats['bytes'] / 1024 / 1024:.1f}/"
+                  f"{stats['max_bytes'] / 1024 / 1024:.0f} MB, {stats['saved_bytes'] / 1024 / 1024:.1f} MB "
+                  f"shared between runs, {stats['deduplicated']} files deduplicated")
+
+    def _tts_single_slide(self, descriptions, output_dir, slide_numbers):
+        """Synthesize slides concurrently (at most tts_workers in flight) and return files in slide order.
+        
+        Each slide is retried with backoff; slides that still fail raise an error after the
+        others have finished, so a resumed run only has to redo the failed slides.
+        """
+        total = len(descriptions)
+        workers = max(1, min(self.config.tts_workers, total))
+        print(f"🎤 Synthesizing {total} slides with {workers} concurrent TTS requests...")
+
+        def synthesize_slide(i):
+            slide_num = slide_numbers[i]
+            description = descriptions[i]
+
+            step = f"tts:slide_{slide_num}"
+            input_hash = hash_text(description)
+            cached = self._cached_step(step, input_hash)
+            if cached is None and self.uses_stand_in_audio():
+                # Real audio of an earlier run is kept; stand-ins are recorded apart from it
+                input_hash = hash_inputs(input_hash, 'preview', self.config.preview_audio)
+                cached = self._cached_step(step, input_hash)
+            if cached is not None:
+                return cached['outputs'][0]
+
+            file_name = os.path.join(output_dir, f'slide_{slide_num}.wav')
+            if self.uses_stand_in_audio():
+                self.stand_in_narration(description, f"slide {slide_num}").write_wav(file_name)
+            else:
+                audio = self.synthesize_narration(description, f"slide {slide_num}", [slide_num])
+                self.finalize_slide_audio(audio).write_wav(file_name)
+            self._record_step(step, input_hash, [file_name])
+            print(f"✅ Slide {slide_num} audio ready")
+            return file_name
+
+        audio_files = [None] * total
+        failed = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(synthesize_slide, i): i for i in range(total)}
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    i = futures[future]
+                    try:
+                        audio_files[i] = future.result()
+                        self._publish_slide_audio(slide_numbers[i], audio_files[i])
+                    except Exception as e:
+                        failed[slide_numbers[i]] = e
+                    self._report_progress('tts', done, total)
+            except BaseException:
+                # Cancelled or interrupted: don't start the slides still waiting
+                for future in futures:
+                    future.cancel()
+                raise
+
+        if failed:
+            details = ", ".join(f"slide {num}: {err}" for num, err in sorted(failed.items()))
+            raise RuntimeError(f"TTS failed for {len(failed)} slides ({details})")
+
+        return audio_files
+
+    def _with_retries(self, func, label):
+        """Call func, retrying with exponential backoff (tts_max_retries, tts_retry_delay)."""
+        attempts = 1 + self.config.tts_max_retries
+        for attempt in range(1, attempts + 1):
+            try:
+                return func()
+            except Exception as e:
+                if attempt == attempts:
+                    print(f"❌ {label} failed after {attempts} attempts: {e}")
+                    raise
+                delay = self.config.tts_retry_delay * (2 ** (attempt - 1))
+                print(f"⚠️ {label} failed (attempt {attempt}/{attempts}): {e} - retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _tts_batch_with_splitting(self, descriptions, output_dir, tts_batch_size, slide_numbers):
+        """Process slides in batches and split using transcription.
+        
+        Runs as a pipeline: batch k is transcribed and split while batch k+1 is still being
+        synthesized. tts_workers bounds concurrent synthesis and transcribe_workers bounds
+        concurrent transcription, so the stage takes about as long as the slower stream.
+        """
+        batches = []
         for batch_start in range(0, len(descriptions), tts_batch_size):
             batch_end = min(batch_start + tts_batch_size, len(descriptions))
-            batch_descriptions = descriptions[batch_start:batch_end]
-            
-            print(f"Creating batch audio for slides {batch_start + 1}-{batch_end}/{len(descriptions)}")
-            
+            batch_numbers = slide_numbers[batch_start:batch_end]
+            combined_content = "\n\n".join(descriptions[batch_start:batch_end])
+            batches.append({
+                'start_slide': batch_numbers[0],
+                'end_slide': batch_numbers[-1],
+                'slide_numbers': batch_numbers,
+                'slide_count': len(batch_numbers),
+                'texts': descriptions[batch_start:batch_end],
+                'content': combined_content,
+                'step': f"tts:batch_{batch_numbers[0]}_to_{batch_numbers[-1]}",
+                'input_hash': hash_text(combined_content)
+            })
+        
+        tts_slots = threading.BoundedSemaphore(max(1, self.config.tts_workers))
+        transcribe_slots = threading.BoundedSemaphore(max(1, self.config.transcribe_workers))
+        
+        def process_batch_audio(batch):
+            cached = self._cached_step(batch['step'], batch['input_hash'])
+            if cached is not None:
+                return cached['outputs']
+            with tts_slots:
+                audio = self._synthesize_batch(batch)
+            with transcribe_slots:
+                return self._split_batch(batch, audio, output_dir)
+        
+        workers = max(1, min(len(batches), self.config.tts_workers + self.config.transcribe_workers))
+        print(f"🎤 Synthesizing and splitting {len(batches)} batches "
+              f"({self.config.tts_workers} TTS / {self.config.transcribe_workers} transcription in flight)...")
+        
+        batch_files = [None] * len(batches)
+        failed = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(process_batch_audio, batch): i for i, batch in enumerate(batches)}
             try:
-                # Combine descriptions for this batch
-                combined_content = "\n\n".join(batch_descriptions)
-                
-                response = self.gemini_client.models.generate_content(
-                    model="gemini-2.5-flash-preview-tts",
-                    contents=f"Đọc trong tiếng việt. {combined_content}",
-                    config=types.GenerateContentConfig(
-                        response_modalities=["AUDIO"],
-                        speech_config=types.SpeechConfig(
-                            voice_config=types.VoiceConfig(
-                                prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                                    voice_name='Charon',
-                                )
-                            )
-                        ),
-                    )
-                )
-                
-                data = response.candidates[0].content.parts[0].inline_data.data
-                batch_file_name = os.path.join(output_dir, f'batch_{batch_start + 1}_to_{batch_end}.wav')
-                self.wave_file(batch_file_name, data)
-                
-                batch_audio_files.append(batch_file_name)
-                batch_info.append({
-                    'file': batch_file_name,
-                    'start_slide': batch_start + 1,
-                    'end_slide': batch_end,
-                    'slide_count': batch_end - batch_start
-                })
-                
-                print(f"✅ Created batch file: {batch_file_name}")
-                
-            except Exception as e:
-                print(f"❌ Error creating batch audio for slides {batch_start + 1}-{batch_end}: {e}")
-                # Create fallback batch file
-                batch_file_name = os.path.join(output_dir, f'batch_{batch_start + 1}_to_{batch_end}.wav')
-                self.create_silent_audio(batch_file_name, duration=10.0 * (batch_end - batch_start))
-                batch_audio_files.append(batch_file_name)
-                batch_info.append({
-                    'file': batch_file_name,
-                    'start_slide': batch_start + 1,
-                    'end_slide': batch_end,
-                    'slide_count': batch_end - batch_start
-                })
+                for done, future in enumerate(as_completed(futures), 1):
+                    i = futures[future]
+                    try:
+                        batch_files[i] = future.result()
+                        for slide_num, slide_file in zip(batches[i]['slide_numbers'], batch_files[i]):
+                            self._publish_slide_audio(slide_num, slide_file)
+                    except Exception as e:
+                        failed[f"{batches[i]['start_slide']}-{batches[i]['end_slide']}"] = e
+                    self._report_progress('tts', done, len(batches))
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        
+        if failed:
+            details = ", ".join(f"slides {label}: {err}" for label, err in failed.items())
+            raise RuntimeError(f"Batch TTS failed for {len(failed)} batches ({details})")
+        
+        all_slide_files = [path for files in batch_files for path in files]
+        print(f"✅ Created {len(all_slide_files)} individual slide audio files")
+        return all_slide_files
+
+    def _synthesize_batch(self, batch):
+        """Synthesize one batch and keep its audio in memory until it is split."""
+        label = f"{batch['start_slide']}-{batch['end_slide']}"
+        print(f"🎤 Creating batch audio for slides {label}")
+        data = self._with_retries(lambda: self.synthesize_speech(batch['content'], batch['slide_numbers']),
+                                 f"TTS batch {label}")
+        return PcmBuffer.from_bytes(data)
+
+    def _split_batch(self, batch, audio, output_dir):
+        """Split one batch's audio into per-slide files (locally, or by Whisper 'Trình N' markers)."""
+        label = f"{batch['start_slide']}-{batch['end_slide']}"
+        
+        def transcribe_segments():
+            segments = self.find_marker_segments(audio, batch['slide_numbers'])
+            if len(segments) < batch['slide_count']:
+                raise RuntimeError(f"found {len(segments)} of {batch['slide_count']} slide markers")
+            return segments[:batch['slide_count']]
         
-        # Step 2: Split each batch file into individual slides
-        print("\n🔪 Step 2: Splitting batch files into individual slides...")
-        all_slide_files = []
+        segments = []
+        if self.config.local_segmentation:
+            segments = self.segment_audio_locally(audio, batch['texts'], f"batch {label}")
+        if not segments:
+            segments = self._with_retries(transcribe_segments, f"Splitting batch {label}")
         
-        for batch in batch_info:
-            print(f"Processing batch: {batch['file']}")
-            
-            try:
-                # Create temporary directory for this batch
-                batch_output_dir = os.path.join(output_dir, f"temp_batch_{batch['start_slide']}_to_{batch['end_slide']}")
-                
-                # Split the batch audio file
-                segment_files = self.transcribe_and_split_audio(batch['file'], batch_output_dir)
-                
-                # Rename and move segments to match slide numbers
-                for i, segment_file in enumerate(segment_files[:batch['slide_count']]):
-                    slide_num = batch['start_slide'] + i
-                    final_slide_file = os.path.join(output_dir, f'slide_{slide_num}.wav')
-                    
-                    # Copy segment to final location
-                    import shutil
-                    shutil.copy2(segment_file, final_slide_file)
-                    all_slide_files.append(final_slide_file)
-                    
-                    print(f"✅ Created slide audio: slide_{slide_num}.wav")
-                
-                # Clean up temporary directory
-                import shutil
-                shutil.rmtree(batch_output_dir, ignore_errors=True)
-                
-            except Exception as e:
-                print(f"❌ Error splitting batch {batch['file']}: {e}")
-                # Create fallback individual files
-                for i in range(batch['slide_count']):
-                    slide_num = batch['start_slide'] + i
-                    fallback_file = os.path.join(output_dir, f'slide_{slide_num}.wav')
-                    self.create_silent_audio(fallback_file, duration=5.0)
-                    all_slide_files.append(fallback_file)
-        
-        # Step 3: Clean up batch files
-        print("\n🧹 Step 3: Cleaning up batch files...")
-        for batch_file in batch_audio_files:
-            try:
-                os.remove(batch_file)
-                print(f"🗑️  Removed batch file: {os.path.basename(batch_file)}")
-            except:
-                pass
+        # Name segments after their slide numbers; each slide file is written exactly once
+        for segment, slide_num in zip(segments, batch['slide_numbers']):
+            segment['label'] = f'slide_{slide_num}'
+        slide_files = self._split_audio(audio, segments, output_dir, finalize=True)
         
-        print(f"✅ Created {len(all_slide_files)} individual slide audio files")
-        return sorted(all_slide_files)  # Ensure correct order
+        self._record_step(batch['step'], batch['input_hash'], slide_files)
+        return slide_files
 
     def create_silent_audio(self, filename, duration=5.0, rate=24000):
         """Creates a silent audio file as fallback."""
-        samples = int(duration * rate)
-        silent_data = b'\x00\x00' * samples  # 16-bit silence
-        self.wave_file(filename, silent_data, rate=rate)
+        PcmBuffer.silence(duration, rate).write_wav(filename)
 
     def transcribe_and_split_audio(self, audio_file_path, output_dir="output_segments"):
         """
@@ -768,22 +1259,36 @@ emphasize of the speech is identify by the caps of the word, the !!! the ??? the
         Returns:
             List of segment file paths
         """
-        from pydub import AudioSegment
-        import os
-        
         print(f"🎤 Transcribing audio: {audio_file_path}")
+        audio = PcmBuffer.from_file(audio_file_path)
+        segments = self.find_marker_segments(audio)
         
-        # Initialize OpenAI client for transcription
-        client = OpenAI(api_key=self.openai_api_key)
+        if not segments:
+            return []
+
+        # Split audio into segments
+        segment_files = self._split_audio(audio, segments, output_dir)
         
-        # Transcribe audio with word-level timestamps
-        with open(audio_file_path, "rb") as audio_file:
+        print(f"✅ Audio split into {len(segment_files)} segments!")
+        return segment_files
+
+    def find_marker_segments(self, audio, slides=()):
+        """Transcribe in-memory audio with Whisper and return the segments between 'Trình X' markers.
+        
+        slides are the slide numbers spoken in the audio (for usage accounting).
+        """
+        client = self.clients.openai()
+        
+        # Transcribe audio with word-level timestamps (uploaded from memory)
+        with self.limits.slot('whisper'):
+            started = time.time()
             transcription = client.audio.transcriptions.create(
-                file=audio_file,
-                model="whisper-1",
+                file=("audio.wav", audio.to_wav_bytes()),
+                model=WHISPER_MODEL,
                 response_format="verbose_json",
                 timestamp_granularities=["word"]
             )
+        self.usage.record('transcribe', WHISPER_MODEL, slides, started=started, audio_seconds=audio.duration)
 
         print("📝 Transcription completed!")
         print(f"Text: {transcription.text}...")
@@ -799,12 +1304,27 @@ emphasize of the speech is identify by the caps of the word, the !!! the ??? the
         for i, segment in enumerate(segments):
             duration = segment['end'] - segment['start']
             print(f"  Segment {i + 1}: {segment['start']:.2f}s - {segment['end']:.2f}s (duration: {duration:.2f}s)")
+        return segments
 
-        # Split audio into segments
-        segment_files = self._split_audio(audio_file_path, segments, output_dir)
+    def segment_audio_locally(self, audio, texts, name="audio"):
+        """
+        Segment batched speech into slides offline from pauses and slide text lengths.
         
-        print(f"✅ Audio split into {len(segment_files)} segments!")
-        return segment_files
+        Args:
+            audio: PcmBuffer of the whole batch
+            texts: Text of every slide in the batch (with its '#Trình N#' marker)
+            name: Name used in log messages
+            
+        Returns:
+            List of segments, or [] when the split is not confident enough
+        """
+        segments, confidence = segment_by_text(audio.samples, audio.rate, texts)
+        if confidence < self.config.segmentation_min_confidence:
+            print(f"⚠️ Local split of {name} not confident ({confidence:.2f}), falling back to Whisper")
+            return []
+        
+        print(f"🔍 Local split of {name} into {len(segments)} segments (confidence {confidence:.2f})")
+        return segments
 
     def _find_presentation_segments(self, words):
         """Find segments based on 'Trình X' or 'Chình X' markers in transcription."""
@@ -868,35 +1388,27 @@ emphasize of the speech is identify by the caps of the word, the !!! the ??? the
         
         return segments
 
-    def _split_audio(self, audio_path, segments, output_dir):
-        """Split audio file into segments."""
-        from pydub import AudioSegment
-        import os
+    def _split_audio(self, audio, segments, output_dir, finalize=False):
+        """Write each segment of a PcmBuffer (zero-copy slices) to <label>.wav.
         
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-        
-        # Load audio file
-        audio = AudioSegment.from_file(audio_path)
+        With finalize=True every segment also goes through finalize_slide_audio.
+        """
+        os.makedirs(output_dir, exist_ok=True)
         segment_files = []
         
-        for i, segment in enumerate(segments):
-            start_ms = int(segment['start'] * 1000)  # Convert to milliseconds
-            end_ms = int(segment['end'] * 1000)
-            
-            # Extract segment
-            segment_audio = audio[start_ms:end_ms]
-            
-            # Save segment with label name
+        for segment in segments:
             output_path = os.path.join(output_dir, f"{segment['label']}.wav")
-            segment_audio.export(output_path, format="wav")
+            segment_audio = audio.slice(segment['start'], segment['end'])
+            if finalize:
+                segment_audio = self.finalize_slide_audio(segment_audio)
+            segment_audio.write_wav(output_path)
             segment_files.append(output_path)
             
             print(f"💾 Saved: {output_path}")
             
             # Print duration info
             duration = segment['end'] - segment['start']
-            print(f"   Duration: {duration:.2f}s ({start_ms}ms - {end_ms}ms)")
+            print(f"   Duration: {duration:.2f}s ({segment['start']:.2f}s - {segment['end']:.2f}s)")
         
         return segment_files
 
@@ -912,6 +1424,245 @@ emphasize of the speech is identify by the caps of the word, the !!! the ??? the
         print(f"📁 Created output folder: {full_output_path}")
         return full_output_path
 
+    def run_workflow(self, pdf_path, output_folder, pdf_batch_size=3, tts_batch_size=5, use_batch_splitting=True):
+        """
+        Run the complete PDF to video workflow inside output_folder.
+        
+        Every completed step is recorded in the folder's manifest.json, so running
+        again on the same folder (resume) only redoes steps that failed or whose
+        inputs changed.
+        
+        Returns:
+            tuple: (video_path, audio_files, durations)
+        """
+        try:
+            return self._run_workflow(pdf_path, output_folder, pdf_batch_size, tts_batch_size, use_batch_splitting)
+        finally:
+            self.usage.save()
+
+    def _run_workflow(self, pdf_path, output_folder, pdf_batch_size, tts_batch_size, use_batch_splitting):
+        self.manifest = RunManifest(output_folder, store=self.artifacts)
+        self.manifest.update_settings(
+            pdf_path=os.path.abspath(pdf_path),
+            pdf_batch_size=pdf_batch_size,
+            tts_batch_size=tts_batch_size,
+            use_batch_splitting=use_batch_splitting
+        )
+        self.start_usage(output_folder, pdf_batch_size, tts_batch_size, use_batch_splitting)
+        self.record_page_fingerprints(pdf_path)
+        
+        if use_batch_splitting and tts_batch_size > 1:
+            return self.test_workflow_with_batch_splitting(
+                pdf_path, output_folder, pdf_batch_size, tts_batch_size
+            )
+        
+        print("📄 Processing PDF slides...")
+        descriptions_file, image_files = self.process_pdf_to_descriptions(pdf_path, output_folder, pdf_batch_size)
+        
+        print("🤖 Enhancing content with Claude AI...")
+        final_context_file = self.process_with_claude(descriptions_file, output_folder)
+        
+        print("🎤 Generating Vietnamese audio...")
+        with self.hls_stream(image_files, output_folder) as stream:
+            audio_files, vietnamese_descriptions, translated_file = self.generate_vietnamese_audio(
+                final_context_file, output_folder, tts_batch_size=1
+            )
+            if stream is not None:
+                stream.finish(audio_files)
+        
+        print("🎥 Creating final video...")
+        video_path, durations = self.create_video_with_audio(image_files, audio_files, output_folder)
+        
+        return video_path, audio_files, durations
+
+    def start_usage(self, output_folder, pdf_batch_size, tts_batch_size, use_batch_splitting):
+        """Account API usage of this run in the run folder's usage.json (resumed runs add to it)."""
+        self.usage = UsageTracker(output_folder, self.config.model_prices)
+        self.usage.update_settings(
+            pdf_batch_size=pdf_batch_size,
+            tts_batch_size=tts_batch_size if use_batch_splitting else 1,
+            provider_concurrency=dict(self.limits.concurrency),
+            tts_workers=self.config.tts_workers,
+            preview=self.config.preview,
+            description_mode=self.config.description_mode
+        )
+
+    def record_page_fingerprints(self, pdf_path):
+        """Store per-page render/text hashes in the manifest (used by incremental runs)."""
+        input_hash = hash_file(pdf_path)
+        cached = self._cached_step("pages", input_hash)
+        if cached is not None:
+            fingerprints = cached['data']
+        else:
+            fingerprints = page_fingerprints(pdf_path)
+            self._record_step("pages", input_hash, data=fingerprints)
+        self.usage.update_settings(slides=len(fingerprints))
+        return fingerprints
+
+    def run_incremental_workflow(self, pdf_path, previous_run_dir, output_folder, pdf_batch_size=3,
+                                 tts_batch_size=5, use_batch_splitting=True):
+        """
+        Regenerate the video of an edited deck, reusing a previous run.
+        
+        Pages are matched against the previous run by render and text hashes. Only
+        changed slides get new descriptions, Claude refinement, translation and audio;
+        everything else is linked from the previous run before the final video is
+        re-assembled.
+        
+        Returns:
+            tuple: (video_path, audio_files, durations)
+        """
+        try:
+            return self._run_incremental_workflow(pdf_path, previous_run_dir, output_folder, pdf_batch_size,
+                                                  tts_batch_size, use_batch_splitting)
+        finally:
+            self.usage.save()
+
+    def _run_incremental_workflow(self, pdf_path, previous_run_dir, output_folder, pdf_batch_size,
+                                  tts_batch_size, use_batch_splitting):
+        previous = RunManifest(previous_run_dir)
+        old_pages = (previous.data['steps'].get('pages') or {}).get('data')
+        if not old_pages:
+            print("⚠️ Previous run has no page fingerprints, running the full workflow instead")
+            return self.run_workflow(pdf_path, output_folder, pdf_batch_size, tts_batch_size, use_batch_splitting)
+        
+        self.manifest = RunManifest(output_folder, store=self.artifacts)
+        self.manifest.update_settings(
+            pdf_path=os.path.abspath(pdf_path),
+            pdf_batch_size=pdf_batch_size,
+            tts_batch_size=tts_batch_size,
+            use_batch_splitting=use_batch_splitting,
+            incremental_from=os.path.abspath(previous_run_dir)
+        )
+        self.start_usage(output_folder, pdf_batch_size, tts_batch_size, use_batch_splitting)
+        new_pages = self.record_page_fingerprints(pdf_path)
+        total_slides = len(new_pages)
+        
+        old_descriptions = read_slide_texts(os.path.join(previous_run_dir, "descriptions.txt"))
+        old_final = read_slide_texts(os.path.join(previous_run_dir, "final-context.txt"))
+        old_translated = read_slide_texts(os.path.join(previous_run_dir, "translated_descriptions.txt"))
+        
+        # A slide is reused only if the previous run has every artifact for it
+        reuse = {}
+        for i, match in enumerate(match_pages(new_pages, old_pages), 1):
+            if match is None:
+                continue
+            old_num = match + 1
+            old_image = os.path.join(previous_run_dir, 'images', f'slide_{old_num}.png')
+            if os.path.exists(old_image) and all(old_num in texts for texts in (old_descriptions, old_final, old_translated)):
+                reuse[i] = old_num
+        changed = [n for n in range(1, total_slides + 1) if n not in reuse]
+        
+        print("🚀 Starting incremental workflow")
+        print(f"📂 Previous run: {previous_run_dir}")
+        print(f"♻️  Reusing {len(reuse)}/{total_slides} slides, regenerating: {changed or 'none'}")
+        print("=" * 60)
+        
+        # Step 1: Render only the changed pages
+        print("Step 1: Rendering changed slides...")
+        self._report_progress('images')
+        image_folder = os.path.join(output_folder, 'images')
+        os.makedirs(image_folder, exist_ok=True)
+        import fitz  # PyMuPDF
+        pdf_document = fitz.open(pdf_path)
+        image_files = []
+        for n in range(1, total_slides + 1):
+            if n in reuse:
+                old_image = os.path.join(previous_run_dir, 'images', f'slide_{reuse[n]}.png')
+                image_files.append(link_or_copy(old_image, os.path.join(image_folder, f'slide_{n}.png')))
+            else:
+                image_files.append(self.render_page(pdf_document, n - 1, image_folder))
+        pdf_document.close()
+        
+        # Step 2: Describe changed slides (previous slide's description keeps the transitions)
+        print("\nStep 2: Describing changed slides...")
+        self._report_progress('describe')
+        if changed:
+            self.prepare_slide_inputs(pdf_path)
+        descriptions = {n: old_descriptions[old_num] for n, old_num in reuse.items()}
+        for group in group_consecutive(changed, pdf_batch_size):
+            batch_files = [image_files[n - 1] for n in group]
+            content = self.describe_batch(batch_files, group[0], descriptions.get(group[0] - 1, ""), group[0] == 1)
+            descriptions.update(self.parse_slide_content(content))
+        self.report_slide_inputs(output_folder, changed)
+        descriptions_file = os.path.join(output_folder, "descriptions.txt")
+        self.save_descriptions([descriptions.get(n, "") for n in range(1, total_slides + 1)], descriptions_file)
+        
+        # Step 3: Refine changed slides with Claude
+        print("\nStep 3: Processing changed slides with Claude...")
+        self._report_progress('refine')
+        full_content = "\n".join(
+            f"#slide{n}#\n{old_final[reuse[n]] if n in reuse else descriptions.get(n, '')}\n"
+            for n in range(1, total_slides + 1)
+        )
+        for group in group_consecutive(changed, CLAUDE_BATCH_SIZE):
+            full_content = self.refine_batch(full_content, group[0], group[-1], total_slides)
+        final_context_file = os.path.join(output_folder, "final-context.txt")
+        self.write_file(final_context_file, full_content)
+        
+        # Step 4: Translate changed slides only
+        print("\nStep 4: Translating changed slides...")
+        self._report_progress('translate')
+        final_texts = parse_slide_texts(full_content)
+        translated = {n: old_translated[old_num] for n, old_num in reuse.items()}
+        if changed:
+            changed_content = "\n\n".join(f"#slide{n}#\n{final_texts.get(n, '')}" for n in changed)
+            input_hash = hash_text(changed_content)
+            cached = self._cached_step("translate:changed", input_hash)
+            if cached is not None:
+                translated_changed = cached['data']
+            else:
+                translated_changed = self.translate_content(changed_content)
+                self._record_step("translate:changed", input_hash, data=translated_changed)
+            translated.update(parse_slide_texts(translated_changed))
+        vietnamese_descriptions = [f"#Trình {n}#\n{translated.get(n, '')}" for n in range(1, total_slides + 1)]
+        translated_file = os.path.join(output_folder, "translated_descriptions.txt")
+        with open(translated_file, "w", encoding="utf-8") as file:
+            file.write("\n\n".join(vietnamese_descriptions))
+        
+        # Step 5: Audio - the spoken '#Trình N#' marker must still match, so only
+        # slides that kept their number can reuse the old audio
+        print("\nStep 5: Generating audio for changed slides...")
+        audio_folder = os.path.join(output_folder, 'audio')
+        os.makedirs(audio_folder, exist_ok=True)
+        audio_by_slide = {}
+        tts_numbers = []
+        with self.hls_stream(image_files, output_folder) as stream:
+            for n in range(1, total_slides + 1):
+                old_audio = os.path.join(previous_run_dir, 'audio', f'slide_{reuse.get(n)}.wav')
+                if reuse.get(n) == n and os.path.exists(old_audio):
+                    audio_file = link_or_copy(old_audio, os.path.join(audio_folder, f'slide_{n}.wav'))
+                    self._record_step(f"tts:slide_{n}", hash_text(vietnamese_descriptions[n - 1]), [audio_file])
+                    self._publish_slide_audio(n, audio_file)
+                    audio_by_slide[n] = audio_file
+                else:
+                    tts_numbers.append(n)
+            
+            if tts_numbers:
+                new_audio_files = self.text_to_speech_vietnamese_batch(
+                    [vietnamese_descriptions[n - 1] for n in tts_numbers],
+                    audio_folder,
+                    tts_batch_size if use_batch_splitting else 1,
+                    slide_numbers=tts_numbers
+                )
+                audio_by_slide.update(zip(tts_numbers, new_audio_files))
+            audio_files = [audio_by_slide[n] for n in range(1, total_slides + 1)]
+            if stream is not None:
+                stream.finish(audio_files)
+        
+        # Step 6: Re-assemble the final video
+        print("\nStep 6: Re-assembling final video...")
+        video_path, durations = self.create_video_with_audio(image_files, audio_files, output_folder)
+        
+        print("\n" + "=" * 60)
+        print("🎉 Incremental workflow completed!")
+        print(f"♻️  Reused slides: {len(reuse)}/{total_slides}")
+        print(f"🎤 Re-synthesized audio: {len(tts_numbers)} slides")
+        print(f"🎥 Final video: {video_path}")
+        self.print_cache_stats()
+        
+        return video_path, audio_files, durations
+
     def test_workflow_with_batch_splitting(self, pdf_path, output_folder, pdf_batch_size=3, tts_batch_size=5):
         """
         Test the complete workflow with batch TTS and audio splitting.
@@ -938,9 +1689,12 @@ emphasize of the speech is identify by the caps of the word, the !!! the ??? the
         
         # Step 3: Generate audio with batch splitting
         print(f"\nStep 3: Generating Vietnamese audio (batch size: {tts_batch_size})...")
-        audio_files, vietnamese_descriptions, translated_file = self.generate_vietnamese_audio(
-            final_context_file, output_folder, tts_batch_size
-        )
+        with self.hls_stream(image_files, output_folder) as stream:
+            audio_files, vietnamese_descriptions, translated_file = self.generate_vietnamese_audio(
+                final_context_file, output_folder, tts_batch_size
+            )
+            if stream is not None:
+                stream.finish(audio_files)
         
         print(f"✅ Generated {len(audio_files)} individual audio files")
         
@@ -953,9 +1707,7 @@ emphasize of the speech is identify by the caps of the word, the !!! the ??? the
             else:
                 # Get audio duration
                 try:
-                    audio_clip = AudioFileClip(audio_file)
-                    duration = audio_clip.duration
-                    audio_clip.close()
+                    duration = PcmBuffer.from_file(audio_file).duration
                     print(f"✅ slide_{i+1}.wav: {duration:.2f}s")
                 except:
                     print(f"⚠️  slide_{i+1}.wav: Could not read duration")
@@ -975,6 +1727,7 @@ emphasize of the speech is identify by the caps of the word, the !!! the ??? the
         print(f"⏱️  Total video duration: {sum(durations):.2f}s")
         print(f"📁 Output folder: {output_folder}")
         print(f"🎥 Final video: {video_path}")
+        self.print_cache_stats()
         
         return video_path, audio_files, durations
 
@@ -992,7 +1745,7 @@ def main():
         print("❌ Error: API keys not found! Please check your .env file.")
         return
         
-    processor = GPTProcessor(openai_api_key, anthropic_api_key, gemini_api_key)
+    processor = GPTProcessor(openai_api_key, anthropic_api_key, gemini_api_key, config=config)
 
     pdf_path = '/Users/twang/Downloads/Week 1 - Summary copy.pdf'
     
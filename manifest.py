@@ -0,0 +1,157 @@
+"""
+S2V (Slides to Video) - Run manifest
+Keeps track of completed stage outputs (with content hashes) inside a run folder,
+so a failed or interrupted run can be resumed without redoing finished work.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+MANIFEST_FILE = "manifest.json"
+
+
+def hash_bytes(data):
+    """Return the SHA-256 hex digest of raw bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text):
+    """Return the SHA-256 hex digest of a text string."""
+    return hash_bytes(text.encode('utf-8'))
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_inputs(*parts):
+    """Combine several step inputs (strings, numbers, lists) into one hash."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (list, tuple)):
+            part = hash_inputs(*part)
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class RunManifest:
+    """Manifest of completed steps for one run folder (stored as manifest.json)"""
+
+    def __init__(self, run_dir, store=None):
+        """
+        Args:
+            run_dir: Run folder of manifest.json
+            store: Optional ArtifactStore that recorded outputs are stored in (hard-linked)
+        """
+        self.run_dir = os.path.abspath(run_dir)
+        self.store = store
+        self.path = os.path.join(self.run_dir, MANIFEST_FILE)
+        self._lock = threading.Lock()
+        self.data = {
+            'version': 1,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'settings': {},
+            'steps': {}
+        }
+        self.load()
+
+    @staticmethod
+    def exists(run_dir):
+        """Check whether a run folder contains a manifest."""
+        return os.path.exists(os.path.join(run_dir, MANIFEST_FILE))
+
+    @property
+    def settings(self):
+        return self.data['settings']
+
+    def load(self):
+        """Load manifest from disk if it exists"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data.update(json.load(f))
+        except Exception as e:
+            print(f"⚠️ Could not read manifest {self.path}: {e}")
+
+    def save(self):
+        """Write manifest atomically so a crash never leaves a half-written file."""
+        os.makedirs(self.run_dir, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def update_settings(self, **settings):
+        """Store the settings used for this run (PDF path, batch sizes, ...)."""
+        with self._lock:
+            self.data['settings'].update(settings)
+            self.save()
+
+    def _relative(self, path):
+        path = os.path.abspath(path)
+        if path.startswith(self.run_dir + os.sep):
+            return os.path.relpath(path, self.run_dir)
+        return path
+
+    def _absolute(self, path):
+        return path if os.path.isabs(path) else os.path.join(self.run_dir, path)
+
+    def lookup(self, step, input_hash):
+        """
+        Return the recorded result of a step if it is still valid.
+
+        A step is valid when it was recorded with the same input hash and all of
+        its output files still exist with the recorded content hash.
+
+        Returns:
+            dict with 'outputs' (absolute paths) and 'data', or None
+        """
+        with self._lock:
+            entry = self.data['steps'].get(step)
+        if not entry or entry.get('input_hash') != input_hash:
+            return None
+
+        outputs = []
+        for output in entry.get('outputs', []):
+            path = self._absolute(output['path'])
+            if not os.path.exists(path) or hash_file(path) != output['hash']:
+                return None
+            outputs.append(path)
+
+        return {'outputs': outputs, 'data': entry.get('data')}
+
+    def record(self, step, input_hash, outputs=(), data=None):
+        """Record a completed step with the content hashes of its outputs."""
+        entry = {
+            'input_hash': input_hash,
+            'outputs': [{'path': self._relative(path), 'hash': hash_file(path)} for path in outputs],
+            'data': data,
+            'completed_at': datetime.now().isoformat(timespec='seconds')
+        }
+        if self.store is not None:
+            for path, output in zip(outputs, entry['outputs']):
+                self.store.add(path, self.run_dir, output['hash'])
+        with self._lock:
+            self.data['steps'][step] = entry
+            self.save()
+
+    def invalidate(self, step):
+        """Forget a step so it is redone on the next run."""
+        with self._lock:
+            if self.data['steps'].pop(step, None) is not None:
+                self.save()
+
+    def completed_steps(self):
+        """Return names of all recorded steps."""
+        with self._lock:
+            return list(self.data['steps'].keys())
@@ -0,0 +1,170 @@
+"""
+S2V (Slides to Video) - Local audio segmentation
+Splits batched TTS audio into per-slide segments offline: frame energy finds the
+pauses and the known slide text lengths decide which pauses are slide boundaries.
+A confidence score tells the caller when to fall back to Whisper markers instead.
+"""
+
+import math
+import re
+import numpy as np
+
+FRAME_MS = 10
+SILENCE_DB = -35.0              # Frames this far below the speech level count as silence
+MIN_PAUSE_SECONDS = 0.15        # Shorter gaps are treated as part of the speech
+BOUNDARY_PAUSE_SECONDS = 0.5    # A pause this long is a clear paragraph/slide break
+EDGE_PAD_SECONDS = 0.1          # Silence kept at both ends of a segment
+MIN_SEGMENT_SECONDS = 0.5
+MISSING_MARKER_CONFIDENCE = 0.3
+
+MARKER_PATTERN = re.compile(r'#(?:slide|Trình)\s*\d+#')
+
+
+def spoken_length(text):
+    """Approximate speaking length of a text as its number of spoken characters."""
+    text = re.sub(r'[#*_`>\[\]()]', ' ', text)
+    return len(re.sub(r'\s+', ' ', text).strip())
+
+
+def frame_levels(samples, rate, frame_ms=FRAME_MS):
+    """Return the RMS level (dBFS) of every frame_ms frame of int16 samples."""
+    frame = max(1, int(rate * frame_ms / 1000))
+    count = len(samples) // frame
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    frames = samples[:count * frame].astype(np.float32).reshape(count, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1)) / 32768.0
+    return 20 * np.log10(np.maximum(rms, 1e-6))
+
+
+def find_pauses(levels, frame_ms=FRAME_MS, silence_db=SILENCE_DB, min_pause=MIN_PAUSE_SECONDS):
+    """Return (start, end) seconds of every silent run of at least min_pause seconds."""
+    if len(levels) == 0:
+        return []
+
+    speech_level = np.percentile(levels, 95)
+    silent = (levels < speech_level + silence_db).astype(np.int8)
+    edges = np.diff(np.concatenate(([0], silent, [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    step = frame_ms / 1000
+    return [(s * step, e * step) for s, e in zip(starts, ends) if (e - s) * step >= min_pause]
+
+
+def _assign_boundaries(pauses, expected, tolerance):
+    """Pick one pause per expected boundary, in order, maximizing the total log score."""
+    def score(k, pause):
+        strength = min(1.0, (pause[1] - pause[0]) / BOUNDARY_PAUSE_SECONDS)
+        distance = ((pause[0] + pause[1]) / 2 - expected[k]) / tolerance
+        return strength * math.exp(-0.5 * distance * distance)
+
+    n, m = len(expected), len(pauses)
+    if n == 0:
+        return [], []
+    if m < n:
+        return None, None
+
+    # best[k][j]: best total for boundaries 0..k with boundary k placed at pause j
+    best = [[-math.inf] * m for _ in range(n)]
+    previous = [[None] * m for _ in range(n)]
+    for k in range(n):
+        running_best, running_index = -math.inf, None
+        for j in range(m):
+            if k > 0 and j > 0 and best[k - 1][j - 1] > running_best:
+                running_best, running_index = best[k - 1][j - 1], j - 1
+            base = 0.0 if k == 0 else running_best
+            if base == -math.inf:
+                continue
+            best[k][j] = base + math.log(score(k, pauses[j]) + 1e-6)
+            previous[k][j] = running_index
+
+    j = max(range(m), key=lambda index: best[n - 1][index])
+    if best[n - 1][j] == -math.inf:
+        return None, None
+
+    chosen = []
+    for k in range(n - 1, -1, -1):
+        chosen.append(j)
+        j = previous[k][j]
+    chosen.reverse()
+    return [pauses[j] for j in chosen], [score(k, pauses[j]) for k, j in enumerate(chosen)]
+
+
+def segment_by_text(samples, rate, texts, labels=None):
+    """
+    Place slide boundaries in batched speech using pauses and slide text lengths.
+
+    Every text is expected to start with its '#Trình N#' marker, which is spoken
+    by the TTS and cut off the segment (like the Whisper marker split).
+
+    Args:
+        samples: int16 mono samples of the whole batch
+        rate: Sample rate in Hz
+        texts: Text of every slide in the batch
+        labels: Segment label per slide (default slide_1, slide_2, ...)
+
+    Returns:
+        tuple: (segments [{'start', 'end', 'label'}], confidence between 0 and 1)
+    """
+    n = len(texts)
+    labels = labels or [f"slide_{i + 1}" for i in range(n)]
+    duration = len(samples) / rate
+    step = FRAME_MS / 1000
+
+    levels = frame_levels(samples, rate)
+    pauses = find_pauses(levels)
+    if n == 0 or len(levels) == 0:
+        return [], 0.0
+
+    # Leading and trailing silence are not candidate boundaries
+    speech_start, speech_end = 0.0, len(levels) * step
+    if pauses and pauses[0][0] == 0:
+        speech_start = pauses[0][1]
+    if pauses and pauses[-1][1] >= len(levels) * step - 1e-9:
+        speech_end = pauses[-1][0]
+    inner = [p for p in pauses if p[0] > speech_start and p[1] < speech_end]
+    speech_seconds = speech_end - speech_start
+    if speech_seconds <= 0:
+        return [], 0.0
+
+    marker_lengths = [sum(spoken_length(m) for m in MARKER_PATTERN.findall(text)) for text in texts]
+    lengths = [max(1, spoken_length(text)) for text in texts]
+    seconds_per_char = speech_seconds / sum(lengths)
+
+    # Expected boundary positions from the cumulative text length
+    cumulative = np.cumsum(lengths)[:-1]
+    expected = list(speech_start + cumulative * seconds_per_char)
+    tolerance = max(0.75, 0.2 * speech_seconds / n)
+
+    boundaries, scores = _assign_boundaries(inner, expected, tolerance)
+    if boundaries is None:
+        return [], 0.0
+    confidences = list(scores)
+
+    segments = []
+    for i in range(n):
+        start = speech_start if i == 0 else boundaries[i - 1][1]
+        end = speech_end if i == n - 1 else boundaries[i][0]
+
+        # Skip the spoken marker: it ends at the first pause shortly after the segment start
+        if marker_lengths[i]:
+            window = start + 2 * marker_lengths[i] * seconds_per_char + 0.4
+            marker_pause = next((p for p in inner if start <= p[0] <= window and p[1] < end), None)
+            if marker_pause is not None:
+                start = marker_pause[1]
+                confidences.append(1.0)
+            else:
+                confidences.append(MISSING_MARKER_CONFIDENCE)
+
+        if end - start < MIN_SEGMENT_SECONDS:
+            confidences.append(0.0)
+
+        segments.append({
+            'start': max(0.0, start - EDGE_PAD_SECONDS),
+            'end': min(duration, end + EDGE_PAD_SECONDS),
+            'label': labels[i]
+        })
+
+    return segments, min(confidences) if confidences else 1.0
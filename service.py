@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+S2V (Slides to Video) - Local job-queue service
+Long-running service that accepts conversion jobs over a local HTTP (or Unix
+socket) API, persists them in a SQLite queue and runs them on warm workers that
+share one GPTProcessor (clients, provider limits and caches).
+
+API:
+  POST /jobs                {"pdf_path": "...", "pdf_batch_size": 5, ...}  -> job
+  GET  /jobs                                                              -> list of jobs
+  GET  /jobs/<id>                                                         -> job (status + progress)
+  POST /jobs/<id>/cancel                                                  -> job
+  GET  /health
+"""
+
+import argparse
+import json
+import os
+import re
+import socketserver
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import Config
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed', 'cancelled')
+
+
+class JobCancelled(Exception):
+    """Raised inside a running workflow when its job was cancelled"""
+
+
+class JobQueue:
+    """SQLite-backed persistent job queue"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    pdf_path TEXT NOT NULL,
+                    settings TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    output_folder TEXT,
+                    progress TEXT,
+                    result TEXT,
+                    error TEXT,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+            """)
+
+    @staticmethod
+    def _now():
+        return datetime.now().isoformat(timespec='seconds')
+
+    @staticmethod
+    def _to_dict(row):
+        if row is None:
+            return None
+        job = dict(row)
+        for key in ('settings', 'progress', 'result'):
+            job[key] = json.loads(job[key]) if job[key] else None
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        return job
+
+    def submit(self, pdf_path, settings):
+        """Add a job to the queue and return it."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (pdf_path, settings, created_at) VALUES (?, ?, ?)",
+                (pdf_path, json.dumps(settings), self._now())
+            )
+        return self.get(cursor.lastrowid)
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row)
+
+    def list(self, status=None, limit=100):
+        query = "SELECT * FROM jobs"
+        params = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY id DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, params + (limit,)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def claim_next(self):
+        """Atomically move the oldest queued job to 'running' and return it (or None)."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+                (self._now(), row['id'])
+            )
+        return self.get(row['id'])
+
+    def update(self, job_id, **fields):
+        for key in ('progress', 'result'):
+            if key in fields:
+                fields[key] = json.dumps(fields[key])
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def finish(self, job_id, status, result=None, error=None):
+        self.update(job_id, status=status, result=result, error=error, finished_at=self._now())
+
+    def cancel(self, job_id):
+        """Cancel a queued job immediately, or ask a running job to stop."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', cancel_requested = 1, finished_at = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (self._now(), job_id)
+            )
+            self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'",
+                (job_id,)
+            )
+        return self.get(job_id)
+
+    def is_cancel_requested(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    def requeue_interrupted(self):
+        """Put jobs that were running when the service stopped back in the queue.
+
+        Their output folder is kept, so the manifest lets them resume where they stopped.
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'")
+        return cursor.rowcount
+
+
+class WorkerPool:
+    """Warm worker threads that run queued jobs on forks of one shared GPTProcessor"""
+
+    def __init__(self, processor, queue, config, workers=2, poll_interval=1.0):
+        self.processor = processor
+        self.queue = queue
+        self.config = config
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"s2v-worker-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            job = self.queue.claim_next()
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            self.run_job(job)
+
+    def run_job(self, job):
+        job_id = job['id']
+        settings = job['settings']
+        deck = self.processor.fork()
+
+        def on_progress(stage, done=None, total=None):
+            self.queue.update(job_id, progress={
+                'stage': stage,
+                'done': done,
+                'total': total,
+                'updated_at': JobQueue._now()
+            })
+            if self.queue.is_cancel_requested(job_id):
+                raise JobCancelled(f"job {job_id} cancelled")
+
+        deck.progress_callback = on_progress
+        start_time = time.time()
+        print(f"🚀 [job {job_id}] Starting: {job['pdf_path']}")
+
+        try:
+            output_folder = job['output_folder']
+            if not output_folder:
+                output_folder = deck.create_random_output_folder(
+                    settings.get('output_folder') or self.config.default_output_folder
+                )
+                self.queue.update(job_id, output_folder=output_folder)
+
+            video_path, audio_files, durations = deck.run_workflow(
+                job['pdf_path'],
+                output_folder,
+                settings.get('pdf_batch_size', self.config.pdf_batch_size),
+                settings.get('tts_batch_size', self.config.tts_batch_size),
+                settings.get('use_batch_splitting', self.config.use_batch_splitting)
+            )
+            if not durations:
+                raise RuntimeError("workflow did not produce a video")
+
+            self.queue.finish(job_id, 'done', result={
+                'video_path': video_path,
+                'slides': len(durations),
+                'video_seconds': sum(durations),
+                'processing_seconds': time.time() - start_time,
+                'cost': deck.usage.summary()['totals']['cost']
+            })
+            print(f"✅ [job {job_id}] Done in {time.time() - start_time:.1f}s: {video_path}")
+
+        except JobCancelled:
+            self.queue.finish(job_id, 'cancelled')
+            print(f"🛑 [job {job_id}] Cancelled")
+        except Exception as e:
+            traceback.print_exc()
+            self.queue.finish(job_id, 'failed', error=f"{type(e).__name__}: {e}")
+            print(f"❌ [job {job_id}] Failed: {e}")
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """JSON API for the job queue"""
+
+    server_version = "S2VService/1.0"
+
+    @property
+    def queue(self):
+        return self.server.job_queue
+
+    def address_string(self):
+        # Unix socket clients have no (host, port) address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False, indent=2).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length).decode('utf-8'))
+
+    def do_GET(self):
+        if self.path == '/health':
+            return self._send_json(200, {'status': 'ok'})
+
+        if self.path.rstrip('/') == '/jobs':
+            return self._send_json(200, self.queue.list())
+
+        match = re.fullmatch(r'/jobs/(\d+)', self.path)
+        if match:
+            job = self.queue.get(int(match.group(1)))
+            if job is None:
+                return self._send_json(404, {'error': 'job not found'})
+            return self._send_json(200, job)
+
+        self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path.rstrip('/') == '/jobs':
+            try:
+                payload = self._read_json()
+            except ValueError:
+                return self._send_json(400, {'error': 'invalid JSON body'})
+            if not isinstance(payload, dict):
+                return self._send_json(400, {'error': 'JSON body must be an object'})
+
+            pdf_path = payload.get('pdf_path', '')
+            if not isinstance(pdf_path, str) or not pdf_path or not os.path.exists(pdf_path) or not pdf_path.lower().endswith('.pdf'):
+                return self._send_json(400, {'error': f'PDF file does not exist: {pdf_path}'})
+
+            for key in ('pdf_batch_size', 'tts_batch_size'):
+                value = payload.get(key)
+                if key in payload and (not isinstance(value, int) or isinstance(value, bool) or value < 1):
+                    return self._send_json(400, {'error': f'{key} must be a positive integer'})
+            if 'use_batch_splitting' in payload and not isinstance(payload['use_batch_splitting'], bool):
+                return self._send_json(400, {'error': 'use_batch_splitting must be true or false'})
+            if 'output_folder' in payload and not isinstance(payload['output_folder'], str):
+                return self._send_json(400, {'error': 'output_folder must be a string'})
+
+            settings = {
+                key: payload[key] for key in
+                ('pdf_batch_size', 'tts_batch_size', 'use_batch_splitting', 'output_folder')
+                if key in payload
+            }
+            job = self.queue.submit(os.path.abspath(pdf_path), settings)
+            return self._send_json(201, job)
+
+        match = re.fullmatch(r'/jobs/(\d+)/cancel', self.path)
+        if match:
+            job = self.queue.cancel(int(match.group(1)))
+            if job is None:
+                return self._send_json(404, {'error': 'job not found'})
+            return self._send_json(200, job)
+
+        self._send_json(404, {'error': 'not found'})
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server listening on a Unix domain socket"""
+
+    daemon_threads = True
+
+
+def create_server(queue, host='127.0.0.1', port=8765, socket_path=None):
+    """Create the API server on a TCP port or a Unix socket."""
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = UnixHTTPServer(socket_path, ServiceRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+    server.job_queue = queue
+    return server
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(
+        description="S2V - Local job-queue service for PDF to Vietnamese video conversion",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Listen on localhost:8765 with 2 warm workers
+  python service.py --workers 2
+
+  # Listen on a Unix socket
+  python service.py --socket /tmp/s2v.sock
+
+  # Submit a job and check its progress
+  curl -X POST localhost:8765/jobs -d '{"pdf_path": "/data/week1.pdf"}'
+  curl localhost:8765/jobs/1
+  curl -X POST localhost:8765/jobs/1/cancel
+        """
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Host to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port to bind (default: 8765)')
+    parser.add_argument('--socket', help='Listen on this Unix socket instead of TCP')
+    parser.add_argument('--workers', type=int, default=2, help='Number of concurrent jobs (default: 2)')
+    parser.add_argument('--db', help='SQLite queue file (default: <output folder>/jobs.sqlite)')
+    parser.add_argument('--config', help='Load configuration from JSON file')
+    return parser
+
+
+def main():
+    """Service entry point"""
+    args = create_parser().parse_args()
+
+    config = Config()
+    if args.config:
+        config.load_from_file(args.config)
+
+    # Imported here so --help stays fast
+    from main import GPTProcessor
+
+    queue = JobQueue(args.db or os.path.join(config.default_output_folder, 'jobs.sqlite'))
+    requeued = queue.requeue_interrupted()
+    if requeued:
+        print(f"🔁 Re-queued {requeued} interrupted jobs (they resume from their manifest)")
+
+    processor = GPTProcessor(*config.get_api_keys(), config=config)
+    workers = WorkerPool(processor, queue, config, workers=args.workers)
+    workers.start()
+
+    server = create_server(queue, args.host, args.port, args.socket)
+    where = args.socket or f"http://{args.host}:{args.port}"
+    print(f"🚀 S2V service listening on {where} with {args.workers} workers")
+    print(f"🗄️  Job queue: {queue.db_path}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down...")
+    finally:
+        workers.stop()
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""
+S2V (Slides to Video) - Progressive HLS/DASH output
+Publishes every slide as HLS media segments the moment its audio is ready, into
+a live (EVENT) playlist that players can open while later slides are still being
+synthesized or encoded. The finished MP4 can additionally be packaged as DASH.
+"""
+
+import math
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from audio_buffer import PcmBuffer
+from video_encoder import AUDIO_CODEC_ARGS, frame_size, run_ffmpeg
+
+PLAYLIST_NAME = "index.m3u8"
+DASH_MANIFEST_NAME = "manifest.mpd"
+
+
+def parse_media_playlist(path):
+    """Return the (duration, uri) pairs of an HLS media playlist."""
+    entries = []
+    duration = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('#EXTINF:'):
+                duration = float(line[len('#EXTINF:'):].split(',', 1)[0])
+            elif line and not line.startswith('#') and duration is not None:
+                entries.append((duration, line))
+                duration = None
+    return entries
+
+
+class HlsPublisher:
+    """Encodes slides as their audio arrives and appends them, in slide order, to a live playlist"""
+
+    def __init__(self, encoder, image_files, output_dir):
+        """
+        Args:
+            encoder: VideoEncoder with the settings of the final video (its segment cache,
+                if any, lets the final encode reuse every published slide)
+            image_files: Slide images in order (slide N is image_files[N - 1])
+            output_dir: Directory of index.m3u8 and the media segments (cleared first)
+        """
+        self.encoder = encoder
+        self.image_files = image_files
+        self.output_dir = output_dir
+        self.playlist_file = os.path.join(output_dir, PLAYLIST_NAME)
+        self.work_dir = os.path.join(output_dir, "work")
+        # Segments are cut at keyframes, so none is longer than the keyframe interval
+        self.target_duration = max(1, math.ceil(encoder.keyframe_interval))
+
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.makedirs(self.work_dir)
+        # Publish the first rendition exactly as the final encode makes it (same size, rate
+        # and preview cap), so its segment cache hits on every published slide
+        self.width, self.height, self.rate_args = encoder.rendition_targets(*frame_size(image_files))[0]
+
+        self._lock = threading.Lock()
+        self._futures = {}    # slide number -> Future of its packaging job
+        self._packaged = {}   # slide number -> [(duration, uri)] not yet in the playlist
+        self._entries = []    # Playlist lines after the header
+        self._next_slide = 1
+        self._finished = False
+        self._executor = ThreadPoolExecutor(max_workers=encoder.workers)
+        self._write_playlist()
+
+    def add_slide(self, slide_num, audio_file):
+        """Queue a slide whose audio is ready (thread-safe; repeated calls are ignored)."""
+        with self._lock:
+            if slide_num in self._futures or self._finished:
+                return
+            self._futures[slide_num] = self._executor.submit(self._package_slide, slide_num, audio_file)
+
+    def _package_slide(self, slide_num, audio_file):
+        image_file = self.image_files[slide_num - 1]
+        pcm = PcmBuffer.from_file(audio_file)
+        frames = self.encoder.frame_count(pcm.duration)
+
+        video_file = os.path.join(self.work_dir, f"slide_{slide_num}.mp4")
+        audio_track = os.path.join(self.work_dir, f"slide_{slide_num}.wav")
+        slide_playlist = os.path.join(self.output_dir, f".slide_{slide_num}.m3u8")
+        try:
+            self.encoder.encode_slide(image_file, frames, [(video_file, self.width, self.height, self.rate_args)])
+            pcm.fit(frames / self.encoder.fps).write_wav(audio_track)
+            run_ffmpeg(self.encoder.ffmpeg, [
+                '-i', video_file, '-i', audio_track,
+                '-map', '0:v', '-map', '1:a',
+                '-c:v', 'copy', *AUDIO_CODEC_ARGS,
+                '-f', 'hls',
+                '-hls_time', str(self.encoder.keyframe_interval),
+                '-hls_list_size', '0',
+                '-hls_playlist_type', 'vod',
+                '-hls_segment_filename', os.path.join(self.output_dir, f"slide_{slide_num}_%03d.ts"),
+                slide_playlist
+            ])
+            entries = parse_media_playlist(slide_playlist)
+        finally:
+            for path in (video_file, audio_track, slide_playlist):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        with self._lock:
+            self._packaged[slide_num] = entries
+            self._publish_ready()
+
+    def _publish_ready(self):
+        # Called with the lock held: append every consecutive slide that is packaged
+        published = False
+        while self._next_slide in self._packaged:
+            entries = self._packaged.pop(self._next_slide)
+            if self._entries:
+                # Every slide restarts its timestamps
+                self._entries.append("#EXT-X-DISCONTINUITY")
+            for duration, uri in entries:
+                self._entries.extend([f"#EXTINF:{duration:.6f},", uri])
+            if self._next_slide == 1:
+                print(f"📡 First slide is playable: {self.playlist_file}")
+            self._next_slide += 1
+            published = True
+        if published:
+            self._write_playlist()
+
+    def _write_playlist(self, ended=False):
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            "#EXT-X-PLAYLIST-TYPE:EVENT",
+            f"#EXT-X-TARGETDURATION:{self.target_duration}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            *self._entries
+        ]
+        if ended:
+            lines.append("#EXT-X-ENDLIST")
+        # Replace atomically so players polling the playlist never read a partial file
+        tmp_path = f"{self.playlist_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.playlist_file)
+
+    def finish(self, audio_files):
+        """
+        Publish any slide not added yet, wait for all of them and close the playlist.
+
+        Returns:
+            Path of index.m3u8
+        """
+        for slide_num, audio_file in enumerate(audio_files, 1):
+            self.add_slide(slide_num, audio_file)
+        try:
+            for slide_num in sorted(self._futures):
+                self._futures[slide_num].result()
+        finally:
+            self._executor.shutdown(wait=True)
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+        with self._lock:
+            self._finished = True
+            self._write_playlist(ended=True)
+        print(f"📡 HLS playlist complete: {self.playlist_file}")
+        return self.playlist_file
+
+    def abort(self):
+        """Stop publishing after a failed run (the playlist stays open-ended)."""
+        with self._lock:
+            self._finished = True
+            for future in self._futures.values():
+                future.cancel()
+        self._executor.shutdown(wait=True)
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+def package_dash(ffmpeg, video_files, output_dir, segment_seconds=10):
+    """
+    Package finished MP4 renditions as one DASH presentation (stream copy, no re-encoding).
+
+    Every rendition becomes a video representation; the audio of the first one is
+    shared by all of them.
+
+    Returns:
+        Path of manifest.mpd
+    """
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.makedirs(output_dir)
+    manifest_file = os.path.join(output_dir, DASH_MANIFEST_NAME)
+    inputs = [arg for video_file in video_files for arg in ('-i', video_file)]
+    maps = [arg for k in range(len(video_files)) for arg in ('-map', f'{k}:v')]
+    run_ffmpeg(ffmpeg, [
+        *inputs,
+        *maps, '-map', '0:a', '-c', 'copy',
+        '-f', 'dash',
+        '-adaptation_sets', 'id=0,streams=v id=1,streams=a',
+        '-seg_duration', str(segment_seconds),
+        '-use_template', '1', '-use_timeline', '1',
+        manifest_file
+    ])
+    return manifest_file
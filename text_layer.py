@@ -0,0 +1,136 @@
+"""
+S2V (Slides to Video) - Slide text layer
+Extracts the text layer of PDF pages in reading order and measures how much of each
+page is covered by figures (pictures and vector drawings), so the hybrid
+description mode can send text-heavy slides as text instead of a full image.
+Also estimates the vision and text input tokens of a slide to report the savings.
+"""
+
+import math
+
+TEXT_MIN_CHARS = 40  # Slides with less text are described from the image alone
+MIXED_FIGURE_FRACTION = 0.05  # Above this figure coverage: text plus a small image
+FIGURE_FRACTION = 0.35  # Above this figure coverage: full image only
+BACKGROUND_FRACTION = 0.9  # Pictures/drawings covering more of the page are backgrounds
+MIN_DRAWING_FRACTION = 0.01  # Smaller drawings (bullets, rules) are decoration
+THUMBNAIL_WIDTH = 768  # Width of the small image sent with mixed slides
+
+# Vision input of gpt-4.1-mini: 32px patches (at most 1536 per image) times 1.62
+PATCH_SIZE = 32
+MAX_PATCHES = 1536
+PATCH_TOKEN_MULTIPLIER = 1.62
+CHARS_PER_TOKEN = 4  # Rough average of slide text
+
+
+def vision_tokens(width, height):
+    """Estimate the input tokens of one image of width x height pixels."""
+    patches = math.ceil(width / PATCH_SIZE) * math.ceil(height / PATCH_SIZE)
+    if patches > MAX_PATCHES:
+        # The image is scaled down until it fits in MAX_PATCHES whole patches
+        shrink = math.sqrt(PATCH_SIZE * PATCH_SIZE * MAX_PATCHES / (width * height))
+        columns, rows = width * shrink / PATCH_SIZE, height * shrink / PATCH_SIZE
+        shrink *= min(math.floor(columns) / columns, math.floor(rows) / rows)
+        patches = min(MAX_PATCHES, math.ceil(width * shrink / PATCH_SIZE) * math.ceil(height * shrink / PATCH_SIZE))
+    return math.ceil(patches * PATCH_TOKEN_MULTIPLIER)
+
+
+def text_tokens(text):
+    """Estimate the input tokens of a text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def render_zoom(page_width, page_height, min_width=1920, min_height=1080):
+    """Zoom at which a page is rendered to a slide image (at least min size, at least 2x)."""
+    return max(min_width / page_width, min_height / page_height, 2.0)
+
+
+def page_layout(page):
+    """
+    Read the text and figure coverage of a PDF page.
+
+    Returns:
+        tuple: (text blocks joined top to bottom, left to right; fraction of the page
+        covered by pictures and drawings, backgrounds and decoration excluded)
+    """
+    import fitz  # PyMuPDF
+    page_rect = page.rect
+    page_area = page_rect.get_area()
+
+    text_blocks = []
+    figure_area = 0.0
+    for block in page.get_text('dict')['blocks']:
+        rect = fitz.Rect(block['bbox']) & page_rect
+        if block['type'] == 1:
+            if rect.get_area() < BACKGROUND_FRACTION * page_area:
+                figure_area += rect.get_area()
+            continue
+        text = "\n".join("".join(span['text'] for span in line['spans']) for line in block['lines']).strip()
+        if text:
+            text_blocks.append((rect, text))
+
+    for drawing in page.get_drawings():
+        rect = fitz.Rect(drawing['rect']) & page_rect
+        area = rect.get_area()
+        if not MIN_DRAWING_FRACTION * page_area <= area < BACKGROUND_FRACTION * page_area:
+            continue
+        # Boxes drawn behind text (callouts, table cells) are layout, not figures
+        if any(rect.contains(fitz.Point((block.x0 + block.x1) / 2, (block.y0 + block.y1) / 2))
+               for block, _ in text_blocks):
+            continue
+        figure_area += area
+
+    text_blocks.sort(key=lambda item: (round(item[0].y0), item[0].x0))
+    text = "\n\n".join(text for _, text in text_blocks)
+    return text, min(1.0, figure_area / page_area) if page_area else 0.0
+
+
+def classify_slide(text, figure_fraction):
+    """Return how a slide is described: 'text', 'mixed' (text + small image) or 'figure' (image)."""
+    if len(text) < TEXT_MIN_CHARS or figure_fraction >= FIGURE_FRACTION:
+        return 'figure'
+    if figure_fraction >= MIXED_FIGURE_FRACTION:
+        return 'mixed'
+    return 'text'
+
+
+def analyze_deck(pdf_path):
+    """
+    Classify every page of a deck for the hybrid description mode.
+
+    Returns:
+        List of {'slide', 'kind', 'text', 'figure_fraction', 'width', 'height'} where
+        width x height is the size of the rendered slide image
+    """
+    import fitz  # PyMuPDF
+    pdf_document = fitz.open(pdf_path)
+    slides = []
+    for page in pdf_document:
+        text, figure_fraction = page_layout(page)
+        zoom = render_zoom(page.rect.width, page.rect.height)
+        slides.append({
+            'slide': page.number + 1,
+            'kind': classify_slide(text, figure_fraction),
+            'text': text,
+            'figure_fraction': round(figure_fraction, 3),
+            'width': round(page.rect.width * zoom),
+            'height': round(page.rect.height * zoom)
+        })
+    pdf_document.close()
+    return slides
+
+
+def input_tokens(slide):
+    """
+    Estimate the vision-only and hybrid input tokens of an analyze_deck() slide.
+
+    Returns:
+        tuple: (tokens of the full image, tokens actually sent in hybrid mode)
+    """
+    full = vision_tokens(slide['width'], slide['height'])
+    if slide['kind'] == 'figure':
+        return full, full
+    sent = text_tokens(slide['text'])
+    if slide['kind'] == 'mixed':
+        thumbnail_height = round(slide['height'] * THUMBNAIL_WIDTH / slide['width'])
+        sent += vision_tokens(THUMBNAIL_WIDTH, thumbnail_height)
+    return full, sent
@@ -0,0 +1,266 @@
+"""
+S2V (Slides to Video) - Usage and cost accounting
+Records the token, audio and request usage reported by every provider response,
+attributes it to pipeline stages and slides, and estimates its cost. The records
+of a run are kept in the run folder's usage.json (a resumed run adds to them), so
+batch sizes and model choices can be compared on real data.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+USAGE_FILE = "usage.json"
+
+# Estimated list prices in USD: per million tokens (input, cached input, output)
+# and per minute of input audio. Override or extend with Config.model_prices.
+MODEL_PRICES = {
+    'gpt-4.1-mini': {'input': 0.40, 'cached_input': 0.10, 'output': 1.60},
+    'claude-3-7-sonnet-20250219': {'input': 3.00, 'cached_input': 0.30, 'output': 15.00},
+    # Output includes thinking tokens
+    'gemini-2.5-flash-preview-05-20': {'input': 0.15, 'cached_input': 0.0375, 'output': 3.50},
+    # Output tokens are audio tokens (25 per second)
+    'gemini-2.5-flash-preview-tts': {'input': 0.50, 'output': 10.00},
+    'whisper-1': {'audio_minute': 0.006},
+}
+
+# Pipeline stages in report order
+STAGES = ('describe', 'refine', 'translate', 'tts', 'transcribe')
+
+COUNTERS = ('requests', 'input_tokens', 'cached_tokens', 'output_tokens', 'audio_seconds', 'cost')
+
+# Records are written to usage.json at most this often; the workflow saves once more at the end
+SAVE_INTERVAL_SECONDS = 5.0
+
+
+def estimate_cost(prices, input_tokens=0, cached_tokens=0, output_tokens=0, audio_seconds=0.0):
+    """Return the estimated USD cost of one request (0 for models without a price)."""
+    if not prices:
+        return 0.0
+    return (
+        input_tokens * prices.get('input', 0.0)
+        + cached_tokens * prices.get('cached_input', prices.get('input', 0.0))
+        + output_tokens * prices.get('output', 0.0)
+    ) / 1e6 + audio_seconds / 60 * prices.get('audio_minute', 0.0)
+
+
+def openai_usage(response_json):
+    """Token counts of an OpenAI chat completion (JSON) as record() keyword arguments."""
+    usage = response_json.get('usage') or {}
+    cached = (usage.get('prompt_tokens_details') or {}).get('cached_tokens') or 0
+    return {
+        'input_tokens': (usage.get('prompt_tokens') or 0) - cached,
+        'cached_tokens': cached,
+        'output_tokens': usage.get('completion_tokens') or 0
+    }
+
+
+def anthropic_usage(usage):
+    """Token counts of an Anthropic message usage block as record() keyword arguments."""
+    return {
+        'input_tokens': (getattr(usage, 'input_tokens', 0) or 0)
+                        + (getattr(usage, 'cache_creation_input_tokens', 0) or 0),
+        'cached_tokens': getattr(usage, 'cache_read_input_tokens', 0) or 0,
+        'output_tokens': getattr(usage, 'output_tokens', 0) or 0
+    }
+
+
+def gemini_usage(metadata):
+    """Token counts of a Gemini usage_metadata block as record() keyword arguments."""
+    cached = getattr(metadata, 'cached_content_token_count', 0) or 0
+    return {
+        'input_tokens': (getattr(metadata, 'prompt_token_count', 0) or 0) - cached,
+        'cached_tokens': cached,
+        'output_tokens': (getattr(metadata, 'candidates_token_count', 0) or 0)
+                         + (getattr(metadata, 'thoughts_token_count', 0) or 0)
+    }
+
+
+def merged_seconds(intervals):
+    """Total length of a set of (start, end) intervals, counting overlaps once."""
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+class UsageTracker:
+    """Thread-safe usage records of one run, saved to usage.json periodically and at the end"""
+
+    def __init__(self, run_dir=None, prices=None):
+        """
+        Args:
+            run_dir: Run folder of usage.json (None keeps the records in memory only)
+            prices: Per-model price overrides, merged over MODEL_PRICES
+        """
+        self.path = os.path.join(run_dir, USAGE_FILE) if run_dir else None
+        self.prices = {model: dict(p) for model, p in MODEL_PRICES.items()}
+        for model, p in (prices or {}).items():
+            self.prices.setdefault(model, {}).update(p)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # One writer of usage.json at a time
+        self._last_save = time.time()
+        self.records = []
+        self.settings = {}
+        self.local_stages = {}  # Stage -> {'seconds': ..., outputs}, for stages without API calls
+        self.load()
+
+    def load(self):
+        """Load the records of an earlier attempt of the same run folder."""
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.records = data.get('records', [])
+            self.settings = data.get('settings', {})
+            self.local_stages = data.get('local_stages', {})
+        except Exception as e:
+            print(f"⚠️ Could not read usage file {self.path}: {e}")
+
+    def update_settings(self, **settings):
+        """Store run settings (slide count, batch sizes, concurrency) with the usage."""
+        with self._lock:
+            self.settings.update(settings)
+        self.save()
+
+    def record_local_stage(self, stage, seconds, **outputs):
+        """Record the wall time (and output sizes) of a local stage such as 'images' or 'video'."""
+        with self._lock:
+            self.local_stages[stage] = {'seconds': seconds, **outputs}
+        self.save()
+
+    def record(self, stage, model, slides=(), input_tokens=0, cached_tokens=0, output_tokens=0,
+               audio_seconds=0.0, started=None, requests=1):
+        """
+        Record one provider request.
+
+        Args:
+            stage: Pipeline stage (see STAGES)
+            model: Model name, used to look up its price
+            slides: Slide numbers the request served (its usage is split evenly among them)
+            input_tokens: Uncached input tokens
+            cached_tokens: Input tokens served from the provider's prompt cache
+            output_tokens: Output tokens (audio tokens for TTS)
+            audio_seconds: Seconds of audio produced (TTS) or transcribed (Whisper)
+            started: time.time() when the request was sent (for latency and stage time)
+        """
+        ended = time.time()
+        record = {
+            'stage': stage,
+            'model': model,
+            'slides': sorted(slides),
+            'requests': requests,
+            'input_tokens': int(input_tokens or 0),
+            'cached_tokens': int(cached_tokens or 0),
+            'output_tokens': int(output_tokens or 0),
+            'audio_seconds': round(float(audio_seconds or 0.0), 3),
+            'cost': estimate_cost(self.prices.get(model), input_tokens or 0, cached_tokens or 0,
+                                  output_tokens or 0, audio_seconds or 0.0),
+            'started': started if started is not None else ended,
+            'ended': ended
+        }
+        with self._lock:
+            self.records.append(record)
+            due = ended - self._last_save >= SAVE_INTERVAL_SECONDS
+            if due:
+                self._last_save = ended
+        if due:
+            self.save()
+
+    def save(self):
+        """Write usage.json atomically (records plus the aggregated summary)."""
+        if self.path is None:
+            return
+        with self._save_lock:
+            with self._lock:
+                self._last_save = time.time()
+                settings = dict(self.settings)
+                local_stages = dict(self.local_stages)
+                records = list(self.records)
+            data = {'settings': settings, **self.summary(records, settings), 'local_stages': local_stages,
+                    'records': records}
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    def summary(self, records=None, settings=None):
+        """
+        Aggregate the records per stage, per slide and for the whole run.
+
+        Args:
+            records, settings: Snapshot to aggregate (default: the current records and settings)
+
+        Returns:
+            dict with 'stages' (counters plus models, request and wall seconds),
+            'slides' (counters split evenly among the slides of each request) and 'totals'
+        """
+        records = list(self.records) if records is None else records
+        settings = self.settings if settings is None else settings
+        stages = {}
+        intervals = defaultdict(list)
+        slides = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+        for record in records:
+            stage = stages.setdefault(record['stage'], {
+                **dict.fromkeys(COUNTERS, 0), 'models': [], 'request_seconds': 0.0, 'wall_seconds': 0.0
+            })
+            for counter in COUNTERS:
+                stage[counter] += record[counter]
+            if record['model'] not in stage['models']:
+                stage['models'].append(record['model'])
+            stage['request_seconds'] += record['ended'] - record['started']
+            intervals[record['stage']].append((record['started'], record['ended']))
+
+            share = 1 / len(record['slides']) if record['slides'] else 0
+            for slide_num in record['slides']:
+                for counter in COUNTERS:
+                    slides[str(slide_num)][counter] += record[counter] * share
+
+        for name, stage in stages.items():
+            stage['wall_seconds'] = merged_seconds(intervals[name])
+        for slide in slides.values():
+            for counter in COUNTERS:
+                slide[counter] = round(slide[counter], 6)
+
+        ordered = {name: stages[name] for name in STAGES if name in stages}
+        ordered.update({name: stage for name, stage in stages.items() if name not in ordered})
+
+        totals = {counter: sum(stage[counter] for stage in stages.values()) for counter in COUNTERS}
+        slide_count = settings.get('slides') or len(slides)
+        totals['cost_per_slide'] = totals['cost'] / slide_count if slide_count else 0.0
+
+        return {
+            'stages': ordered,
+            'slides': dict(sorted(slides.items(), key=lambda item: int(item[0]))),
+            'totals': totals
+        }
+
+    def print_summary(self):
+        """Print per-stage usage and the estimated cost of the run."""
+        summary = self.summary()
+        if not summary['stages']:
+            return
+        print("\n💰 API usage (estimated cost)")
+        for name, stage in summary['stages'].items():
+            audio = f", {stage['audio_seconds']:.0f}s audio" if stage['audio_seconds'] else ""
+            print(f"   {name:<11} {stage['requests']:>4} req  {stage['input_tokens']:>8} in "
+                  f"({stage['cached_tokens']} cached)  {stage['output_tokens']:>8} out{audio}  "
+                  f"${stage['cost']:.4f}")
+        totals = summary['totals']
+        print(f"   {'total':<11} {totals['requests']:>4} req  ${totals['cost']:.4f} "
+              f"(${totals['cost_per_slide']:.4f}/slide)")
+        if self.path:
+            print(f"📝 Usage saved to: {self.path}")
@@ -2,7 +2,8 @@ import os
 import sys
 from pathlib import Path
 from config import Config
-from main import GPTProcessor
+from manifest import RunManifest
+from batch import find_pdf_files, run_batch, print_batch_report
 import time
 import argparse
 
@@ -13,6 +14,11 @@ class S2VUserInterface:
         self.config = Config()
         self.processor = None
         
+    def create_processor(self):
+        """Create the processor (imports the provider SDKs only when a conversion starts)"""
+        from main import GPTProcessor
+        return GPTProcessor(*self.config.get_api_keys(), config=self.config)
+    
     def print_banner(self):
         """Print application banner"""
         banner = """
@@ -35,7 +41,9 @@ class S2VUserInterface:
         4. 🔍 Kiểm tra cấu hình hiện tại
         5. 💾 Lưu cấu hình
         6. 📖 Hướng dẫn sử dụng
-        7. ❌ Thoát
+        7. 🔁 Tiếp tục lần chạy bị lỗi (Resume)
+        8. 📚 Chuyển đổi hàng loạt (Batch)
+        9. ❌ Thoát
         
         """
         print(menu)
@@ -117,6 +125,21 @@ class S2VUserInterface:
         except ValueError:
             print("❌ Vui lòng nhập số nguyên hợp lệ")
         
+        # TTS Workers
+        print(f"\n🔀 Số request TTS đồng thời hiện tại: {self.config.tts_workers}")
+        print("   (Số slide được tạo giọng nói song song - Khuyến nghị: 2-8)")
+        try:
+            tts_workers = input("🔀 Nhập số request TTS đồng thời mới (Enter để giữ nguyên): ").strip()
+            if tts_workers:
+                tts_workers = int(tts_workers)
+                if 1 <= tts_workers <= 16:
+                    self.config.set_tts_workers(tts_workers)
+                    print(f"✅ Đã cập nhật TTS workers: {tts_workers}")
+                else:
+                    print("⚠️ Khuyến nghị sử dụng giá trị từ 1-16")
+        except ValueError:
+            print("❌ Vui lòng nhập số nguyên hợp lệ")
+        
         # Batch Splitting
         print(f"\n🔪 Batch splitting hiện tại: {'Bật' if self.config.use_batch_splitting else 'Tắt'}")
         print("   (Tự động chia audio batch thành từng slide riêng lẻ)")
@@ -139,9 +162,13 @@ class S2VUserInterface:
         print(f"📁 Thư mục đầu ra:       {self.config.default_output_folder}")
         print(f"📊 PDF Batch Size:       {self.config.pdf_batch_size}")
         print(f"🎤 TTS Batch Size:       {self.config.tts_batch_size}")
+        print(f"🔀 TTS Workers:          {self.config.tts_workers}")
         print(f"🔪 Batch Splitting:      {'Bật' if self.config.use_batch_splitting else 'Tắt'}")
         print(f"🎥 Video FPS:            {self.config.video_fps}")
+        print(f"👀 Preview:              {'Bật' if self.config.preview else 'Tắt'} "
+              f"({self.config.preview_height}p, audio: {self.config.preview_audio})")
         print(f"🔊 Audio Rate:           {self.config.audio_rate}Hz")
+        print(f"📚 Batch Jobs:           {self.config.batch_jobs}")
     
     def show_help(self):
         """Show help information"""
@@ -175,6 +202,11 @@ class S2VUserInterface:
         - Bật: Tự động chia audio batch thành từng slide
         - Tắt: Giữ nguyên audio batch (không khuyến nghị)
         
+        👀 Bản nháp xem trước (Preview):
+        - Video độ phân giải thấp, mã hóa nhanh để kiểm tra slide và lời đọc
+        - Dùng giọng đọc đã có trong cache, slide chưa có thì dùng khoảng lặng ước lượng
+        - Thời lượng slide giống video thật ở những slide đã có audio thật
+        
         💡 KHUYẾN NGHỊ:
         - Lần đầu sử dụng: PDF=3, TTS=1, Splitting=Tắt
         - Muốn chất lượng cao: PDF=5, TTS=3, Splitting=Bật
@@ -184,6 +216,8 @@ class S2VUserInterface:
         - Cần kết nối internet
         - File PDF phải có chất lượng tốt
         - Quá trình có thể mất 5-30 phút tùy số slide
+        - Nếu bị lỗi giữa chừng, dùng chức năng '7. Resume' để chạy tiếp
+          (các bước đã hoàn thành sẽ được bỏ qua)
         """
         print(help_text)
     
@@ -215,49 +249,186 @@ class S2VUserInterface:
             print("❌ Đã hủy chuyển đổi.")
             return
         
+        # Draft preview: low resolution, fast preset, cached voice or silence instead of TTS
+        preview = self.get_user_choice(
+            "👀 Chỉ tạo bản nháp xem trước (nhanh, độ phân giải thấp, không gọi TTS)? (y/n): ",
+            valid_choices=['y', 'n', 'Y', 'N']
+        )
+        self.config.preview = preview.lower() == 'y'
+        
+        # Offer incremental mode when this deck was converted before
+        incremental_from = None
+        previous_run = self.find_previous_run(self.config.default_pdf_path)
+        if previous_run:
+            print(f"\n♻️  Đã có lần chạy trước cho file PDF này: {os.path.basename(previous_run)}")
+            incremental = self.get_user_choice(
+                "🔄 Chỉ tạo lại các slide đã thay đổi? (y/n): ",
+                valid_choices=['y', 'n', 'Y', 'N']
+            )
+            if incremental.lower() == 'y':
+                incremental_from = previous_run
+        
         try:
             # Initialize processor
-            self.processor = GPTProcessor(*self.config.get_api_keys())
+            self.processor = self.create_processor()
             
             # Create output folder with timestamp
             output_folder = self.processor.create_random_output_folder(
                 self.config.default_output_folder
             )
-            
+        except Exception as e:
+            print(f"\n❌ Lỗi khởi tạo: {str(e)}")
+            return
+        
+        self._execute_workflow(output_folder, incremental_from)
+    
+    def find_previous_run(self, pdf_path):
+        """Find the newest run of the same PDF that can be used for incremental mode"""
+        pdf_path = os.path.abspath(pdf_path)
+        for run_dir in self.find_resumable_runs():
+            manifest = RunManifest(run_dir)
+            if manifest.settings.get('pdf_path') == pdf_path and 'pages' in manifest.data['steps']:
+                return run_dir
+        return None
+    
+    def find_resumable_runs(self):
+        """List previous run folders that have a manifest, newest first"""
+        base_folder = self.config.default_output_folder
+        if not os.path.isdir(base_folder):
+            return []
+        
+        runs = [
+            os.path.join(base_folder, name) for name in os.listdir(base_folder)
+            if name.startswith('run_') and RunManifest.exists(os.path.join(base_folder, name))
+        ]
+        return sorted(runs, reverse=True)
+    
+    def resume_conversion(self):
+        """Resume a previous run, redoing only the steps that did not complete"""
+        print("\n🔁 TIẾP TỤC LẦN CHẠY TRƯỚC")
+        print("=" * 60)
+        
+        runs = self.find_resumable_runs()
+        if runs:
+            print("📂 Các lần chạy gần đây:")
+            for i, run_dir in enumerate(runs[:10], 1):
+                steps = len(RunManifest(run_dir).completed_steps())
+                print(f"   {i}. {os.path.basename(run_dir)} ({steps} bước đã hoàn thành)")
+        
+        choice = input("\n📂 Chọn số thứ tự hoặc nhập đường dẫn thư mục run (Enter để hủy): ").strip()
+        if not choice:
+            print("❌ Đã hủy.")
+            return
+        
+        if choice.isdigit() and 1 <= int(choice) <= min(len(runs), 10):
+            run_dir = runs[int(choice) - 1]
+        else:
+            run_dir = choice
+        
+        if not RunManifest.exists(run_dir):
+            print(f"❌ Không tìm thấy manifest.json trong: {run_dir}")
+            return
+        
+        # Reuse the original settings so completed steps still match
+        settings = RunManifest(run_dir).settings
+        pdf_path = settings.get('pdf_path', '')
+        if not pdf_path or not os.path.exists(pdf_path):
+            print(f"❌ File PDF của lần chạy này không còn tồn tại: {pdf_path}")
+            return
+        
+        self.config.default_pdf_path = pdf_path
+        self.config.pdf_batch_size = settings.get('pdf_batch_size', self.config.pdf_batch_size)
+        self.config.tts_batch_size = settings.get('tts_batch_size', self.config.tts_batch_size)
+        self.config.use_batch_splitting = settings.get('use_batch_splitting', self.config.use_batch_splitting)
+        
+        print(f"📄 PDF: {pdf_path}")
+        print(f"📁 Thư mục run: {run_dir}")
+        
+        try:
+            self.processor = self.create_processor()
+        except Exception as e:
+            print(f"\n❌ Lỗi khởi tạo: {str(e)}")
+            return
+        
+        self._execute_workflow(run_dir, settings.get('incremental_from'))
+    
+    def run_batch_conversion(self):
+        """Convert every PDF of a folder (or glob) in one process"""
+        print("\n📚 CHUYỂN ĐỔI HÀNG LOẠT")
+        print("=" * 60)
+        
+        source = input("📂 Nhập thư mục hoặc mẫu glob chứa file PDF (Enter để hủy): ").strip()
+        if not source:
+            print("❌ Đã hủy.")
+            return
+        
+        pdf_files = find_pdf_files(source)
+        if not pdf_files:
+            print(f"❌ Không tìm thấy file PDF nào trong: {source}")
+            return
+        
+        print(f"📄 Tìm thấy {len(pdf_files)} file PDF")
+        jobs = input(f"⚙️  Số deck xử lý đồng thời (Enter = {self.config.batch_jobs}): ").strip()
+        try:
+            jobs = int(jobs) if jobs else self.config.batch_jobs
+            if jobs < 1:
+                raise ValueError
+        except ValueError:
+            print("❌ Vui lòng nhập số nguyên dương")
+            return
+        
+        confirm = self.get_user_choice(
+            f"\n✅ Bắt đầu chuyển đổi {len(pdf_files)} file với {jobs} job đồng thời? (y/n): ",
+            valid_choices=['y', 'n', 'Y', 'N']
+        )
+        if confirm.lower() != 'y':
+            print("❌ Đã hủy chuyển đổi.")
+            return
+        
+        try:
+            self.processor = self.create_processor()
+            report = run_batch(
+                self.processor,
+                pdf_files,
+                self.config.default_output_folder,
+                jobs,
+                self.config.pdf_batch_size,
+                self.config.tts_batch_size,
+                self.config.use_batch_splitting
+            )
+            print_batch_report(report)
+        except Exception as e:
+            print(f"\n❌ Lỗi trong quá trình xử lý hàng loạt: {str(e)}")
+    
+    def _execute_workflow(self, output_folder, incremental_from=None):
+        """Run the workflow in output_folder and show the results"""
+        try:
             print(f"\n🎬 Bắt đầu xử lý...")
             print(f"📁 Thư mục kết quả: {output_folder}")
             
             start_time = time.time()
             
             if self.config.use_batch_splitting and self.config.tts_batch_size > 1:
-                # Use batch splitting workflow
                 print("🔄 Sử dụng workflow: Batch TTS + Audio Splitting")
-                video_path, audio_files, durations = self.processor.test_workflow_with_batch_splitting(
+            else:
+                print("🔄 Sử dụng workflow: Xử lý từng slide riêng lẻ")
+            
+            if incremental_from:
+                video_path, audio_files, durations = self.processor.run_incremental_workflow(
                     self.config.default_pdf_path,
+                    incremental_from,
                     output_folder,
                     self.config.pdf_batch_size,
-                    self.config.tts_batch_size
+                    self.config.tts_batch_size,
+                    self.config.use_batch_splitting
                 )
             else:
-                # Use original workflow
-                print("🔄 Sử dụng workflow: Xử lý từng slide riêng lẻ")
-                
-                # Process PDF
-                descriptions_file, image_files = self.processor.process_pdf_to_descriptions(
-                    self.config.default_pdf_path, output_folder, self.config.pdf_batch_size
-                )
-                
-                # Process with Claude
-                final_context_file = self.processor.process_with_claude(descriptions_file, output_folder)
-                
-                # Generate audio
-                audio_files, vietnamese_descriptions, translated_file = self.processor.generate_vietnamese_audio(
-                    final_context_file, output_folder, tts_batch_size=1
-                )
-                
-                # Create video
-                video_path, durations = self.processor.create_video_with_audio(
-                    image_files, audio_files, output_folder
+                video_path, audio_files, durations = self.processor.run_workflow(
+                    self.config.default_pdf_path,
+                    output_folder,
+                    self.config.pdf_batch_size,
+                    self.config.tts_batch_size,
+                    self.config.use_batch_splitting
                 )
             
             end_time = time.time()
@@ -271,10 +442,12 @@ class S2VUserInterface:
             print(f"🎥 Video đã tạo: {video_path}")
             print(f"📁 Thư mục kết quả: {output_folder}")
             
-            if 'durations' in locals():
+            if durations:
                 print(f"⏱️  Độ dài video: {sum(durations):.2f} giây")
                 print(f"📄 Số slide đã xử lý: {len(durations)}")
             
+            self.processor.usage.print_summary()
+            
             # Ask to open folder
             open_folder = self.get_user_choice(
                 "\n📂 Mở thư mục kết quả? (y/n): ",
@@ -300,6 +473,7 @@ class S2VUserInterface:
             print("   - API keys")
             print("   - File PDF có thể đọc được")
             print("   - Dung lượng ổ cứng đủ")
+            print(f"🔁 Có thể tiếp tục lần chạy này bằng chức năng '7. Resume': {output_folder}")
     
     def save_config(self):
         """Save current configuration"""
@@ -323,8 +497,8 @@ class S2VUserInterface:
         while True:
             self.print_menu()
             
-            choice = self.get_user_choice("Nhập lựa chọn (1-7): ", 
-                                        valid_choices=['1', '2', '3', '4', '5', '6', '7'])
+            choice = self.get_user_choice("Nhập lựa chọn (1-9): ", 
+                                        valid_choices=['1', '2', '3', '4', '5', '6', '7', '8', '9'])
             
             if choice == '1':
                 self.run_conversion()
@@ -339,10 +513,14 @@ class S2VUserInterface:
             elif choice == '6':
                 self.show_help()
             elif choice == '7':
+                self.resume_conversion()
+            elif choice == '8':
+                self.run_batch_conversion()
+            elif choice == '9':
                 print("\n👋 Cảm ơn bạn đã sử dụng S2V!")
                 break
             
-            if choice != '7':
+            if choice != '9':
                 input("\n⏸️  Nhấn Enter để tiếp tục...")
 
 def main():
@@ -0,0 +1,387 @@
+"""
+S2V (Slides to Video) - Native video encoder
+Encodes every slide straight from its still image with ffmpeg and joins the
+segments with the concat demuxer (stream copy) under one continuous audio track,
+so encoding time follows the audio duration instead of frames pushed through Python.
+Several renditions (e.g. 1080p, 720p, mobile) can be produced from one decode of
+every slide and one audio encode.
+"""
+
+import math
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from cache import SegmentCache
+from incremental import link_or_copy
+from manifest import hash_file
+
+# Codec settings shared by every segment (segments must match to be stream-copied)
+DEFAULT_CODEC_ARGS = ['-c:v', 'libx264', '-preset', 'fast', '-tune', 'stillimage', '-crf', '23']
+AUDIO_CODEC_ARGS = ['-c:a', 'aac', '-b:a', '128k']
+
+# Output modes: 'standard' encodes every frame at fps; 'static' uses a low constant frame
+# rate; 'vfr' emits one frame per slide change plus one every keyframe_interval seconds
+VIDEO_MODES = ('standard', 'static', 'vfr')
+
+# Rendition ladder: name -> (frame height, rate control arguments added to the codec arguments)
+RENDITION_LADDER = {
+    '1080p': (1080, ['-maxrate', '5M', '-bufsize', '10M']),
+    '720p': (720, ['-maxrate', '3M', '-bufsize', '6M']),
+    'mobile': (360, ['-maxrate', '600k', '-bufsize', '1200k']),
+}
+
+
+def find_ffmpeg():
+    """Return the ffmpeg executable (system ffmpeg, else the one bundled with imageio-ffmpeg)."""
+    path = shutil.which('ffmpeg')
+    if path:
+        return path
+    import imageio_ffmpeg
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def run_ffmpeg(ffmpeg, args):
+    """Run ffmpeg quietly and raise RuntimeError with its error output on failure."""
+    result = subprocess.run(
+        [ffmpeg, '-hide_banner', '-loglevel', 'error', '-nostdin', '-y', *args],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.strip()[-800:]}")
+
+
+def frame_size(image_files):
+    """Return the (even) frame size that fits every slide image."""
+    from PIL import Image
+    width, height = 0, 0
+    for image_file in image_files:
+        with Image.open(image_file) as img:
+            width, height = max(width, img.width), max(height, img.height)
+    return width + width % 2, height + height % 2
+
+
+def rendition_files(output_file, renditions=None):
+    """Return the output path of every rendition (the first rendition is output_file itself)."""
+    if not renditions:
+        return [output_file]
+    base, ext = os.path.splitext(output_file)
+    return [output_file] + [f"{base}_{name}{ext}" for name in renditions[1:]]
+
+
+def _scaled_width(width, height, target_height):
+    # Even frame width that keeps the deck's aspect ratio at target_height
+    return max(2, int(round(width * target_height / height / 2)) * 2)
+
+
+def _filter_graph(source, filters):
+    # One decode of source, split into one labelled output [vK] per filter chain
+    if len(filters) == 1:
+        return f"{source}{filters[0]}[v0]"
+    labels = [f"[s{k}]" for k in range(len(filters))]
+    graph = [f"{source}split={len(filters)}{''.join(labels)}"]
+    graph += [f"{label}{chain}[v{k}]" for k, (label, chain) in enumerate(zip(labels, filters))]
+    return ";".join(graph)
+
+
+class VideoEncoder:
+    """Still-image segment encoder with stream-copy concatenation"""
+
+    def __init__(self, fps=24, codec_args=None, ffmpeg=None, workers=None, limits=None, mode='standard',
+                 keyframe_interval=10, segment_cache=None, renditions=None, max_height=None):
+        """
+        Args:
+            fps: Output frame rate (constant frame rate modes)
+            codec_args: ffmpeg video codec arguments (default: libx264, see encoder_probe)
+            ffmpeg: ffmpeg executable (default: find_ffmpeg())
+            workers: Segments encoded in parallel (default: one per CPU core)
+            limits: Optional ProviderLimits whose 'encode' slots are shared by all decks
+            mode: 'standard', 'static' or 'vfr' (see VIDEO_MODES)
+            keyframe_interval: Maximum seconds between keyframes, so players can seek
+            segment_cache: Optional SegmentCache, so unchanged slides are never re-encoded
+            renditions: Names from RENDITION_LADDER to encode in one pass (default: one
+                video at the size of the slide images)
+            max_height: Scale the single-rendition output down to this frame height (previews)
+        """
+        if mode not in VIDEO_MODES:
+            raise ValueError(f"Unknown video mode: {mode} (expected one of {', '.join(VIDEO_MODES)})")
+        unknown = [name for name in renditions or () if name not in RENDITION_LADDER]
+        if unknown:
+            raise ValueError(f"Unknown renditions: {', '.join(unknown)} "
+                             f"(expected any of {', '.join(RENDITION_LADDER)})")
+        self.renditions = list(renditions or ())
+        self.max_height = max_height
+        self.mode = mode
+        self.keyframe_interval = keyframe_interval
+        self.fps = fps
+        self.ffmpeg = ffmpeg or find_ffmpeg()
+        cores = os.cpu_count() or 1
+        self.workers = max(1, workers or cores)
+        self.threads = max(1, cores // self.workers)  # encoder threads per ffmpeg process
+        self.limits = limits
+        self.segment_cache = segment_cache
+        # The software encoder stays as a fallback if the chosen encoder fails on real content
+        self.codec_candidates = [DEFAULT_CODEC_ARGS]
+        if codec_args is not None and codec_args != DEFAULT_CODEC_ARGS:
+            self.codec_candidates.insert(0, codec_args)
+
+    def frame_count(self, duration):
+        """Return the number of frames that shows a slide for duration seconds."""
+        # Round up (never cut speech); at low frame rates this pads at most one frame of silence
+        return max(1, math.ceil(duration * self.fps - 1e-6))
+
+    def _scale_filter(self, width, height):
+        # Letterbox slides of a different aspect ratio onto one frame size
+        return (f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,format=yuv420p")
+
+    def _video_filter(self, width, height):
+        # Repeat the converted frame (decoding and scaling the image only once)
+        return self._scale_filter(width, height) + ",loop=loop=-1:size=1:start=0"
+
+    def rendition_targets(self, width, height):
+        """Return (width, height, rate arguments) of every rendition of a deck with the given frame size."""
+        if not self.renditions:
+            if self.max_height and height > self.max_height:
+                return [(_scaled_width(width, height, self.max_height), self.max_height, [])]
+            return [(width, height, [])]
+        targets = []
+        for name in self.renditions:
+            target_height, rate_args = RENDITION_LADDER[name]
+            targets.append((_scaled_width(width, height, target_height), target_height, rate_args))
+        return targets
+
+    def encode_segment(self, image_file, frames, outputs, codec_args):
+        """Encode video-only segments showing image_file for the given number of frames.
+
+        outputs holds one (output_file, width, height, rate arguments) per rendition; the
+        image is decoded once and scaled for each of them.
+        """
+        graph = _filter_graph('[0:v]', [self._video_filter(width, height) for _, width, height, _ in outputs])
+        output_args = []
+        for k, (output_file, _, _, rate_args) in enumerate(outputs):
+            output_args += [
+                '-map', f'[v{k}]',
+                '-frames:v', str(frames),
+                *codec_args, *rate_args,
+                '-g', str(max(1, round(self.keyframe_interval * self.fps))),
+                '-threads', str(self.threads),
+                '-an', output_file
+            ]
+        run_ffmpeg(self.ffmpeg, ['-framerate', str(self.fps), '-i', image_file, '-filter_complex', graph, *output_args])
+
+    def _cache_key(self, image_hash, frames, width, height, codec_args):
+        settings = [self.fps, width, height, self.keyframe_interval, *codec_args]
+        return SegmentCache.key(image_hash, frames, settings)
+
+    def _encode_with_slot(self, image_file, frames, outputs, codec_args):
+        """Encode one slide's segments (reusing every rendition found in the segment cache)."""
+        missing = []
+        keys = {}
+        image_hash = hash_file(image_file) if self.segment_cache is not None else None
+        for output in outputs:
+            output_file, width, height, rate_args = output
+            if image_hash is not None:
+                key = self._cache_key(image_hash, frames, width, height, [*codec_args, *rate_args])
+                cached = self.segment_cache.get_file(key)
+                if cached is not None:
+                    try:
+                        link_or_copy(cached, output_file)
+                        continue
+                    except OSError:
+                        pass  # Evicted in the meantime: encode it again
+                keys[output_file] = key
+            missing.append(output)
+        if not missing:
+            return
+
+        with self.limits.slot('encode') if self.limits is not None else nullcontext():
+            self.encode_segment(image_file, frames, missing, codec_args)
+        for output_file, key in keys.items():
+            self.segment_cache.put_file(key, output_file)
+
+    def encode_slide(self, image_file, frames, outputs):
+        """Encode one slide's segments with the first codec candidate that works.
+
+        Returns:
+            The codec arguments used (candidates that failed are dropped for later segments)
+        """
+        while True:
+            codec_args = self.codec_candidates[0]
+            try:
+                self._encode_with_slot(image_file, frames, outputs, codec_args)
+                return codec_args
+            except RuntimeError as e:
+                if len(self.codec_candidates) == 1:
+                    raise
+                print(f"⚠️ Encoder {codec_args[1]} failed ({e}), falling back to {self.codec_candidates[1][1]}")
+                self.codec_candidates = self.codec_candidates[1:]
+
+    def _encode_segments(self, image_files, frame_counts, segment_dir, targets):
+        """Encode all segments with identical codec settings, in parallel.
+
+        The first segment picks the codec (dropping candidates that fail); the rest are
+        then encoded by up to `workers` ffmpeg processes at once.
+
+        Returns:
+            One list of segment files per rendition target
+        """
+        segment_files = [[] for _ in targets]
+        jobs = []
+        for i, (image_file, frames) in enumerate(zip(image_files, frame_counts), 1):
+            outputs = []
+            for k, (width, height, rate_args) in enumerate(targets):
+                segment_file = os.path.join(segment_dir, f"segment_{i}_{k}.mp4")
+                segment_files[k].append(segment_file)
+                outputs.append((segment_file, width, height, rate_args))
+            jobs.append((image_file, frames, outputs))
+
+        codec_args = self.encode_slide(*jobs[0])
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(self._encode_with_slot, image_file, frames, outputs, codec_args)
+                for image_file, frames, outputs in jobs[1:]
+            ]
+            for future in futures:
+                future.result()
+        return segment_files
+
+    def encode_audio(self, audio_file, output_file):
+        """Encode the audio track once (AAC), to be stream-copied into every rendition."""
+        run_ffmpeg(self.ffmpeg, ['-i', audio_file, '-vn', *AUDIO_CODEC_ARGS, output_file])
+
+    def concat(self, segment_files, audio_file, output_file):
+        """Join segments with the concat demuxer and mux the encoded audio track (all stream copy)."""
+        list_file = os.path.splitext(output_file)[0] + "_segments.txt"
+        with open(list_file, 'w', encoding='utf-8') as f:
+            for segment_file in segment_files:
+                escaped = os.path.abspath(segment_file).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        try:
+            run_ffmpeg(self.ffmpeg, [
+                '-f', 'concat', '-safe', '0', '-i', list_file,
+                '-i', audio_file,
+                '-map', '0:v', '-map', '1:a',
+                '-c', 'copy',
+                '-movflags', '+faststart',
+                output_file
+            ])
+        finally:
+            os.remove(list_file)
+
+    def encode_vfr(self, image_files, durations, audio_file, outputs):
+        """Encode the whole video in one pass with one frame per slide change (variable frame rate).
+
+        Long slides get an extra frame every keyframe_interval seconds so seeking stays fast.
+        outputs holds one (output_file, width, height, rate arguments) per rendition and
+        audio_file is the encoded audio track, copied into each of them.
+        """
+        output_file = outputs[0][0]
+        list_file = os.path.splitext(output_file)[0] + "_frames.txt"
+        with open(list_file, 'w', encoding='utf-8') as f:
+            for image_file, duration in zip(image_files, durations):
+                escaped = os.path.abspath(image_file).replace("'", "'\\''")
+                pieces = max(1, math.ceil(duration / self.keyframe_interval))
+                for _ in range(pieces):
+                    # Millisecond image timestamps (the image demuxer defaults to 1/25 s)
+                    f.write(f"file '{escaped}'\noption framerate 1000\nduration {duration / pieces:.6f}\n")
+            # The concat demuxer ignores the last duration unless the last file is repeated
+            f.write(f"file '{escaped}'\noption framerate 1000\n")
+
+        graph = _filter_graph('[0:v]', [self._scale_filter(width, height) for _, width, height, _ in outputs])
+        try:
+            while True:
+                codec_args = self.codec_candidates[0]
+                output_args = []
+                for k, (output_file, _, _, rate_args) in enumerate(outputs):
+                    output_args += [
+                        '-map', f'[v{k}]', '-map', '1:a',
+                        '-fps_mode', 'vfr',
+                        *codec_args, *rate_args,
+                        '-force_key_frames', f"expr:gte(t,n_forced*{self.keyframe_interval})",
+                        '-c:a', 'copy',
+                        '-shortest',
+                        '-movflags', '+faststart',
+                        output_file
+                    ]
+                try:
+                    run_ffmpeg(self.ffmpeg, [
+                        '-f', 'concat', '-safe', '0', '-i', list_file,
+                        '-i', audio_file,
+                        '-filter_complex', graph,
+                        *output_args
+                    ])
+                    return
+                except RuntimeError as e:
+                    if len(self.codec_candidates) == 1:
+                        raise
+                    print(f"⚠️ Encoder {codec_args[1]} failed ({e}), falling back to {self.codec_candidates[1][1]}")
+                    self.codec_candidates = self.codec_candidates[1:]
+        finally:
+            os.remove(list_file)
+
+    def encode(self, image_files, audio_files, output_file):
+        """
+        Encode a slide video (and its other renditions, see rendition_files).
+
+        Every slide lasts as long as its audio, rounded to whole frames; the slide
+        audio is padded to the same length and joined into one continuous track,
+        so picture and sound stay in sync across any number of slides.
+
+        Returns:
+            List of slide durations in seconds
+        """
+        from audio_buffer import PcmBuffer  # NumPy: only needed once encoding starts
+        output_dir = os.path.dirname(os.path.abspath(output_file))
+        segment_dir = os.path.join(output_dir, "video_segments")
+        audio_track = os.path.splitext(output_file)[0] + "_audio.wav"
+        encoded_audio = os.path.splitext(output_file)[0] + "_audio.m4a"
+        os.makedirs(segment_dir, exist_ok=True)
+
+        try:
+            width, height = frame_size(image_files)
+            targets = self.rendition_targets(width, height)
+            output_files = rendition_files(output_file, self.renditions)
+            for path in output_files:
+                if os.path.exists(path):
+                    os.remove(path)
+            sizes = ", ".join(f"{w}x{h}" for w, h, _ in targets)
+
+            if self.mode == 'vfr':
+                # Exact slide durations: no frame grid to pad the audio to
+                slide_audio = [PcmBuffer.from_file(audio_file) for audio_file in audio_files]
+                PcmBuffer.concatenate(slide_audio).write_wav(audio_track)
+                self.encode_audio(audio_track, encoded_audio)
+                durations = [pcm.duration for pcm in slide_audio]
+                print(f"🎬 Encoding {len(image_files)} slides as variable frame rate video ({sizes})...")
+                outputs = [(path, w, h, rate_args) for path, (w, h, rate_args) in zip(output_files, targets)]
+                self.encode_vfr(image_files, durations, encoded_audio, outputs)
+                return durations
+
+            frame_counts = []
+            slide_audio = []
+            for audio_file in audio_files:
+                pcm = PcmBuffer.from_file(audio_file)
+                frames = self.frame_count(pcm.duration)
+                frame_counts.append(frames)
+                slide_audio.append(pcm.fit(frames / self.fps))
+            PcmBuffer.concatenate(slide_audio).write_wav(audio_track)
+            self.encode_audio(audio_track, encoded_audio)
+
+            print(f"🎬 Encoding {len(image_files)} slide segments ({sizes}, {self.fps} fps, "
+                  f"{self.workers} parallel)...")
+            segment_lists = self._encode_segments(image_files, frame_counts, segment_dir, targets)
+
+            print("🔗 Joining segments (stream copy)...")
+            for segment_files, path in zip(segment_lists, output_files):
+                self.concat(segment_files, encoded_audio, path)
+        finally:
+            shutil.rmtree(segment_dir, ignore_errors=True)
+            for path in (audio_track, encoded_audio):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        return [frames / self.fps for frames in frame_counts]